@@ -0,0 +1,133 @@
+"""
+Request decoding and response encoding time of the solve endpoint for
+large payloads.
+
+The previous path parsed the request into a dictionary, converted its
+keys with ``humps.decamelize`` and validated one ``Client`` model per
+client. On the way out, it dumped the solution, parsed the GeoJSON
+string of each service area, converted the keys with ``humps.camelize``
+and wrote the result with ``json.dumps``. The fast path validates the
+request JSON straight into the models, through their camelCase aliases,
+with the clients validated in bulk into a ``ClientBatch``. It serializes
+the solution in a single ``model_dump_json`` pass, reading the GeoJSON of
+the service areas from their coordinates.
+
+Usage: python -m benchmarks.bench_api_payload
+"""
+
+import json
+from typing import List
+
+import humps
+import numpy as np
+from pydantic import BaseModel
+from shapely import MultiPolygon, Point, to_geojson
+
+from benchmarks.instances import random_clients, random_facilities, timer
+from src.models import (
+    AssignedFacility,
+    AssignmentRequest,
+    AssignmentSolution,
+    Client,
+    ClientBatch,
+    Facility,
+    SolutionStatus,
+)
+
+NUM_CLIENTS = [50_000, 150_000]
+NUM_FACILITIES = 50
+
+
+class ListAssignmentRequest(BaseModel):
+    """Assignment request validating one model per client"""
+
+    total_demand: int
+    clients: List[Client]
+    facilities: List[Facility]
+
+
+def request_payload(num_clients: int) -> bytes:
+    facilities = random_facilities(NUM_FACILITIES)
+    for facility in facilities[::2]:
+        facility.exclusive_service_area = MultiPolygon(
+            [Point(facility.lng, facility.lat).buffer(0.01)]
+        )
+
+    return json.dumps(
+        {
+            "totalDemand": num_clients,
+            "clients": [
+                client.model_dump(by_alias=True)
+                for client in random_clients(num_clients)
+            ],
+            "facilities": [
+                facility.model_dump(by_alias=True) for facility in facilities
+            ],
+        }
+    ).encode()
+
+
+def assignment_solution(request: AssignmentRequest) -> AssignmentSolution:
+    """Solution assigning the clients to facilities round robin, with a
+    service area of a few hundred vertices"""
+
+    clients = ClientBatch.from_clients(request.clients or [])
+    client_facilities = np.arange(len(clients)) % NUM_FACILITIES
+
+    return AssignmentSolution(
+        objective_value=1.0,
+        solution_status=SolutionStatus.OPTIMAL,
+        assigned_facilities=[
+            AssignedFacility(
+                facility=facility,
+                assigned_clients=clients[client_facilities == i],
+                service_area=MultiPolygon(
+                    [Point(facility.lng, facility.lat).buffer(0.05, 64)]
+                ),
+            )
+            for i, facility in enumerate(request.facilities)
+        ],
+    )
+
+
+def previous_encoding(solution: AssignmentSolution) -> str:
+    solution_dict = solution.model_dump()
+    for assigned_facility, facility_dict in zip(
+        solution.assigned_facilities, solution_dict["assigned_facilities"]
+    ):
+        facility_dict["service_area"] = json.loads(
+            to_geojson(assigned_facility.service_area)
+        )
+
+    return json.dumps(humps.camelize(solution_dict))
+
+
+def main():
+    print(f"{'clients':>8} {'payload (MB)':>13} ", end="")
+    print(f"{'decode before (s)':>18} {'decode (s)':>11} ", end="")
+    print(f"{'encode before (s)':>18} {'encode (s)':>11}")
+
+    for num_clients in NUM_CLIENTS:
+        payload = request_payload(num_clients)
+
+        timings: List[float] = []
+        with timer(timings):
+            ListAssignmentRequest(**humps.decamelize(json.loads(payload)))
+        with timer(timings):
+            request = AssignmentRequest.model_validate_json(payload)
+
+        solution = assignment_solution(request)
+        with timer(timings):
+            previous_response = previous_encoding(solution)
+        with timer(timings):
+            response = solution.model_dump_json(by_alias=True)
+        assert json.loads(response) == json.loads(previous_response)
+        assert isinstance(request.clients, ClientBatch)
+
+        print(f"{num_clients:>8} {len(payload) / 2**20:>13.1f} ", end="")
+        print(f"{timings[0]:>18.3f} {timings[1]:>11.3f} ", end="")
+        print(f"{timings[2]:>18.3f} {timings[3]:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Facility lookup time of new clients vs. number of clients, from the cell
+lookup table of the hexagonal grid service areas vs. point in polygon
+tests against the service areas.
+
+A solution of 50 facilities, each assigned the clients of its Voronoi
+cell among 50,000 random clients, is evaluated with hexagonal grid
+service areas. New random clients are then located in batch, with one
+hash lookup per grid level, or with an STRtree of the prepared service
+areas, and one at a time, as real-time requests, with the lookup table
+or by testing the service areas in turn.
+
+Usage: python -m benchmarks.bench_cell_lookup
+"""
+
+from typing import List, Optional
+
+import numpy as np
+import shapely
+
+from benchmarks.instances import random_clients, random_facilities, timer
+from src.models import AssignedFacility, ClientBatch, ServiceAreaType
+from src.services import (
+    build_cell_lookup,
+    evaluate_assigned_facilities,
+    lookup_cell_facilities,
+)
+
+NUM_FACILITIES = 50
+NUM_SOLVED_CLIENTS = 50_000
+NUM_NEW_CLIENTS = [1_000, 10_000, 100_000]
+NUM_REAL_TIME_CLIENTS = 1_000
+
+
+def main():
+    clients = ClientBatch.from_clients(random_clients(NUM_SOLVED_CLIENTS))
+    facilities = random_facilities(NUM_FACILITIES)
+    facility_coordinates = np.array(
+        [(facility.lat, facility.lng) for facility in facilities]
+    )
+    client_facilities = (
+        ((clients.coordinates[:, None, :] - facility_coordinates) ** 2)
+        .sum(axis=2)
+        .argmin(axis=1)
+    )
+    assigned_facilities = evaluate_assigned_facilities(
+        [
+            AssignedFacility(
+                facility=facility,
+                assigned_clients=clients[client_facilities == i],
+            )
+            for i, facility in enumerate(facilities)
+        ],
+        service_area_type=ServiceAreaType.HEX_GRID,
+    )
+    timings: List[float] = []
+    with timer(timings):
+        cell_lookup = build_cell_lookup(assigned_facilities)
+    print(f"lookup table: {len(cell_lookup.cell_facilities)} cells, ", end="")
+    print(f"built in {timings[0]:.3f} s")
+
+    facility_ids = np.array([facility.id for facility in facilities])
+    service_areas = np.array(
+        [facility.service_area for facility in assigned_facilities]
+    )
+    shapely.prepare(service_areas)
+    tree = shapely.STRtree(service_areas)
+
+    print(f"{'clients':>8} {'mode':>10} {'polygons (s)':>13} ", end="")
+    print(f"{'lookup (s)':>11} {'agreement':>10}")
+    for num_new_clients in NUM_NEW_CLIENTS:
+        new_clients = ClientBatch.from_clients(
+            random_clients(num_new_clients, seed=num_new_clients)
+        )
+
+        timings = []
+        with timer(timings):
+            client_indices, area_indices = tree.query(
+                shapely.points(new_clients.lngs, new_clients.lats),
+                predicate="within",
+            )
+            polygon_facilities = np.full(num_new_clients, None, dtype=object)
+            polygon_facilities[client_indices[::-1]] = facility_ids[
+                area_indices[::-1]
+            ]
+        with timer(timings):
+            lookup_facilities = lookup_cell_facilities(
+                cell_lookup, new_clients.lats, new_clients.lngs
+            )
+        located = polygon_facilities != None  # noqa: E711
+        agreement = np.mean(
+            polygon_facilities[located] == np.array(lookup_facilities)[located]
+        )
+
+        print(
+            f"{num_new_clients:>8} {'batch':>10} {timings[0]:>13.3f} ", end=""
+        )
+        print(f"{timings[1]:>11.3f} {agreement:>10.3f}")
+
+    new_clients = ClientBatch.from_clients(
+        random_clients(NUM_REAL_TIME_CLIENTS, seed=1)
+    )
+    timings = []
+    with timer(timings):
+        for lat, lng in zip(new_clients.lats, new_clients.lngs):
+            point = shapely.Point(lng, lat)
+            next(
+                (
+                    facility_id
+                    for facility_id, service_area in zip(
+                        facility_ids, service_areas
+                    )
+                    if service_area.contains(point)
+                ),
+                None,
+            )
+    with timer(timings):
+        for lat, lng in zip(new_clients.lats, new_clients.lngs):
+            facility_id: Optional[str] = lookup_cell_facilities(
+                cell_lookup, np.array([lat]), np.array([lng])
+            )[0]
+
+    print(f"{NUM_REAL_TIME_CLIENTS:>8} {'real-time':>10} ", end="")
+    print(f"{timings[0]:>13.3f} {timings[1]:>11.3f}")
+    assert facility_id is None or facility_id in facility_ids
+
+
+if __name__ == "__main__":
+    main()
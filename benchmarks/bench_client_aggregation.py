@@ -0,0 +1,91 @@
+"""
+Min Cost Flow solve time with co-located clients merged into super-clients.
+
+Clients are placed on a smaller set of random buildings, then the problem
+is solved as is and with the clients of each building merged into one
+weighted super-client, expanded back to the original clients afterwards.
+
+Usage: python -m benchmarks.bench_client_aggregation
+"""
+
+from typing import List
+
+import numpy as np
+
+from benchmarks.instances import (
+    random_assignment_problem,
+    random_clients,
+    timer,
+)
+from src.models import ClientBatch, CostProblem
+from src.services import (
+    aggregate_colocated_clients,
+    compute_cost_matrix,
+    expand_assigned_facilities,
+    merge_colocated_clients,
+    solve_flow_assignment_formulation,
+)
+
+INSTANCE_SIZES = [
+    (10_000, 1_000, 20),
+    (50_000, 5_000, 20),
+    (100_000, 10_000, 40),
+]
+
+
+def main():
+    print(f"{'clients':>8} {'buildings':>10} {'facilities':>10} ", end="")
+    print(f"{'ratio':>6} {'original (s)':>13} {'merged (s)':>11} ", end="")
+    print(f"{'same objective':>15}")
+
+    for num_clients, num_buildings, num_facilities in INSTANCE_SIZES:
+        assignment_problem = random_assignment_problem(
+            num_clients, num_facilities
+        )
+        buildings = ClientBatch.from_clients(
+            random_clients(num_buildings, seed=7)
+        )
+        client_buildings = np.arange(num_clients) % num_buildings
+        assignment_problem.clients.lats[:] = buildings.lats[client_buildings]
+        assignment_problem.clients.lngs[:] = buildings.lngs[client_buildings]
+        assignment_problem.cost_matrix = compute_cost_matrix(
+            CostProblem(
+                clients=assignment_problem.clients,
+                facilities=assignment_problem.facilities,
+            )
+        )
+
+        original_timings: List[float] = []
+        with timer(original_timings):
+            original_solution = solve_flow_assignment_formulation(
+                assignment_problem
+            )
+
+        merged_timings: List[float] = []
+        with timer(merged_timings):
+            aggregation = aggregate_colocated_clients(
+                assignment_problem.clients
+            )
+            merged_solution = solve_flow_assignment_formulation(
+                merge_colocated_clients(assignment_problem, aggregation)
+            )
+            expand_assigned_facilities(
+                assigned_facilities=merged_solution.assigned_facilities,
+                clients=assignment_problem.clients,
+                aggregation=aggregation,
+            )
+
+        same_objective = (
+            original_solution.objective_value
+            == merged_solution.objective_value
+        )
+        print(
+            f"{num_clients:>8} {num_buildings:>10} {num_facilities:>10} "
+            f"{aggregation.reduction_ratio:>6.2f} "
+            f"{original_timings[0]:>13.3f} {merged_timings[0]:>11.3f} "
+            f"{str(same_objective):>15}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Time and peak memory of the client handling of the solve pipeline, with
+the clients held column-wise in a ``ClientBatch`` vs. as ``Client``
+objects.
+
+Both pipelines take the clients of a request and their facilities, then
+aggregate the co-located clients, drop the clients with NaN costs and
+scale the demands of the others, group the clients by facility with
+their expected demands and serialize the ids of the assigned clients.
+The list pipeline reproduces the per-client code the ``ClientBatch``
+replaced. Times come from a run without memory tracing, the peak memory
+traced by ``tracemalloc`` from another run.
+
+Usage: python -m benchmarks.bench_client_batch
+"""
+
+import tracemalloc
+from typing import Callable, List
+
+import numpy as np
+
+from benchmarks.instances import random_clients, timer
+from src.models import Client, ClientBatch
+from src.services import aggregate_colocated_clients, group_clients_by_facility
+
+NUM_CLIENTS = [100_000, 200_000, 400_000]
+NUM_FACILITIES = 50
+INVALID_SHARE = 0.001
+STEPS = ["aggregate", "nans", "assign", "serialize"]
+
+
+def list_pipeline(
+    clients: List[Client], valid: np.ndarray, client_facilities: np.ndarray
+) -> List[float]:
+    timings: List[float] = []
+
+    with timer(timings):
+        coordinates = np.array(
+            [(client.lat, client.lng) for client in clients], dtype=float
+        )
+        _, first_indices = np.unique(coordinates, axis=0, return_index=True)
+        locations = [
+            Client(id=clients[j].id, lat=clients[j].lat, lng=clients[j].lng)
+            for j in np.sort(first_indices)
+        ]
+
+    with timer(timings):
+        invalid_client_indices = np.flatnonzero(~valid)
+        valid_clients = [
+            client
+            for i, client in enumerate(clients)
+            if i not in invalid_client_indices
+        ]
+        scale_factor = len(clients) / sum(
+            client.demand for client in valid_clients
+        )
+        scaled_clients = [
+            client.model_copy(
+                update={"demand": round(scale_factor * client.demand, 2)}
+            )
+            for client in valid_clients
+        ]
+
+    with timer(timings):
+        assigned_clients = [
+            [scaled_clients[j] for j in group]
+            for group in group_clients_by_facility(
+                client_facilities[valid], NUM_FACILITIES
+            )
+        ]
+        expected_demands = [
+            round(sum(client.demand for client in group))
+            for group in assigned_clients
+        ]
+
+    with timer(timings):
+        [[client.id for client in group] for group in assigned_clients]
+
+    assert len(locations) and len(expected_demands)
+
+    return timings
+
+
+def batch_pipeline(
+    clients: List[Client], valid: np.ndarray, client_facilities: np.ndarray
+) -> List[float]:
+    timings: List[float] = []
+
+    with timer(timings):
+        client_batch = ClientBatch.from_clients(clients)
+        aggregation = aggregate_colocated_clients(client_batch)
+
+    with timer(timings):
+        scaled_clients = client_batch[valid].scale_demands(len(clients))
+
+    with timer(timings):
+        assigned_clients = [
+            scaled_clients[group]
+            for group in group_clients_by_facility(
+                client_facilities[valid], NUM_FACILITIES
+            )
+        ]
+        expected_demands = [
+            round(float(group.demands.sum())) for group in assigned_clients
+        ]
+
+    with timer(timings):
+        [group.ids.tolist() for group in assigned_clients]
+
+    assert len(aggregation.locations) and len(expected_demands)
+
+    return timings
+
+
+def peak_memory_mb(pipeline: Callable, *args) -> float:
+    tracemalloc.start()
+    pipeline(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak / 2**20
+
+
+def main():
+    print(f"{'clients':>8} {'pipeline':>9}", end="")
+    print("".join(f" {f'{step} (s)':>14}" for step in STEPS), end="")
+    print(f" {'total (s)':>10} {'peak (MB)':>10}")
+
+    rng = np.random.default_rng(2024)
+    for num_clients in NUM_CLIENTS:
+        clients = random_clients(num_clients)
+        valid = rng.random(num_clients) >= INVALID_SHARE
+        client_facilities = rng.integers(0, NUM_FACILITIES, num_clients)
+
+        for name, pipeline in (
+            ("list", list_pipeline),
+            ("batch", batch_pipeline),
+        ):
+            timings = pipeline(clients, valid, client_facilities)
+            peak = peak_memory_mb(pipeline, clients, valid, client_facilities)
+
+            print(f"{num_clients:>8} {name:>9}", end="")
+            print("".join(f" {timing:>14.3f}" for timing in timings), end="")
+            print(f" {sum(timings):>10.3f} {peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Client preparation time of solve requests referencing a stored client
+dataset vs. sending the clients in the request.
+
+A request sending its clients is decoded from JSON and its co-located
+clients are grouped on every solve. A request referencing a dataset only
+carries the facilities, the clients and their grouping being read from
+the dataset files, memory-mapped, on the first request after the dataset
+is opened, and from the open dataset afterwards. The clients are sent as
+the JSON parallel arrays, the fastest JSON format to decode.
+
+Usage: python -m benchmarks.bench_client_datasets
+"""
+
+import json
+import tempfile
+from typing import List
+
+from benchmarks.instances import random_clients, random_facilities, timer
+from src.api.v1.payload_formats import (
+    JSON_MEDIA_TYPE,
+    parse_assignment_request,
+)
+from src.models import ClientBatch
+from src.services import ClientDatasetStore, aggregate_colocated_clients
+
+NUM_CLIENTS = [100_000, 400_000]
+NUM_FACILITIES = 50
+
+
+def main():
+    print(f"{'clients':>8} {'upload (s)':>11} {'inline (s)':>11} ", end="")
+    print(f"{'dataset cold (s)':>17} {'dataset warm (s)':>17}")
+
+    for num_clients in NUM_CLIENTS:
+        clients = ClientBatch.from_clients(random_clients(num_clients))
+        request_fields = {
+            "totalDemand": num_clients,
+            "facilities": [
+                facility.model_dump(by_alias=True)
+                for facility in random_facilities(NUM_FACILITIES)
+            ],
+        }
+        inline_payload = json.dumps(
+            {
+                **request_fields,
+                "clients": {
+                    "id": clients.ids.tolist(),
+                    "lat": clients.lats.tolist(),
+                    "lng": clients.lngs.tolist(),
+                    "demand": clients.demands.tolist(),
+                },
+            }
+        ).encode()
+
+        with tempfile.TemporaryDirectory() as path:
+            timings: List[float] = []
+            with timer(timings):
+                dataset_id = (
+                    ClientDatasetStore(path=path).add(clients).dataset_id
+                )
+            dataset_payload = json.dumps(
+                {**request_fields, "datasetId": dataset_id}
+            ).encode()
+
+            with timer(timings):
+                request = parse_assignment_request(
+                    inline_payload, JSON_MEDIA_TYPE
+                )
+                aggregate_colocated_clients(request.clients or [])
+
+            store = ClientDatasetStore(path=path)
+            for _ in range(2):
+                with timer(timings):
+                    request = parse_assignment_request(
+                        dataset_payload, JSON_MEDIA_TYPE
+                    )
+                    store.get(request.dataset_id or "")
+
+        print(
+            f"{num_clients:>8} {timings[0]:>11.3f} {timings[1]:>11.3f} ",
+            end="",
+        )
+        print(f"{timings[2]:>17.3f} {timings[3]:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Size and decoding time of the solve request clients in each payload
+format, and size and encoding time of the solution in JSON and as a
+``.npz`` bundle.
+
+The clients are sent as JSON objects, as JSON parallel arrays, as a CSV
+text in the JSON request and as the arrays of a NumPy ``.npz`` bundle,
+each payload being decoded into the assignment request the solver
+receives.
+
+Usage: python -m benchmarks.bench_client_formats
+"""
+
+import io
+import json
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.instances import random_clients, random_facilities, timer
+from src.api.v1.payload_formats import (
+    JSON_MEDIA_TYPE,
+    NPZ_MEDIA_TYPE,
+    encode_solution,
+    parse_assignment_request,
+)
+from src.models import (
+    AssignedFacility,
+    AssignmentSolution,
+    ClientBatch,
+    SolutionStatus,
+)
+
+NUM_CLIENTS = [100_000, 1_000_000]
+NUM_FACILITIES = 50
+
+
+def request_payloads(num_clients: int) -> Dict[str, bytes]:
+    clients = ClientBatch.from_clients(random_clients(num_clients))
+    request_fields = {
+        "totalDemand": num_clients,
+        "facilities": [
+            facility.model_dump(by_alias=True)
+            for facility in random_facilities(NUM_FACILITIES)
+        ],
+    }
+    columns = {
+        "id": clients.ids.tolist(),
+        "lat": clients.lats.tolist(),
+        "lng": clients.lngs.tolist(),
+        "demand": clients.demands.tolist(),
+    }
+    csv_text = "id,lat,lng,demand\n" + "\n".join(
+        f"{client_id},{lat!r},{lng!r},{demand!r}"
+        for client_id, lat, lng, demand in zip(*columns.values())
+    )
+    bundle = io.BytesIO()
+    np.savez(
+        bundle,
+        request=np.array(json.dumps(request_fields)),
+        id=clients.ids.astype(str),
+        lat=clients.lats,
+        lng=clients.lngs,
+        demand=clients.demands,
+    )
+
+    return {
+        "json rows": json.dumps(
+            {**request_fields, "clients": clients.to_records()}
+        ).encode(),
+        "json columns": json.dumps(
+            {**request_fields, "clients": columns}
+        ).encode(),
+        "json csv": json.dumps(
+            {**request_fields, "clients": csv_text}
+        ).encode(),
+        "npz": bundle.getvalue(),
+    }
+
+
+def main():
+    print(f"{'clients':>8} {'payload':>21} {'size (MB)':>10} ", end="")
+    print(f"{'time (s)':>9}")
+
+    for num_clients in NUM_CLIENTS:
+        for name, payload in request_payloads(num_clients).items():
+            timings: List[float] = []
+            with timer(timings):
+                request = parse_assignment_request(
+                    body=payload,
+                    content_type=(
+                        NPZ_MEDIA_TYPE if name == "npz" else JSON_MEDIA_TYPE
+                    ),
+                )
+            assert len(request.clients) == num_clients
+
+            print(f"{num_clients:>8} {'request ' + name:>21} ", end="")
+            print(f"{len(payload) / 2**20:>10.1f} {timings[0]:>9.3f}")
+
+        client_facilities = np.arange(num_clients) % NUM_FACILITIES
+        solution = AssignmentSolution(
+            objective_value=1.0,
+            solution_status=SolutionStatus.OPTIMAL,
+            assigned_facilities=[
+                AssignedFacility(
+                    facility=facility,
+                    assigned_clients=request.clients[client_facilities == i],
+                )
+                for i, facility in enumerate(request.facilities)
+            ],
+        )
+        for name, accept in (
+            ("json", JSON_MEDIA_TYPE),
+            ("npz", NPZ_MEDIA_TYPE),
+        ):
+            timings = []
+            with timer(timings):
+                response = encode_solution(solution, accept=accept)
+
+            print(f"{num_clients:>8} {'response ' + name:>21} ", end="")
+            print(f"{len(response) / 2**20:>10.1f} {timings[0]:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Time and peak memory of the dispersed client subset of a service area,
+selected without the distance matrix vs. over the full matrix, and with
+the grid approximation for very large facilities.
+
+The full matrix selection reproduces the code the matrix-free one
+replaced, and is only run while the matrix fits in memory. Both select
+the same subset, as checked here. Peak memory is traced by
+``tracemalloc`` from another run.
+
+Usage: python -m benchmarks.bench_clients_dispersion
+"""
+
+import tracemalloc
+from typing import Callable, List
+
+import cost_matrix
+import numpy as np
+
+from benchmarks.instances import random_clients, timer
+from config import settings
+from src.models import ClientBatch
+from src.services import select_dispersed_points
+
+NUM_CLIENTS = [2_000, 6_000, 100_000, 400_000]
+MAX_FULL_MATRIX_CLIENTS = 6_000
+GRID_CELLS = 10_000
+SUBSET_SIZE = settings.DISPERSED_CLIENTS_SUBSET_SIZE
+
+
+def full_matrix_selection(coordinates: np.ndarray) -> np.ndarray:
+    distance_matrix = cost_matrix.spherical(coordinates, coordinates)
+    selected_indices = list(
+        np.unravel_index(distance_matrix.argmax(), distance_matrix.shape)
+    )
+    while len(selected_indices) < SUBSET_SIZE:
+        sub_distance_matrix = distance_matrix[selected_indices]
+        selected_indices.append(sub_distance_matrix.min(axis=0).argmax())
+
+    return np.array(selected_indices)
+
+
+def matrix_free_selection(coordinates: np.ndarray) -> np.ndarray:
+    return select_dispersed_points(coordinates, subset_size=SUBSET_SIZE)
+
+
+def grid_selection(coordinates: np.ndarray) -> np.ndarray:
+    return select_dispersed_points(
+        coordinates, subset_size=SUBSET_SIZE, max_exact_points=GRID_CELLS
+    )
+
+
+def peak_memory_mb(selection: Callable, coordinates: np.ndarray) -> float:
+    tracemalloc.start()
+    selection(coordinates)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak / 2**20
+
+
+def main():
+    print(f"{'clients':>8} {'selection':>12} {'time (s)':>9} ", end="")
+    print(f"{'peak (MB)':>10} {'min distance (m)':>17}")
+
+    for num_clients in NUM_CLIENTS:
+        coordinates = ClientBatch.from_clients(
+            random_clients(num_clients)
+        ).coordinates
+
+        selections = {
+            "matrix free": matrix_free_selection,
+            "grid": grid_selection,
+        }
+        if num_clients <= MAX_FULL_MATRIX_CLIENTS:
+            selections = {"full matrix": full_matrix_selection, **selections}
+
+        subsets = {}
+        for name, selection in selections.items():
+            timings: List[float] = []
+            with timer(timings):
+                subsets[name] = selection(coordinates)
+            peak = peak_memory_mb(selection, coordinates)
+
+            # Minimum distance between the selected clients
+            subset_coordinates = coordinates[subsets[name]]
+            distances = cost_matrix.spherical(
+                subset_coordinates, subset_coordinates
+            )
+            np.fill_diagonal(distances, np.inf)
+
+            print(f"{num_clients:>8} {name:>12} {timings[0]:>9.3f} ", end="")
+            print(f"{peak:>10.1f} {distances.min():>17.1f}")
+
+        if "full matrix" in subsets:
+            np.testing.assert_array_equal(
+                subsets["matrix free"], subsets["full matrix"]
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Cost matrix time of repeated solves, read from the cost matrix store vs.
+computed again.
+
+Spherical costs are computed in chunks. OSRM distances are read from a
+cost cache already holding every pair, so no request reaches the server,
+as on a repeated solve. The store time is that of a first solve writing
+the matrix, the read time that of a worker opening it, memory-mapped,
+on a later solve.
+
+Usage: python -m benchmarks.bench_cost_matrix_store
+"""
+
+import tempfile
+from typing import List
+from unittest.mock import patch
+
+import numpy as np
+
+from benchmarks.instances import random_clients, random_facilities, timer
+from src.models import ClientBatch, CostProblem, CostType
+from src.services import (
+    CostMatrixStore,
+    OSRMCostCache,
+    compute_screened_cost_matrix,
+    compute_spherical_costs,
+)
+
+COST_MATRIX_MODULE = "src.services.cost_calculator.cost_matrix"
+NUM_FACILITIES = 50
+INSTANCES = [
+    (CostType.SPHERICAL_DISTANCE, 100_000),
+    (CostType.SPHERICAL_DISTANCE, 400_000),
+    (CostType.OSRM_DISTANCE, 20_000),
+]
+
+
+def main():
+    print(f"{'cost type':>19} {'clients':>8} {'compute (s)':>12} ", end="")
+    print(f"{'store (s)':>10} {'read (s)':>9}")
+
+    for cost_type, num_clients in INSTANCES:
+        cost_problem = CostProblem(
+            clients=ClientBatch.from_clients(random_clients(num_clients)),
+            facilities=random_facilities(NUM_FACILITIES),
+            cost_type=cost_type,
+        )
+
+        # Cost cache holding every pair, with road distances a bit longer
+        # than the spherical ones
+        osrm_cost_cache = OSRMCostCache(path=":memory:")
+        if cost_type != CostType.SPHERICAL_DISTANCE:
+            sources = np.array(
+                [
+                    (facility.lat, facility.lng)
+                    for facility in cost_problem.facilities
+                ]
+            )
+            destinations = cost_problem.clients.coordinates
+            distances = 1.3 * compute_spherical_costs(
+                sources=sources,
+                destinations=destinations,
+                dtype=np.dtype(np.float64),
+            )
+            osrm_cost_cache.put(
+                sources=sources,
+                destinations=destinations,
+                costs=np.stack((distances, 1.5 * distances / 20)),
+                cost_types=("distances", "durations"),
+            )
+
+        with tempfile.TemporaryDirectory() as path, patch(
+            f"{COST_MATRIX_MODULE}.osrm_cost_cache", osrm_cost_cache
+        ):
+            timings: List[float] = []
+            with timer(timings):
+                costs, surrogate = compute_screened_cost_matrix(cost_problem)
+            with timer(timings):
+                CostMatrixStore(path=path).put(
+                    cost_problem, costs=costs, surrogate=surrogate
+                )
+            with timer(timings):
+                stored_costs = CostMatrixStore(path=path).get(cost_problem)
+
+        assert stored_costs is not None
+        np.testing.assert_array_equal(stored_costs[0], costs)
+
+        print(f"{cost_type.name:>19} {num_clients:>8} ", end="")
+        print(f"{timings[0]:>12.3f} {timings[1]:>10.3f} {timings[2]:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
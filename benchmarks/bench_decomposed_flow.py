@@ -0,0 +1,97 @@
+"""
+Solve time and optimality gap of the decomposed Min Cost Flow solver.
+
+Compares splitting the facilities into spatial regions, solved in a
+process pool on every core and coupled by solves over the border clients,
+with solving the monolithic Min Cost Flow model over the nearest
+facilities of each client. The decomposition runs with the default limit
+of coupling rounds, reporting its gap, and until proven optimal.
+
+Usage: python -m benchmarks.bench_decomposed_flow
+"""
+
+import os
+from typing import List
+
+from benchmarks.instances import random_assignment_problem, timer
+from src.services import (
+    cluster_facilities,
+    locate_clients_in_exclusive_areas,
+    solve_decomposed_flow_model,
+)
+from src.services.assignment_solver.flow_assignment_formulation import (
+    build_flow_network,
+    select_candidate_arcs,
+    solve_mcf_model,
+)
+
+INSTANCE_SIZES = [(50_000, 20), (100_000, 40), (200_000, 80)]
+NUM_REGIONS = 4
+NUM_CANDIDATE_FACILITIES = 5
+
+
+def main():
+    print(f"workers: {os.cpu_count()}, regions: {NUM_REGIONS}")
+    print(f"{'clients':>8} {'facilities':>10} {'monolithic (s)':>15} ", end="")
+    print(f"{'limited (s)':>12} {'gap (%)':>8} {'exact (s)':>10}")
+
+    for num_clients, num_facilities in INSTANCE_SIZES:
+        assignment_problem = random_assignment_problem(
+            num_clients, num_facilities
+        )
+        network = build_flow_network(
+            assignment_problem=assignment_problem,
+            client_exclusive_facilities=locate_clients_in_exclusive_areas(
+                clients=assignment_problem.clients,
+                facilities=assignment_problem.facilities,
+            ),
+        )
+
+        monolithic_timings: List[float] = []
+        with timer(monolithic_timings):
+            result = solve_mcf_model(
+                network=network,
+                candidate_arcs=select_candidate_arcs(
+                    network=network,
+                    num_candidate_facilities=NUM_CANDIDATE_FACILITIES,
+                ),
+            )
+        monolithic_cost = result.model.optimal_cost()
+        del result
+
+        facility_regions = cluster_facilities(
+            facilities=assignment_problem.facilities,
+            num_regions=NUM_REGIONS,
+        )
+        del assignment_problem
+
+        limited_timings: List[float] = []
+        with timer(limited_timings):
+            limited_solution = solve_decomposed_flow_model(
+                network=network, facility_regions=facility_regions
+            )
+
+        exact_timings: List[float] = []
+        with timer(exact_timings):
+            solve_decomposed_flow_model(
+                network=network,
+                facility_regions=facility_regions,
+                max_coupling_rounds=0,
+            )
+
+        gap = float("nan")
+        if limited_solution is not None:
+            gap = (
+                100
+                * (limited_solution.cost - monolithic_cost)
+                / monolithic_cost
+            )
+        print(
+            f"{num_clients:>8} {num_facilities:>10} "
+            f"{monolithic_timings[0]:>15.3f} {limited_timings[0]:>12.3f} "
+            f"{gap:>8.3f} {exact_timings[0]:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
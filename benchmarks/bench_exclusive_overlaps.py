@@ -0,0 +1,93 @@
+"""
+Time of the removal of the exclusive areas of other facilities from the
+service areas vs. number of facilities.
+
+The previous evaluation intersected every exclusive area with every
+other service area and subtracted each non-empty intersection in turn,
+m² intersections for m facilities. The indexed removal queries an
+STRtree of the prepared exclusive areas for the ones whose bounding
+boxes meet each service area and subtracts their union once per service
+area. Each facility gets a service area of a few hundred vertices
+around it, and half of them an exclusive area.
+
+Usage: python -m benchmarks.bench_exclusive_overlaps
+"""
+
+from typing import List
+
+import numpy as np
+from shapely import MultiPolygon, Point
+
+from benchmarks.instances import random_facilities, timer
+from src.services import remove_exclusive_area_overlaps
+
+NUM_FACILITIES = [100, 300, 600]
+SERVICE_AREA_RADIUS = 0.05
+EXCLUSIVE_AREA_RADIUS = 0.02
+
+
+def pairwise_removal(
+    service_areas: List[MultiPolygon], exclusive_areas: List[MultiPolygon]
+) -> list:
+    service_areas = list(service_areas)
+    for i, exclusive_area in enumerate(exclusive_areas):
+        if exclusive_area.is_empty:
+            continue
+        for j, service_area in enumerate(service_areas):
+            if i == j or service_area.is_empty:
+                continue
+            intersection = exclusive_area.intersection(service_area)
+            if not intersection.is_empty:
+                service_areas[j] = service_area.difference(intersection)
+
+    return service_areas
+
+
+def main():
+    print(f"{'facilities':>10} {'pairwise (s)':>13} {'indexed (s)':>12}")
+
+    for num_facilities in NUM_FACILITIES:
+        facilities = random_facilities(num_facilities)
+        service_areas = [
+            MultiPolygon(
+                [
+                    Point(facility.lng, facility.lat).buffer(
+                        SERVICE_AREA_RADIUS, 64
+                    )
+                ]
+            )
+            for facility in facilities
+        ]
+        exclusive_areas = [
+            (
+                MultiPolygon(
+                    [
+                        Point(facility.lng, facility.lat).buffer(
+                            EXCLUSIVE_AREA_RADIUS
+                        )
+                    ]
+                )
+                if i % 2 == 0
+                else MultiPolygon()
+            )
+            for i, facility in enumerate(facilities)
+        ]
+
+        timings: List[float] = []
+        with timer(timings):
+            previous_areas = pairwise_removal(service_areas, exclusive_areas)
+        with timer(timings):
+            new_areas = remove_exclusive_area_overlaps(
+                service_areas, exclusive_areas
+            )
+        assert np.allclose(
+            [area.area for area in new_areas],
+            [area.area for area in previous_areas],
+        )
+
+        print(f"{num_facilities:>10} {timings[0]:>13.3f} ", end="")
+        print(f"{timings[1]:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
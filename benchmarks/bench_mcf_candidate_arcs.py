@@ -0,0 +1,72 @@
+"""
+Solve time and arc count of the Min Cost Flow model with candidate arcs.
+
+Compares solving the full client x facility network with solving a network
+restricted to the nearest facilities of each client, priced out with the
+node potentials until no left out arc has a negative reduced cost.
+
+Usage: python -m benchmarks.bench_mcf_candidate_arcs
+"""
+
+from typing import List
+
+from benchmarks.instances import random_assignment_problem, timer
+from src.services import locate_clients_in_exclusive_areas
+from src.services.assignment_solver.flow_assignment_formulation import (
+    build_flow_network,
+    select_candidate_arcs,
+    solve_mcf_model,
+)
+
+INSTANCE_SIZES = [(10_000, 20), (50_000, 40), (100_000, 40)]
+NUM_CANDIDATE_FACILITIES = 5
+
+
+def main():
+    print(f"{'clients':>8} {'facilities':>10} {'dense arcs':>11} ", end="")
+    print(f"{'sparse arcs':>12} {'dense (s)':>10} {'sparse (s)':>11} ", end="")
+    print(f"{'same cost':>10}")
+
+    for num_clients, num_facilities in INSTANCE_SIZES:
+        assignment_problem = random_assignment_problem(
+            num_clients, num_facilities
+        )
+        network = build_flow_network(
+            assignment_problem=assignment_problem,
+            client_exclusive_facilities=locate_clients_in_exclusive_areas(
+                clients=assignment_problem.clients,
+                facilities=assignment_problem.facilities,
+            ),
+        )
+
+        dense_timings: List[float] = []
+        with timer(dense_timings):
+            dense_result = solve_mcf_model(
+                network=network, candidate_arcs=network.eligible
+            )
+
+        sparse_timings: List[float] = []
+        with timer(sparse_timings):
+            sparse_result = solve_mcf_model(
+                network=network,
+                candidate_arcs=select_candidate_arcs(
+                    network=network,
+                    num_candidate_facilities=NUM_CANDIDATE_FACILITIES,
+                ),
+            )
+
+        same_cost = (
+            dense_result.model.optimal_cost()
+            == sparse_result.model.optimal_cost()
+        )
+        print(
+            f"{num_clients:>8} {num_facilities:>10} "
+            f"{dense_result.model.num_arcs():>11} "
+            f"{sparse_result.model.num_arcs():>12} "
+            f"{dense_timings[0]:>10.3f} {sparse_timings[0]:>11.3f} "
+            f"{str(same_cost):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
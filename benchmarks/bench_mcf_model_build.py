@@ -0,0 +1,89 @@
+"""
+Build time of the Min Cost Flow model against instance size.
+
+Compares the vectorized builder, which loads the arcs with the bulk
+OR-Tools APIs, with the former approach of adding one arc per call.
+
+Usage: python -m benchmarks.bench_mcf_model_build
+"""
+
+from typing import List
+
+import numpy as np
+from ortools.graph.python import min_cost_flow
+
+from benchmarks.instances import random_assignment_problem, timer
+from config import settings
+from src.services import (
+    locate_clients_in_exclusive_areas,
+    scale_assignment_problem_parameters,
+)
+from src.services.assignment_solver.flow_assignment_formulation import (
+    _build_mcf_model,
+    build_flow_network,
+)
+
+INSTANCE_SIZES = [(1_000, 10), (10_000, 20), (50_000, 40)]
+
+
+def _build_mcf_model_per_arc(assignment_problem):
+    """Former builder: one pybind call per node and per arc"""
+
+    model = min_cost_flow.SimpleMinCostFlow()
+    supplies, _, _, scaled_cost_matrix = scale_assignment_problem_parameters(
+        assignment_problem=assignment_problem,
+        scale_factor=settings.MCF_SCALE_FACTOR,
+    )
+    num_clients = supplies.size
+    for j, supply in enumerate(supplies):
+        model.set_node_supply(j, supply)
+    for j in range(num_clients):
+        for i in range(len(assignment_problem.facilities)):
+            model.add_arc_with_capacity_and_unit_cost(
+                tail=j,
+                head=num_clients + i,
+                capacity=supplies[j],
+                unit_cost=scaled_cost_matrix[i][j],
+            )
+
+    return model
+
+
+def main():
+    print(f"{'clients':>8} {'facilities':>10} {'arcs':>10} ", end="")
+    print(f"{'per arc (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+
+    for num_clients, num_facilities in INSTANCE_SIZES:
+        assignment_problem = random_assignment_problem(
+            num_clients, num_facilities
+        )
+
+        per_arc_timings: List[float] = []
+        with timer(per_arc_timings):
+            _build_mcf_model_per_arc(assignment_problem)
+
+        vectorized_timings: List[float] = []
+        with timer(vectorized_timings):
+            network = build_flow_network(
+                assignment_problem=assignment_problem,
+                client_exclusive_facilities=(
+                    locate_clients_in_exclusive_areas(
+                        clients=assignment_problem.clients,
+                        facilities=assignment_problem.facilities,
+                    )
+                ),
+            )
+            model, _, _ = _build_mcf_model(
+                network=network, arcs_mask=network.eligible
+            )
+
+        per_arc, vectorized = per_arc_timings[0], vectorized_timings[0]
+        print(
+            f"{num_clients:>8} {num_facilities:>10} {model.num_arcs():>10} "
+            f"{per_arc:>12.3f} {vectorized:>15.3f} "
+            f"{per_arc / np.maximum(vectorized, 1e-9):>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Solution extraction time of the Min Cost Flow solver against instance size.
+
+Compares reading the flows with the bulk ``flows`` API and grouping the
+clients with NumPy with the former loop calling ``head``, ``tail`` and
+``flow`` once per arc.
+
+Usage: python -m benchmarks.bench_mcf_solution_extraction
+"""
+
+from typing import Dict, List
+
+from benchmarks.instances import random_assignment_problem, timer
+from src.services import (
+    group_clients_by_facility,
+    locate_clients_in_exclusive_areas,
+)
+from src.services.assignment_solver.flow_assignment_formulation import (
+    _build_mcf_model,
+    build_flow_network,
+    extract_client_facilities,
+)
+
+INSTANCE_SIZES = [(1_000, 10), (10_000, 20), (50_000, 20), (100_000, 20)]
+
+
+def _extract_assignments_per_arc(model, num_clients, num_facilities):
+    """Former extraction: one pybind call per arc and per attribute"""
+
+    terminal_node = num_clients + num_facilities
+    assignments: Dict[int, List[int]] = {i: [] for i in range(num_facilities)}
+    for arc in range(model.num_arcs()):
+        if model.head(arc) != terminal_node and model.flow(arc) > 0:
+            assignments[model.head(arc) - num_clients].append(model.tail(arc))
+
+    return assignments
+
+
+def main():
+    print(f"{'clients':>8} {'facilities':>10} {'arcs':>10} ", end="")
+    print(f"{'per arc (s)':>12} {'bulk (s)':>10} {'speedup':>8}")
+
+    for num_clients, num_facilities in INSTANCE_SIZES:
+        assignment_problem = random_assignment_problem(
+            num_clients, num_facilities
+        )
+        network = build_flow_network(
+            assignment_problem=assignment_problem,
+            client_exclusive_facilities=locate_clients_in_exclusive_areas(
+                clients=assignment_problem.clients,
+                facilities=assignment_problem.facilities,
+            ),
+        )
+        model, arc_clients, arc_facilities = _build_mcf_model(
+            network=network, arcs_mask=network.eligible
+        )
+        model.solve()
+
+        per_arc_timings: List[float] = []
+        with timer(per_arc_timings):
+            _extract_assignments_per_arc(model, num_clients, num_facilities)
+
+        bulk_timings: List[float] = []
+        with timer(bulk_timings):
+            client_facilities = extract_client_facilities(
+                model=model,
+                arc_clients=arc_clients,
+                arc_facilities=arc_facilities,
+                num_clients=num_clients,
+            )
+            group_clients_by_facility(client_facilities, num_facilities)
+
+        per_arc, bulk = per_arc_timings[0], bulk_timings[0]
+        print(
+            f"{num_clients:>8} {num_facilities:>10} {model.num_arcs():>10} "
+            f"{per_arc:>12.3f} {bulk:>10.3f} {per_arc / bulk:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Min Cost Flow re-solve time after a small change, cold vs. warm started.
+
+One percent of the clients of a solved instance are replaced by new ones,
+then the changed network is solved from scratch over every arc and warm
+started from the arcs of the previous assignments, pricing in the rest.
+
+Usage: python -m benchmarks.bench_mcf_warm_start
+"""
+
+from typing import List
+
+import numpy as np
+
+from benchmarks.instances import (
+    random_assignment_problem,
+    random_clients,
+    timer,
+)
+from src.models import ClientBatch, CostProblem
+from src.services import compute_cost_matrix
+from src.services.assignment_solver.flow_assignment_formulation import (
+    build_flow_network,
+    extract_client_facilities,
+    select_warm_start_arcs,
+    solve_mcf_model,
+)
+
+INSTANCE_SIZES = [(10_000, 20), (50_000, 40), (100_000, 40)]
+CHANGED_SHARE = 0.01
+
+
+def main():
+    print(f"{'clients':>8} {'facilities':>10} {'changed':>8} ", end="")
+    print(f"{'cold (s)':>9} {'warm (s)':>9} {'same cost':>10}")
+
+    for num_clients, num_facilities in INSTANCE_SIZES:
+        assignment_problem = random_assignment_problem(
+            num_clients, num_facilities
+        )
+        no_exclusive_areas = np.full(num_clients, -1)
+        network = build_flow_network(
+            assignment_problem=assignment_problem,
+            client_exclusive_facilities=no_exclusive_areas,
+        )
+        result = solve_mcf_model(
+            network=network, candidate_arcs=network.eligible
+        )
+        client_facilities = extract_client_facilities(
+            model=result.model,
+            arc_clients=result.arc_clients,
+            arc_facilities=result.arc_facilities,
+            num_clients=num_clients,
+        )
+
+        # Replace the first clients by new ones, keeping the total demand
+        num_changed = int(CHANGED_SHARE * num_clients)
+        clients = assignment_problem.clients
+        new_clients = ClientBatch.from_clients(
+            random_clients(num_changed, seed=7)
+        )
+        clients.ids[:num_changed] = new_clients.ids
+        clients.lats[:num_changed] = new_clients.lats
+        clients.lngs[:num_changed] = new_clients.lngs
+        assignment_problem.cost_matrix[:, :num_changed] = compute_cost_matrix(
+            CostProblem(
+                clients=clients[:num_changed],
+                facilities=assignment_problem.facilities,
+            )
+        )
+        client_facilities[:num_changed] = -1
+        network = build_flow_network(
+            assignment_problem=assignment_problem,
+            client_exclusive_facilities=no_exclusive_areas,
+        )
+
+        cold_timings: List[float] = []
+        with timer(cold_timings):
+            cold_result = solve_mcf_model(
+                network=network, candidate_arcs=network.eligible
+            )
+
+        warm_timings: List[float] = []
+        with timer(warm_timings):
+            warm_result = solve_mcf_model(
+                network=network,
+                candidate_arcs=select_warm_start_arcs(
+                    network=network,
+                    initial_client_facilities=client_facilities,
+                    num_candidate_facilities=0,
+                ),
+            )
+
+        same_cost = (
+            cold_result.model.optimal_cost()
+            == warm_result.model.optimal_cost()
+        )
+        print(
+            f"{num_clients:>8} {num_facilities:>10} {num_changed:>8} "
+            f"{cold_timings[0]:>9.3f} {warm_timings[0]:>9.3f} "
+            f"{str(same_cost):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
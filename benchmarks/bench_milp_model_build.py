@@ -0,0 +1,67 @@
+"""
+Build time of the MILP model against instance size.
+
+Compares building the Pyomo model and translating it to HiGHS through
+appsi with assembling the constraint matrix with NumPy and passing it
+straight to HiGHS.
+
+Usage: python -m benchmarks.bench_milp_model_build
+"""
+
+from typing import List
+
+from pyomo.contrib import appsi
+
+from benchmarks.instances import random_assignment_problem, timer
+from src.models import AlgorithmType
+from src.services import locate_clients_in_exclusive_areas
+from src.services.assignment_solver.highs_milp_assignment_formulation import (
+    _build_highs_milp_model,
+)
+from src.services.assignment_solver.milp_assignment_formulation import (
+    _build_milp_model,
+)
+
+INSTANCE_SIZES = [(1_000, 10), (5_000, 20), (20_000, 30)]
+
+
+def main():
+    print(f"{'clients':>8} {'facilities':>10} {'binaries':>10} ", end="")
+    print(f"{'pyomo (s)':>10} {'native (s)':>11} {'speedup':>8}")
+
+    for num_clients, num_facilities in INSTANCE_SIZES:
+        assignment_problem = random_assignment_problem(
+            num_clients,
+            num_facilities,
+            algorithm=AlgorithmType.MILP_FORMULATION,
+        )
+        client_exclusive_facilities = locate_clients_in_exclusive_areas(
+            clients=assignment_problem.clients,
+            facilities=assignment_problem.facilities,
+        )
+
+        pyomo_timings: List[float] = []
+        with timer(pyomo_timings):
+            model = _build_milp_model(
+                assignment_problem=assignment_problem,
+                client_exclusive_facilities=client_exclusive_facilities,
+            )
+            appsi.solvers.Highs().set_instance(model)
+
+        native_timings: List[float] = []
+        with timer(native_timings):
+            _build_highs_milp_model(
+                assignment_problem=assignment_problem,
+                client_exclusive_facilities=client_exclusive_facilities,
+            )
+
+        pyomo, native = pyomo_timings[0], native_timings[0]
+        print(
+            f"{num_clients:>8} {num_facilities:>10} "
+            f"{num_clients * num_facilities:>10} "
+            f"{pyomo:>10.3f} {native:>11.3f} {pyomo / native:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+OSRM cost matrix fetch time against the number of ``/table`` batches.
+
+Compares the sequential ``cost_matrix.osrm`` requests, one new connection
+per batch, with the concurrent fetching over a pooled session, against a
+local fake OSRM server answering each batch after a fixed latency, as a
+remote server would.
+
+Usage: python -m benchmarks.bench_osrm_concurrency
+"""
+
+from typing import List
+
+import cost_matrix
+import numpy as np
+
+from benchmarks.instances import MAX_LAT, MAX_LNG, MIN_LAT, MIN_LNG, timer
+from src.services import fetch_osrm_costs
+from tests.fake_osrm_server import FakeOSRMServer
+
+LATENCY_SECONDS = 0.05
+BATCH_SIZE = 50
+NUM_FACILITIES = 20
+NUM_CLIENTS = [100, 400, 1_600, 3_200]
+MAX_WORKERS = [4, 8, 16]
+
+
+def _random_coordinates(num_points: int, rng: np.random.Generator):
+    return np.column_stack(
+        (
+            rng.uniform(MIN_LAT, MAX_LAT, num_points),
+            rng.uniform(MIN_LNG, MAX_LNG, num_points),
+        )
+    )
+
+
+def main():
+    print(f"{'clients':>8} {'batches':>8} {'sequential (s)':>15}", end="")
+    for max_workers in MAX_WORKERS:
+        print(f" {f'{max_workers} workers (s)':>15}", end="")
+    print()
+
+    rng = np.random.default_rng(2024)
+    sources = _random_coordinates(NUM_FACILITIES, rng)
+    with FakeOSRMServer(latency_seconds=LATENCY_SECONDS) as server:
+        for num_clients in NUM_CLIENTS:
+            destinations = _random_coordinates(num_clients, rng)
+            num_batches = -(-num_clients // BATCH_SIZE)
+
+            timings: List[float] = []
+            with timer(timings):
+                expected = cost_matrix.osrm(
+                    sources,
+                    destinations,
+                    server_address=server.address,
+                    batch_size=BATCH_SIZE,
+                )
+            for max_workers in MAX_WORKERS:
+                with timer(timings):
+                    costs = fetch_osrm_costs(
+                        sources,
+                        destinations,
+                        server_address=server.address,
+                        batch_size=BATCH_SIZE,
+                        max_workers=max_workers,
+                    )
+                assert np.allclose(costs, expected)
+
+            print(f"{num_clients:>8} {num_batches:>8}", end="")
+            print("".join(f" {timing:>15.3f}" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
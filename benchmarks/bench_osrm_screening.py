@@ -0,0 +1,123 @@
+"""
+OSRM traffic and solve time of dispersed instances with and without the
+spherical lower-bound screening of far away pairs.
+
+Clients and facilities are spread around cities hundreds of kilometers
+apart, the facilities of some cities lacking the capacity to serve all of
+their clients. Each request is solved end to end, against a local fake
+OSRM server with a fixed latency and an empty cost cache, reporting the
+requests and pairs sent to the server and the objective value.
+
+Usage: python -m benchmarks.bench_osrm_screening
+"""
+
+from typing import List
+from unittest.mock import patch
+
+import numpy as np
+
+from benchmarks.instances import timer
+from config import settings
+from src.models import (
+    AssignmentRequest,
+    ClientBatch,
+    Facility,
+    ObjectiveType,
+)
+from src.services import (
+    OSRMCostCache,
+    fetch_osrm_costs,
+    solve_facility_assignment,
+)
+from tests.fake_osrm_server import FakeOSRMServer
+
+COST_MATRIX_MODULE = "src.services.cost_calculator.cost_matrix"
+LATENCY_SECONDS = 0.02
+FACILITIES_PER_CITY = 4
+INSTANCE_SIZES = [(4, 2_000), (8, 4_000), (16, 8_000)]
+
+
+def dispersed_request(num_cities: int, num_clients: int) -> AssignmentRequest:
+    """Clients and facilities around cities spread over southeast Brazil,
+    the facilities of every other city serving at most 80% of its clients"""
+
+    rng = np.random.default_rng(2024)
+    cities = np.column_stack(
+        (
+            rng.uniform(-25.0, -15.0, num_cities),
+            rng.uniform(-50.0, -40.0, num_cities),
+        )
+    )
+    client_cities = rng.integers(0, num_cities, num_clients)
+    client_coordinates = cities[client_cities] + rng.uniform(
+        -0.15, 0.15, (num_clients, 2)
+    )
+    clients = ClientBatch(
+        ids=np.arange(num_clients).astype(str),
+        lats=client_coordinates[:, 0],
+        lngs=client_coordinates[:, 1],
+    )
+
+    city_demands = np.bincount(client_cities, minlength=num_cities)
+    facilities = [
+        Facility(
+            id=f"{k}-{i}",
+            name=f"FC{k}-{i}",
+            lat=lat + rng.uniform(-0.1, 0.1),
+            lng=lng + rng.uniform(-0.1, 0.1),
+            max_demand=int(
+                city_demands[k] * (0.8 if k % 2 else 2) / FACILITIES_PER_CITY
+            ),
+        )
+        for k, (lat, lng) in enumerate(cities)
+        for i in range(FACILITIES_PER_CITY)
+    ]
+
+    return AssignmentRequest(
+        total_demand=num_clients,
+        clients=clients,
+        facilities=facilities,
+        objective=ObjectiveType.MIN_TRAVEL_DISTANCE,
+    )
+
+
+def main():
+    print(f"{'facilities':>10} {'clients':>8} {'screening':>10} ", end="")
+    print(f"{'requests':>9} {'pairs':>10} {'time (s)':>9} {'objective':>12}")
+
+    with FakeOSRMServer(latency_seconds=LATENCY_SECONDS) as server:
+
+        def fetch_fake_osrm_costs(**kwargs):
+            kwargs["server_address"] = server.address
+            return fetch_osrm_costs(**kwargs)
+
+        for num_cities, num_clients in INSTANCE_SIZES:
+            request = dispersed_request(num_cities, num_clients)
+            for screening in (False, True):
+                settings.OSRM_SCREENING = screening
+                server.requested_paths.clear()
+                server.num_requested_pairs = 0
+
+                timings: List[float] = []
+                with patch(
+                    f"{COST_MATRIX_MODULE}.osrm_cost_cache",
+                    OSRMCostCache(path=":memory:"),
+                ), patch(
+                    f"{COST_MATRIX_MODULE}.fetch_osrm_costs",
+                    fetch_fake_osrm_costs,
+                ), timer(
+                    timings
+                ):
+                    solution = solve_facility_assignment(request)
+
+                print(
+                    f"{len(request.facilities):>10} {num_clients:>8} "
+                    f"{str(screening):>10} "
+                    f"{len(server.requested_paths):>9} "
+                    f"{server.num_requested_pairs:>10} "
+                    f"{timings[0]:>9.3f} {solution.objective_value:>12}"
+                )
+
+
+if __name__ == "__main__":
+    main()
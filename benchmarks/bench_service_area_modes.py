@@ -0,0 +1,86 @@
+"""
+Time and coverage of the service areas of the evaluation of assigned
+facilities vs. number of facilities, built as alpha shapes, as
+Voronoi territories and as hexagonal grid cells.
+
+Each facility is assigned the clients of its Voronoi cell among random
+clients, 1,000 per facility. The coverage is the share of the convex
+hull of the clients covered by some service area, the gaps between the
+alpha shapes being left uncovered, and the overlap the share covered by
+more than one. Both modes run in this process.
+
+Usage: python -m benchmarks.bench_service_area_modes
+"""
+
+from typing import List
+
+import numpy as np
+import shapely
+
+from benchmarks.instances import random_clients, random_facilities, timer
+from src.models import AssignedFacility, ClientBatch, ServiceAreaType
+from src.services import evaluate_assigned_facilities
+
+NUM_FACILITIES = [10, 25, 50]
+CLIENTS_PER_FACILITY = 1_000
+
+
+def main():
+    print(f"{'facilities':>10} {'mode':>12} {'time (s)':>9} ", end="")
+    print(f"{'coverage':>9} {'overlap':>8}")
+
+    for num_facilities in NUM_FACILITIES:
+        clients = ClientBatch.from_clients(
+            random_clients(num_facilities * CLIENTS_PER_FACILITY)
+        )
+        facilities = random_facilities(num_facilities)
+        facility_coordinates = np.array(
+            [(facility.lat, facility.lng) for facility in facilities]
+        )
+        client_facilities = (
+            (
+                (
+                    clients.coordinates[:, None, :]
+                    - facility_coordinates[None, :, :]
+                )
+                ** 2
+            )
+            .sum(axis=2)
+            .argmin(axis=1)
+        )
+        assigned_facilities = [
+            AssignedFacility(
+                facility=facility,
+                assigned_clients=clients[client_facilities == i],
+            )
+            for i, facility in enumerate(facilities)
+        ]
+        region = shapely.convex_hull(
+            shapely.multipoints(np.column_stack((clients.lngs, clients.lats)))
+        )
+
+        for service_area_type in ServiceAreaType:
+            timings: List[float] = []
+            with timer(timings):
+                evaluated_facilities = evaluate_assigned_facilities(
+                    assigned_facilities,
+                    max_workers=1,
+                    service_area_type=service_area_type,
+                )
+            service_areas = [
+                facility.service_area for facility in evaluated_facilities
+            ]
+            union = shapely.union_all(service_areas)
+            coverage = union.intersection(region).area / region.area
+            overlap = (
+                max(sum(area.area for area in service_areas) - union.area, 0.0)
+                / region.area
+            )
+
+            print(f"{num_facilities:>10} ", end="")
+            print(f"{service_area_type.name.lower():>12} ", end="")
+            print(f"{timings[0]:>9.3f} {coverage:>9.3f} {overlap:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
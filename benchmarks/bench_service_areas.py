@@ -0,0 +1,82 @@
+"""
+Service area time of the evaluation of assigned facilities vs. number of
+facilities, with the service areas computed in a process pool of 1, 2
+and 4 workers.
+
+Each facility is assigned the clients of its Voronoi cell among random
+clients, 1,000 per facility, and the evaluation computes the dispersed
+subset and the alpha shape of each one. Speedups are bounded by the
+number of cores of the machine, printed first.
+
+Usage: python -m benchmarks.bench_service_areas
+"""
+
+import os
+from typing import List
+
+import numpy as np
+
+from benchmarks.instances import random_clients, random_facilities, timer
+from src.models import AssignedFacility, ClientBatch
+from src.services import evaluate_assigned_facilities
+
+NUM_FACILITIES = [10, 25, 50]
+CLIENTS_PER_FACILITY = 1_000
+NUM_WORKERS = [1, 2, 4]
+
+
+def main():
+    print(f"cores: {os.cpu_count()}")
+    print(f"{'facilities':>10}", end="")
+    print("".join(f" {f'{n} workers (s)':>15}" for n in NUM_WORKERS))
+
+    for num_facilities in NUM_FACILITIES:
+        clients = ClientBatch.from_clients(
+            random_clients(num_facilities * CLIENTS_PER_FACILITY)
+        )
+        facilities = random_facilities(num_facilities)
+        facility_coordinates = np.array(
+            [(facility.lat, facility.lng) for facility in facilities]
+        )
+        client_facilities = (
+            (
+                (
+                    clients.coordinates[:, None, :]
+                    - facility_coordinates[None, :, :]
+                )
+                ** 2
+            )
+            .sum(axis=2)
+            .argmin(axis=1)
+        )
+        assigned_facilities = [
+            AssignedFacility(
+                facility=facility,
+                assigned_clients=clients[client_facilities == i],
+            )
+            for i, facility in enumerate(facilities)
+        ]
+
+        timings: List[float] = []
+        service_areas = []
+        for num_workers in NUM_WORKERS:
+            with timer(timings):
+                evaluated_facilities = evaluate_assigned_facilities(
+                    assigned_facilities,
+                    max_workers=num_workers,
+                    parallel_min_clients=0,
+                )
+            service_areas.append(
+                [
+                    facility.service_area.wkb
+                    for facility in evaluated_facilities
+                ]
+            )
+        assert all(areas == service_areas[0] for areas in service_areas)
+
+        print(f"{num_facilities:>10}", end="")
+        print("".join(f" {timing:>15.3f}" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
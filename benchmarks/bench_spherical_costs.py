@@ -0,0 +1,87 @@
+"""
+Time and peak memory of the spherical cost matrix against instance size.
+
+Compares the former path, which computes the full float64 matrix with
+``cost_matrix.spherical`` and then weights it by the client demands, with
+the chunked engine writing the weighted costs straight into the output,
+in float64 and float32, and writing scaled integer unit costs into a
+preallocated buffer, as the flow formulations use them.
+
+Usage: python -m benchmarks.bench_spherical_costs
+"""
+
+import tracemalloc
+from typing import Callable, List, Tuple
+
+import cost_matrix
+import numpy as np
+
+from benchmarks.instances import MAX_LAT, MAX_LNG, MIN_LAT, MIN_LNG, timer
+from config import settings
+from src.services import compute_spherical_costs
+
+INSTANCE_SIZES = [(20, 100_000), (40, 250_000), (40, 500_000)]
+
+
+def _random_coordinates(num_points: int, rng: np.random.Generator):
+    return np.column_stack(
+        (
+            rng.uniform(MIN_LAT, MAX_LAT, num_points),
+            rng.uniform(MIN_LNG, MAX_LNG, num_points),
+        )
+    )
+
+
+def _measure(function: Callable[[], np.ndarray]) -> Tuple[float, float]:
+    """Wall time, in seconds, and peak traced memory, in MB, of a call"""
+
+    timings: List[float] = []
+    tracemalloc.start()
+    with timer(timings):
+        function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return timings[0], peak / 2**20
+
+
+def main():
+    print(f"{'facilities':>10} {'clients':>8} {'matrix (MB)':>12} ", end="")
+    print(f"{'path':>16} {'time (s)':>9} {'peak (MB)':>10}")
+
+    rng = np.random.default_rng(2024)
+    for num_facilities, num_clients in INSTANCE_SIZES:
+        sources = _random_coordinates(num_facilities, rng)
+        destinations = _random_coordinates(num_clients, rng)
+        demands = rng.integers(1, 10, num_clients)
+        matrix_size = 8 * num_facilities * num_clients / 2**20
+        scaled_unit_costs = np.empty(
+            (num_facilities, num_clients), dtype=np.int64
+        )
+
+        paths = {
+            "former": lambda: demands
+            * cost_matrix.spherical(sources, destinations),
+            "chunked float64": lambda: compute_spherical_costs(
+                sources, destinations, weights=demands, dtype=np.float64
+            ),
+            "chunked float32": lambda: compute_spherical_costs(
+                sources, destinations, weights=demands, dtype=np.float32
+            ),
+            "scaled int64": lambda: compute_spherical_costs(
+                sources,
+                destinations,
+                scale_factor=settings.MCF_SCALE_FACTOR,
+                out=scaled_unit_costs,
+            ),
+        }
+        for name, path in paths.items():
+            time, peak = _measure(path)
+            print(
+                f"{num_facilities:>10} {num_clients:>8} {matrix_size:>12.1f} "
+                f"{name:>16} {time:>9.3f} {peak:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
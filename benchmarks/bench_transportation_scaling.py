@@ -0,0 +1,79 @@
+"""
+Solve time of the transportation solver against the number of clients.
+
+Compares searching the facility prices and repairing the unclear clients
+exactly with solving the Min Cost Flow model over the nearest facilities
+of each client, on instances with few facilities and many clients.
+
+Usage: python -m benchmarks.bench_transportation_scaling
+"""
+
+from typing import List
+
+from benchmarks.instances import random_assignment_problem, timer
+from src.services import (
+    locate_clients_in_exclusive_areas,
+    search_facility_prices,
+    solve_transportation_model,
+)
+from src.services.assignment_solver.flow_assignment_formulation import (
+    build_flow_network,
+    select_candidate_arcs,
+    solve_mcf_model,
+)
+
+INSTANCE_SIZES = [(50_000, 10), (200_000, 20), (500_000, 40)]
+NUM_CANDIDATE_FACILITIES = 5
+
+
+def main():
+    print(f"{'clients':>8} {'facilities':>10} {'mcf (s)':>8} ", end="")
+    print(f"{'prices (s)':>11} {'repair (s)':>11} {'speedup':>8} ", end="")
+    print(f"{'same cost':>10}")
+
+    for num_clients, num_facilities in INSTANCE_SIZES:
+        assignment_problem = random_assignment_problem(
+            num_clients, num_facilities
+        )
+        network = build_flow_network(
+            assignment_problem=assignment_problem,
+            client_exclusive_facilities=locate_clients_in_exclusive_areas(
+                clients=assignment_problem.clients,
+                facilities=assignment_problem.facilities,
+            ),
+        )
+        del assignment_problem
+
+        mcf_timings: List[float] = []
+        with timer(mcf_timings):
+            mcf_result = solve_mcf_model(
+                network=network,
+                candidate_arcs=select_candidate_arcs(
+                    network=network,
+                    num_candidate_facilities=NUM_CANDIDATE_FACILITIES,
+                ),
+            )
+        mcf_cost = mcf_result.model.optimal_cost()
+        del mcf_result
+
+        price_timings: List[float] = []
+        with timer(price_timings):
+            prices = search_facility_prices(network)
+
+        repair_timings: List[float] = []
+        with timer(repair_timings):
+            solution = solve_transportation_model(
+                network=network, prices=prices
+            )
+
+        mcf, total = mcf_timings[0], price_timings[0] + repair_timings[0]
+        same_cost = solution is not None and solution[1] == mcf_cost
+        print(
+            f"{num_clients:>8} {num_facilities:>10} {mcf:>8.3f} "
+            f"{price_timings[0]:>11.3f} {repair_timings[0]:>11.3f} "
+            f"{mcf / total:>7.1f}x {str(same_cost):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Synthetic instances shared by the benchmark scripts"""
+
+import time
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import numpy as np
+
+from src.models import (
+    AlgorithmType,
+    AssignmentProblem,
+    Client,
+    ClientBatch,
+    CostProblem,
+    Facility,
+)
+from src.services import compute_cost_matrix
+
+# Rough bounding box of the Rio de Janeiro metropolitan area
+MIN_LAT, MAX_LAT = -23.05, -22.70
+MIN_LNG, MAX_LNG = -43.70, -43.10
+
+
+def random_clients(num_clients: int, seed: int = 2024) -> List[Client]:
+    """Clients uniformly spread over the bounding box"""
+
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(MIN_LAT, MAX_LAT, num_clients)
+    lngs = rng.uniform(MIN_LNG, MAX_LNG, num_clients)
+    demands = rng.integers(1, 10, num_clients)
+
+    return [
+        Client(id=str(j), lat=lat, lng=lng, demand=demand)
+        for j, (lat, lng, demand) in enumerate(zip(lats, lngs, demands))
+    ]
+
+
+def random_facilities(num_facilities: int, seed: int = 2024) -> List[Facility]:
+    """Uncapacitated facilities uniformly spread over the bounding box"""
+
+    rng = np.random.default_rng(seed + 1)
+    lats = rng.uniform(MIN_LAT, MAX_LAT, num_facilities)
+    lngs = rng.uniform(MIN_LNG, MAX_LNG, num_facilities)
+
+    return [
+        Facility(id=str(i), name=f"FC{i}", lat=lat, lng=lng)
+        for i, (lat, lng) in enumerate(zip(lats, lngs))
+    ]
+
+
+def random_assignment_problem(
+    num_clients: int,
+    num_facilities: int,
+    algorithm: AlgorithmType = AlgorithmType.MCF_FORMULATION,
+    seed: int = 2024,
+) -> AssignmentProblem:
+    """Assignment problem with spherical costs and balanced capacities"""
+
+    clients = ClientBatch.from_clients(random_clients(num_clients, seed=seed))
+    facilities = random_facilities(num_facilities, seed=seed)
+
+    # Cap every facility slightly above its fair share so capacities bind
+    total_demand = clients.demands.sum()
+    for facility in facilities:
+        facility.max_demand = int(1.2 * total_demand / num_facilities) + 1
+
+    cost_problem = CostProblem(clients=clients, facilities=facilities)
+
+    return AssignmentProblem(
+        clients=clients,
+        facilities=facilities,
+        cost_matrix=compute_cost_matrix(cost_problem),
+        algorithm=algorithm,
+    )
+
+
+@contextmanager
+def timer(timings: List[float]) -> Iterator[None]:
+    """Append the elapsed wall time of the block, in seconds, to timings"""
+
+    start = time.perf_counter()
+    yield
+    timings.append(time.perf_counter() - start)
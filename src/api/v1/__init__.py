@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
 from src.api.v1.assignment_router import router as assignment_router
+from src.api.v1.client_dataset_router import router as client_dataset_router
 
 router = APIRouter(prefix="/v1")
 router.include_router(assignment_router)
+router.include_router(client_dataset_router)
@@ -1,52 +1,113 @@
-import json
-from typing import Any, Dict
-
-import humps
-from fastapi import APIRouter, HTTPException, Response, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from pydantic import ValidationError
 
-from src.models import AssignmentRequest, SolutionStatus
-from src.services import solve_facility_assignment
+from src.api.v1.payload_formats import (
+    JSON_MEDIA_TYPE,
+    NPZ_MEDIA_TYPE,
+    PayloadFormatError,
+    check_media_type,
+    encode_solution,
+    parse_assignment_request,
+    validation_exception,
+)
+from src.models import (
+    AssignmentSolution,
+    ResolveRequest,
+    SolutionStatus,
+)
+from src.services import (
+    DatasetNotFoundError,
+    ResolveChangeError,
+    SolutionNotFoundError,
+    resolve_facility_assignment,
+    solve_facility_assignment,
+)
 
 router = APIRouter()
 
 
 @router.post("/solve-assignment")
-async def solve_assignment(request_json: Dict[str, Any]):
+async def solve_assignment(request: Request):
+    content_type = request.headers.get("content-type", JSON_MEDIA_TYPE)
+    check_media_type(content_type)
+
+    try:
+        # Validate the request straight into the models, the clients into
+        # arrays
+        assignment_request = parse_assignment_request(
+            body=await request.body(), content_type=content_type
+        )
+    except ValidationError as e:
+        raise validation_exception(e)
+    except PayloadFormatError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        )
+
     try:
-        # Convert request JSON keys to snake_case
-        snake_case_request_json = humps.decamelize(request_json)
-        assignment_request = AssignmentRequest(**snake_case_request_json)
         assignment_solution = solve_facility_assignment(assignment_request)
+    except DatasetNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=(
+                f"Client dataset {assignment_request.dataset_id} not found, "
+                f"upload it again"
+            ),
+        )
 
-        if assignment_solution.solution_status == SolutionStatus.INFEASIBLE:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=assignment_solution.message,
-            )
+    return _solution_response(
+        assignment_solution, accept=request.headers.get("accept", "")
+    )
 
-        # Convert the result to camelCase
-        camel_case_solution = humps.camelize(assignment_solution.model_dump())
 
-        # Create a Response instance with the data, status_code, and return it
-        return Response(
-            content=json.dumps(camel_case_solution),
-            media_type="application/json",
-            status_code=status.HTTP_200_OK,
+@router.post("/resolve-assignment")
+async def resolve_assignment(request: Request):
+    try:
+        # Validate the camelCase request JSON straight into the models
+        resolve_request = ResolveRequest.model_validate_json(
+            await request.body()
         )
     except ValidationError as e:
-        error_messages = [
-            {
-                "error": error["msg"],
-                "path_error": "->".join([str(i) for i in error["loc"]]),
-                "input": error["input"],
-            }
-            for error in e.errors()
-        ]
+        raise validation_exception(e)
+
+    try:
+        assignment_solution = resolve_facility_assignment(resolve_request)
+    except SolutionNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=(
+                f"Solution {resolve_request.solution_id} not found, "
+                f"solve the problem again"
+            ),
+        )
+    except ResolveChangeError as e:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "message": f"{e.error_count()} fields with validation error",
-                "fields": error_messages,
-            },
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
         )
+
+    return _solution_response(
+        assignment_solution, accept=request.headers.get("accept", "")
+    )
+
+
+def _solution_response(
+    assignment_solution: AssignmentSolution, accept: str = ""
+) -> Response:
+    """JSON response of a solution, or ``.npz`` bundle when the Accept
+    header asks for it, raising an HTTP exception when the problem is
+    infeasible"""
+
+    if assignment_solution.solution_status == SolutionStatus.INFEASIBLE:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=assignment_solution.message,
+        )
+
+    # Serialize the result with its camelCase aliases in a single pass
+    return Response(
+        content=encode_solution(assignment_solution, accept=accept),
+        media_type=(
+            NPZ_MEDIA_TYPE if NPZ_MEDIA_TYPE in accept else JSON_MEDIA_TYPE
+        ),
+        status_code=status.HTTP_200_OK,
+    )
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from pydantic import ValidationError
+
+from src.api.v1.payload_formats import (
+    JSON_MEDIA_TYPE,
+    PayloadFormatError,
+    check_media_type,
+    parse_client_dataset_request,
+    validation_exception,
+)
+from src.services import DatasetNotFoundError, client_dataset_store
+
+router = APIRouter()
+
+
+@router.post("/client-datasets")
+async def upload_client_dataset(request: Request):
+    content_type = request.headers.get("content-type", JSON_MEDIA_TYPE)
+    check_media_type(content_type)
+
+    try:
+        client_dataset_request = parse_client_dataset_request(
+            body=await request.body(), content_type=content_type
+        )
+    except ValidationError as e:
+        raise validation_exception(e)
+    except PayloadFormatError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        )
+
+    client_dataset = client_dataset_store.add(client_dataset_request.clients)
+
+    return Response(
+        content=client_dataset.info.model_dump_json(by_alias=True),
+        media_type=JSON_MEDIA_TYPE,
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+@router.get("/client-datasets/{dataset_id}")
+async def get_client_dataset(dataset_id: str):
+    try:
+        client_dataset = client_dataset_store.get(dataset_id)
+    except DatasetNotFoundError:
+        raise _not_found_exception(dataset_id)
+
+    return Response(
+        content=client_dataset.info.model_dump_json(by_alias=True),
+        media_type=JSON_MEDIA_TYPE,
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@router.delete("/client-datasets/{dataset_id}")
+async def delete_client_dataset(dataset_id: str):
+    try:
+        client_dataset_store.remove(dataset_id)
+    except DatasetNotFoundError:
+        raise _not_found_exception(dataset_id)
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+def _not_found_exception(dataset_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Client dataset {dataset_id} not found",
+    )
@@ -0,0 +1,213 @@
+"""
+Payload formats of the assignment and client dataset endpoints, besides
+the JSON one.
+
+A solve request or a client dataset upload may be a NumPy ``.npz``
+bundle, whose ``id``, ``lat``, ``lng`` and optional ``demand`` arrays hold
+the clients and whose ``request`` string holds the JSON of the other
+request fields. Solutions may be returned in a matching bundle, with the
+assigned clients as parallel ``client_id`` and ``client_facility`` arrays,
+the latter indexing the ``facility_id`` array, and the JSON of the other
+solution fields as ``solution``.
+"""
+
+import io
+import json
+import math
+import zipfile
+from typing import Any, Type, TypeVar
+
+import numpy as np
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+
+from src.models import (
+    AssignmentRequest,
+    AssignmentSolution,
+    ClientDatasetRequest,
+)
+
+JSON_MEDIA_TYPE = "application/json"
+NPZ_MEDIA_TYPE = "application/x-npz"
+REQUEST_MEDIA_TYPES = (JSON_MEDIA_TYPE, NPZ_MEDIA_TYPE)
+
+RequestModel = TypeVar("RequestModel", bound=BaseModel)
+
+
+class PayloadFormatError(ValueError):
+    """The payload does not follow the format of its media type"""
+
+
+def media_type(content_type: str) -> str:
+    """Media type of a Content-Type header, JSON when it is missing"""
+
+    return content_type.split(";")[0].strip().lower() or JSON_MEDIA_TYPE
+
+
+def check_media_type(content_type: str):
+    """Raise an unsupported media type exception unless the Content-Type
+    header is one of the ``REQUEST_MEDIA_TYPES``"""
+
+    if media_type(content_type) not in REQUEST_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=(
+                f"Content type {content_type} is not supported, use one of "
+                f"{', '.join(REQUEST_MEDIA_TYPES)}"
+            ),
+        )
+
+
+def parse_assignment_request(
+    body: bytes, content_type: str
+) -> AssignmentRequest:
+    """
+    Assignment request of a payload of one of the ``REQUEST_MEDIA_TYPES``.
+
+    The clients are decoded straight into arrays, either from the parallel
+    arrays of a ``.npz`` bundle or, in JSON, from a list of clients,
+    parallel arrays or a CSV text. A bundle without client arrays should
+    reference a stored dataset.
+
+    Raises
+    ------
+    ValidationError
+        If the request fields are not valid.
+    PayloadFormatError
+        If the payload is not a valid ``.npz`` bundle.
+    """
+
+    return _parse_request(AssignmentRequest, body, content_type)
+
+
+def parse_client_dataset_request(
+    body: bytes, content_type: str
+) -> ClientDatasetRequest:
+    """Client dataset upload of a payload of one of the
+    ``REQUEST_MEDIA_TYPES``, decoded as the assignment request clients"""
+
+    return _parse_request(ClientDatasetRequest, body, content_type)
+
+
+def _parse_request(
+    model: Type[RequestModel], body: bytes, content_type: str
+) -> RequestModel:
+    """Request model of a JSON payload or of a ``.npz`` bundle whose
+    ``request`` entry holds the JSON of the fields besides the clients"""
+
+    if media_type(content_type) != NPZ_MEDIA_TYPE:
+        return model.model_validate_json(body)
+
+    try:
+        bundle = np.load(io.BytesIO(body), allow_pickle=False)
+    except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+        raise PayloadFormatError("Not a valid NumPy .npz bundle")
+    if not isinstance(bundle, np.lib.npyio.NpzFile):
+        raise PayloadFormatError("Not a valid NumPy .npz bundle")
+
+    with bundle:
+        try:
+            request_fields = (
+                json.loads(bundle["request"].item())
+                if "request" in bundle.files
+                else {}
+            )
+            columns = {
+                name: bundle[name]
+                for name in bundle.files
+                if name != "request"
+            }
+        except (TypeError, ValueError):
+            raise PayloadFormatError(
+                "The bundle arrays should not hold Python objects and its "
+                "request entry should be a JSON string"
+            )
+    if not isinstance(request_fields, dict):
+        raise PayloadFormatError(
+            "The request entry of the bundle is not a JSON object"
+        )
+
+    return model.model_validate(
+        {**request_fields, "clients": columns} if columns else request_fields
+    )
+
+
+def encode_solution(
+    assignment_solution: AssignmentSolution, accept: str
+) -> bytes:
+    """Solution encoded as a ``.npz`` bundle when the Accept header asks
+    for it, as JSON otherwise"""
+
+    if NPZ_MEDIA_TYPE not in accept:
+        return assignment_solution.model_dump_json(by_alias=True).encode()
+
+    assigned_facilities = assignment_solution.assigned_facilities
+    client_ids = [
+        assigned_facility.assigned_clients.ids
+        for assigned_facility in assigned_facilities
+    ]
+    file = io.BytesIO()
+    np.savez(
+        file,
+        solution=np.array(
+            assignment_solution.model_dump_json(
+                by_alias=True,
+                exclude={
+                    "assigned_facilities": {"__all__": {"assigned_clients"}}
+                },
+            )
+        ),
+        facility_id=np.array(
+            [
+                assigned_facility.facility.id
+                for assigned_facility in assigned_facilities
+            ],
+            dtype=str,
+        ),
+        client_id=np.concatenate(
+            client_ids + [np.empty(0, dtype=object)]
+        ).astype(str),
+        client_facility=np.repeat(
+            np.arange(len(client_ids), dtype=np.int32),
+            [len(ids) for ids in client_ids],
+        ),
+    )
+
+    return file.getvalue()
+
+
+def validation_exception(e: ValidationError) -> HTTPException:
+    """Bad request exception listing the fields with validation errors"""
+
+    error_messages = [
+        {
+            "error": error["msg"],
+            "path_error": "->".join([str(i) for i in error["loc"]]),
+            "input": _jsonable_input(error["input"]),
+        }
+        for error in e.errors()
+    ]
+
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={
+            "message": f"{e.error_count()} fields with validation error",
+            "fields": error_messages,
+        },
+    )
+
+
+def _jsonable_input(value: Any) -> Any:
+    """Input of a validation error, with the NumPy arrays of bundles
+    replaced by a summary and the non-finite numbers by their text"""
+
+    if isinstance(value, np.ndarray):
+        return f"{value.dtype} array of shape {value.shape}"
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _jsonable_input(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_jsonable_input(item) for item in value]
+
+    return value
@@ -1,13 +1,29 @@
 # isort: skip_file
-from .client import Client, scale_clients_demands  # noqa: F401
+from .client import (  # noqa: F401
+    Client,
+    ClientBatch,
+    ClientColumns,
+    ClientRecord,
+    scale_clients_demands,
+)
 from .facility import AssignedFacility, Facility  # noqa: F401
 from .assignment_request import (  # noqa: F401
     AlgorithmType,
     ObjectiveType,
+    ServiceAreaType,
     AssignmentRequest,
 )
+from .resolve_request import (  # noqa: F401
+    FacilityDemandUpdate,
+    ResolveRequest,
+)
+from .client_dataset import (  # noqa: F401
+    ClientDatasetInfo,
+    ClientDatasetRequest,
+)
 from .assignment_response import (  # noqa: F401
     AssignmentSolution,
+    CellLookup,
     SolutionStatus,
 )
 from .assignment_problem import AssignmentProblem  # noqa: F401
@@ -1,20 +1,62 @@
-from typing import List
+from typing import List, Optional
 
 import numpy as np
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, NonNegativeInt, PositiveInt
 
-from src.models import AlgorithmType, Client, Facility
+from config import settings
+from src.models import (
+    AlgorithmType,
+    ClientBatch,
+    Facility,
+    ServiceAreaType,
+)
 
 
 class AssignmentProblem(BaseModel):
-    """Assignment problem model"""
+    """Assignment problem model
+
+    Arguments
+    ---------
+    clients
+        Clients of the problem, stored column-wise.
+    cost_matrix
+        Cost of each client at each facility, weighted by the client
+        demand, of shape (num_facilities, num_clients).
+    scaled_unit_costs
+        Cost of a unit of demand of each client at each facility,
+        multiplied by ``MCF_SCALE_FACTOR`` and truncated to integers. The
+        flow formulations read them, when given, instead of dividing the
+        cost matrix by the client demands, which may then be left out.
+        Solving a problem without the costs its formulation reads raises
+        a ``ValueError``.
+    num_candidate_facilities
+        Number of cheapest facilities each client is first linked to in
+        the Min Cost Flow formulation. The remaining arcs are only added
+        when their reduced cost shows they improve the solution. Zero
+        links every client to every facility from the start.
+    initial_client_facilities
+        Index of the facility each client was assigned to in a previous
+        solution, or -1 for new clients, used to warm start the solvers.
+    num_regions
+        Number of spatial regions the facilities are clustered into by
+        the decomposed Min Cost Flow formulation.
+    service_area_type
+        How the service areas of the assigned facilities are built.
+    """
 
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
     )
 
-    clients: List[Client]
+    clients: ClientBatch
     facilities: List[Facility]
-    cost_matrix: np.ndarray
+    cost_matrix: Optional[np.ndarray] = None
+    scaled_unit_costs: Optional[np.ndarray] = None
     algorithm: AlgorithmType = AlgorithmType.MCF_FORMULATION
     solver_time_limit_seconds: int = 80
+    num_candidate_facilities: NonNegativeInt = (
+        settings.MCF_NUM_CANDIDATE_FACILITIES
+    )
+    initial_client_facilities: Optional[np.ndarray] = None
+    num_regions: PositiveInt = settings.DECOMPOSITION_NUM_REGIONS
+    service_area_type: ServiceAreaType = ServiceAreaType.ALPHA_SHAPE
@@ -1,9 +1,16 @@
 from enum import IntEnum
-from typing import List
+from typing import List, Optional
 
-from pydantic import BaseModel, Field, PositiveInt
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PositiveInt,
+    model_validator,
+)
+from pydantic.alias_generators import to_camel
 
-from src.models import Client, Facility
+from src.models import ClientBatch, Facility
 
 
 class AlgorithmType(IntEnum):
@@ -11,6 +18,9 @@ class AlgorithmType(IntEnum):
 
     MCF_FORMULATION = 1
     MILP_FORMULATION = 2
+    HIGHS_MILP_FORMULATION = 3
+    TRANSPORTATION_FORMULATION = 4
+    DECOMPOSED_FLOW_FORMULATION = 5
 
 
 class ObjectiveType(IntEnum):
@@ -19,13 +29,40 @@ class ObjectiveType(IntEnum):
     MIN_PROXIMITY = 1
     MIN_TRAVEL_DISTANCE = 2
     MIN_TRAVEL_DURATION = 3
+    MIN_BLENDED_TRAVEL_COST = 4
+
+
+class ServiceAreaType(IntEnum):
+    """Available ways of building the facilities service areas"""
+
+    ALPHA_SHAPE = 1
+    VORONOI = 2
+    HEX_GRID = 3
 
 
 class AssignmentRequest(BaseModel):
-    """Assignment request model"""
+    """Assignment request model
+
+    The clients are validated in bulk into a ``ClientBatch``. Instead of
+    sending them, the request may reference a client dataset uploaded
+    before by its ``dataset_id``, exactly one of the two being given.
+    """
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
 
     total_demand: PositiveInt = 1
-    clients: List[Client] = Field(min_length=1)
+    clients: Optional[ClientBatch] = Field(default=None, min_length=1)
+    dataset_id: Optional[str] = None
     facilities: List[Facility] = Field(min_length=1)
     algorithm: AlgorithmType = AlgorithmType.MCF_FORMULATION
     objective: ObjectiveType = ObjectiveType.MIN_PROXIMITY
+    service_area_type: ServiceAreaType = ServiceAreaType.ALPHA_SHAPE
+
+    @model_validator(mode="after")
+    def clients_source_validator(self) -> "AssignmentRequest":
+        if (self.clients is None) == (self.dataset_id is None):
+            raise ValueError(
+                "Either the clients or the dataset id should be given"
+            )
+
+        return self
@@ -1,8 +1,15 @@
 from enum import IntEnum
 from math import inf
-from typing import List
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, NonNegativeFloat
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    NonNegativeFloat,
+    PositiveFloat,
+    PositiveInt,
+)
+from pydantic.alias_generators import to_camel
 
 from src.models import AssignedFacility
 
@@ -15,6 +22,35 @@ class SolutionStatus(IntEnum):
     OPTIMAL = 3
 
 
+class CellLookup(BaseModel):
+    """Facility of the cells of a hierarchical hexagonal grid
+
+    The cells are pointy-top hexagons over the (lng, lat) plane, in
+    degrees, the cells of level ``k`` being ``2**k`` times as large as
+    those of level 0. A cell is keyed ``"<level>:<q>:<r>"`` by its level
+    and its axial coordinates, and labelled with the facility assigned
+    most of the demand of its clients.
+
+    Arguments
+    ---------
+    cell_size
+        Distance, in degrees, from the center to the vertices of the
+        cells of level 0
+
+    num_levels
+        Number of levels of the grid
+
+    cell_facilities
+        Facility id of each cell holding assigned clients
+    """
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    cell_size: PositiveFloat
+    num_levels: PositiveInt
+    cell_facilities: Dict[str, str] = {}
+
+
 class AssignmentSolution(BaseModel):
     """Solution of an assignment problem
 
@@ -31,9 +67,31 @@ class AssignmentSolution(BaseModel):
 
     message
         A message from the solver
+
+    client_reduction_ratio
+        Share of the clients removed from the problem by merging the ones
+        with identical coordinates before solving it
+
+    solution_id
+        Identifier of the cached solution, to re-solve the problem with
+        small changes through the re-solve endpoint, empty when the
+        solution is too large to cache
+
+    cell_lookup
+        Facility of the grid cells of the assigned clients, with the
+        hexagonal grid service areas
     """
 
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        ser_json_inf_nan="constants",
+    )
+
     objective_value: NonNegativeFloat = inf
     assigned_facilities: List[AssignedFacility] = []
     solution_status: SolutionStatus = SolutionStatus.INFEASIBLE
     message: str = ""
+    client_reduction_ratio: NonNegativeFloat = 0.0
+    solution_id: str = ""
+    cell_lookup: Optional[CellLookup] = None
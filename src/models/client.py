@@ -1,7 +1,27 @@
-from copy import deepcopy
-from typing import List
+import io
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Union,
+)
 
-from pydantic import BaseModel, PositiveFloat
+import numpy as np
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    FiniteFloat,
+    GetCoreSchemaHandler,
+    PositiveFloat,
+    TypeAdapter,
+)
+from pydantic.alias_generators import to_camel
+from pydantic_core import core_schema
+from typing_extensions import NotRequired, TypedDict
 
 
 class Client(BaseModel):
@@ -12,29 +32,347 @@ class Client(BaseModel):
     id
         Unique identifier for the client.
     lat, lng
-        Coordinates of the client
+        Coordinates of the client, finite like in every client format.
     demand
         Represents the client's demand, which can be a floating-point
         number, such as in a scenario with 100 clients and a total demand of
         150, where each demand would be 1.5.
     """
 
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
     id: str
-    lat: float
-    lng: float
+    lat: FiniteFloat
+    lng: FiniteFloat
     demand: PositiveFloat = 1.0
 
 
+class ClientRecord(TypedDict):
+    """Fields of a client, validated in bulk as plain dictionaries"""
+
+    id: str
+    lat: FiniteFloat
+    lng: FiniteFloat
+    demand: NotRequired[PositiveFloat]
+
+
+class ClientColumns(TypedDict):
+    """Fields of the clients as parallel arrays"""
+
+    id: List[str]
+    lat: List[FiniteFloat]
+    lng: List[FiniteFloat]
+    demand: NotRequired[List[PositiveFloat]]
+
+
+CLIENT_COLUMNS_ADAPTER = TypeAdapter(ClientColumns)
+REQUIRED_CLIENT_COLUMNS = ("id", "lat", "lng")
+
+
+class ClientBatch:
+    """Clients stored column-wise, as one array per attribute
+
+    Used for the clients from the assignment request onwards, so that the
+    pipeline reads, selects and scales them with array operations instead
+    of building a pydantic object per client. It behaves as a sequence of
+    clients, building ``Client`` objects only when they are indexed or
+    iterated, at the API boundary.
+
+    As a pydantic field, it is validated, without building a model per
+    client, from a list of clients or of dictionaries validated in bulk as
+    ``ClientRecord``, from parallel arrays, as ``ClientColumns`` or NumPy
+    arrays, or from a CSV text with an ``id,lat,lng[,demand]`` header. It
+    is serialized as a list of dictionaries.
+
+    Attributes
+    ----------
+    ids
+        Object array with the identifiers of the clients.
+    lats, lngs
+        Coordinates of the clients.
+    demands
+        Demands of the clients, unit by default.
+    """
+
+    __slots__ = ("ids", "lats", "lngs", "demands")
+
+    def __init__(
+        self,
+        ids: Iterable[str],
+        lats: Iterable[float],
+        lngs: Iterable[float],
+        demands: Optional[Iterable[float]] = None,
+    ):
+        self.ids = np.asarray(ids, dtype=object).reshape(-1)
+        self.lats = np.asarray(lats, dtype=float).reshape(-1)
+        self.lngs = np.asarray(lngs, dtype=float).reshape(-1)
+        self.demands = (
+            np.ones(self.ids.size)
+            if demands is None
+            else np.asarray(demands, dtype=float).reshape(-1)
+        )
+
+    @classmethod
+    def from_clients(
+        cls, clients: Iterable[Union[Client, dict]]
+    ) -> "ClientBatch":
+        """Batch of clients, validating the ones given as dictionaries"""
+
+        if isinstance(clients, ClientBatch):
+            return clients
+
+        validated_clients = [
+            client if isinstance(client, Client) else Client(**client)
+            for client in clients
+        ]
+
+        return cls(
+            ids=[client.id for client in validated_clients],
+            lats=[client.lat for client in validated_clients],
+            lngs=[client.lng for client in validated_clients],
+            demands=[client.demand for client in validated_clients],
+        )
+
+    @classmethod
+    def from_records(cls, records: List[ClientRecord]) -> "ClientBatch":
+        """Batch of validated client dictionaries"""
+
+        return cls(
+            ids=[record["id"] for record in records],
+            lats=[record["lat"] for record in records],
+            lngs=[record["lng"] for record in records],
+            demands=[record.get("demand", 1.0) for record in records],
+        )
+
+    @classmethod
+    def from_columns(cls, columns: Mapping[str, Any]) -> "ClientBatch":
+        """
+        Batch of the parallel arrays of a mapping with ``id``, ``lat``,
+        ``lng`` and optionally ``demand`` keys, such as a NumPy ``.npz``
+        bundle. Identifiers of other types are converted to strings.
+
+        Raises
+        ------
+        ValueError
+            If some column is missing, the columns have different lengths,
+            some coordinate is not finite or some demand is not positive.
+        """
+
+        missing_columns = [
+            column
+            for column in REQUIRED_CLIENT_COLUMNS
+            if column not in columns
+        ]
+        if missing_columns:
+            raise ValueError(f"Missing client columns {missing_columns}")
+
+        ids = np.asarray(columns["id"])
+        if ids.dtype != object:
+            ids = ids.astype(str)
+        client_batch = cls(
+            ids=ids,
+            lats=columns["lat"],
+            lngs=columns["lng"],
+            demands=columns["demand"] if "demand" in columns else None,
+        )
+
+        lengths = {
+            len(column)
+            for column in (
+                client_batch.ids,
+                client_batch.lats,
+                client_batch.lngs,
+                client_batch.demands,
+            )
+        }
+        if len(lengths) > 1:
+            raise ValueError(
+                f"Client columns have different lengths {sorted(lengths)}"
+            )
+        if not (
+            np.isfinite(client_batch.lats).all()
+            and np.isfinite(client_batch.lngs).all()
+        ):
+            raise ValueError("Client coordinates should be finite")
+        if not (client_batch.demands > 0).all():
+            raise ValueError("Client demands should be greater than 0")
+
+        return client_batch
+
+    @classmethod
+    def from_csv(cls, text: str) -> "ClientBatch":
+        """
+        Batch of the clients of a CSV text, whose header names the
+        ``id``, ``lat``, ``lng`` and optionally ``demand`` columns. The
+        columns are parsed straight into arrays.
+        """
+
+        header, _, rows = text.lstrip("\ufeff").partition("\n")
+        names = [name.strip().strip('"') for name in header.split(",")]
+        float_names = [
+            name for name in ("lat", "lng", "demand") if name in names
+        ]
+        if "id" not in names or not rows.strip():
+            return cls.from_columns(dict.fromkeys(names, []))
+
+        ids = np.loadtxt(
+            io.StringIO(rows),
+            delimiter=",",
+            quotechar='"',
+            dtype=object,
+            usecols=names.index("id"),
+            ndmin=1,
+        )
+        values = np.loadtxt(
+            io.StringIO(rows),
+            delimiter=",",
+            quotechar='"',
+            usecols=[names.index(name) for name in float_names],
+            ndmin=2,
+        )
+
+        return cls.from_columns(
+            {"id": ids, **dict(zip(float_names, values.T))}
+        )
+
+    @classmethod
+    def concatenate(cls, batches: Iterable["ClientBatch"]) -> "ClientBatch":
+        batches = list(batches)
+
+        return cls(
+            ids=np.concatenate([batch.ids for batch in batches]),
+            lats=np.concatenate([batch.lats for batch in batches]),
+            lngs=np.concatenate([batch.lngs for batch in batches]),
+            demands=np.concatenate([batch.demands for batch in batches]),
+        )
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        def validate(
+            value: Any, validate_records: Callable[[Any], Any]
+        ) -> "ClientBatch":
+            if isinstance(value, ClientBatch):
+                return value
+            if (
+                isinstance(value, (list, tuple))
+                and value
+                and all(isinstance(client, Client) for client in value)
+            ):
+                return cls.from_clients(value)
+            if isinstance(value, str):
+                return cls.from_csv(value)
+            if isinstance(value, Mapping):
+                if not all(
+                    isinstance(column, np.ndarray) for column in value.values()
+                ):
+                    value = CLIENT_COLUMNS_ADAPTER.validate_python(value)
+                return cls.from_columns(value)
+
+            return cls.from_records(validate_records(value))
+
+        return core_schema.no_info_wrap_validator_function(
+            validate,
+            handler.generate_schema(List[ClientRecord]),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                cls.to_records
+            ),
+        )
+
+    @property
+    def coordinates(self) -> np.ndarray:
+        """(lat, lng) of the clients"""
+
+        return np.column_stack((self.lats, self.lngs))
+
+    def to_clients(self) -> List[Client]:
+        return list(self)
+
+    def to_records(self) -> List[dict]:
+        return [
+            {"id": client_id, "lat": lat, "lng": lng, "demand": demand}
+            for client_id, lat, lng, demand in zip(
+                self.ids.tolist(),
+                self.lats.tolist(),
+                self.lngs.tolist(),
+                self.demands.tolist(),
+            )
+        ]
+
+    def with_demands(self, demands: Iterable[float]) -> "ClientBatch":
+        """Same clients with new demands, sharing the other arrays"""
+
+        return ClientBatch(
+            ids=self.ids, lats=self.lats, lngs=self.lngs, demands=demands
+        )
+
+    def scale_demands(self, new_total_demand: float) -> "ClientBatch":
+        """Scale clients' demands to a new total demand"""
+
+        scale_factor = new_total_demand / self.demands.sum()
+
+        return self.with_demands(np.round(scale_factor * self.demands, 2))
+
+    def __len__(self) -> int:
+        return self.ids.size
+
+    def __iter__(self) -> Iterator[Client]:
+        for client_id, lat, lng, demand in zip(
+            self.ids.tolist(),
+            self.lats.tolist(),
+            self.lngs.tolist(),
+            self.demands.tolist(),
+        ):
+            yield Client.model_construct(
+                id=client_id, lat=lat, lng=lng, demand=demand
+            )
+
+    def __getitem__(self, index: Any) -> Any:
+        """Client at an integer index, or batch of the clients selected by a
+        slice, an index array or a boolean mask"""
+
+        if isinstance(index, (int, np.integer)):
+            return Client.model_construct(
+                id=self.ids[index],
+                lat=float(self.lats[index]),
+                lng=float(self.lngs[index]),
+                demand=float(self.demands[index]),
+            )
+
+        return ClientBatch(
+            ids=self.ids[index],
+            lats=self.lats[index],
+            lngs=self.lngs[index],
+            demands=self.demands[index],
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ClientBatch):
+            return (
+                np.array_equal(self.ids, other.ids)
+                and np.array_equal(self.lats, other.lats)
+                and np.array_equal(self.lngs, other.lngs)
+                and np.array_equal(self.demands, other.demands)
+            )
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"ClientBatch(num_clients={len(self)})"
+
+
 def scale_clients_demands(
-    clients: List[Client], new_total_demand: float
+    clients: Iterable[Client], new_total_demand: float
 ) -> List[Client]:
     """Scale clients' demands to a new total demand"""
 
-    clients_copy = deepcopy(clients)
-    original_total_demand = sum(client.demand for client in clients)
-    scale_factor = new_total_demand / original_total_demand
-
-    for client in clients_copy:
-        client.demand = round(scale_factor * client.demand, ndigits=2)
-
-    return clients_copy
+    return (
+        ClientBatch.from_clients(clients)
+        .scale_demands(new_total_demand)
+        .to_clients()
+    )
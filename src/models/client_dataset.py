@@ -0,0 +1,40 @@
+from pydantic import BaseModel, ConfigDict, Field, NonNegativeFloat
+from pydantic.alias_generators import to_camel
+
+from src.models import ClientBatch
+
+
+class ClientDatasetRequest(BaseModel):
+    """Client dataset upload model
+
+    The clients may be given in any of the formats of the assignment
+    request clients.
+    """
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    clients: ClientBatch = Field(min_length=1)
+
+
+class ClientDatasetInfo(BaseModel):
+    """Stored client dataset model
+
+    Arguments
+    ---------
+    dataset_id
+        Identifier of the dataset, referenced by the assignment requests.
+        Uploading the same clients again returns the same identifier.
+    num_clients
+        Number of clients of the dataset
+    num_locations
+        Number of distinct client coordinates
+    total_demand
+        Sum of the client demands
+    """
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    dataset_id: str
+    num_clients: int
+    num_locations: int
+    total_demand: NonNegativeFloat
@@ -1,10 +1,15 @@
 from enum import IntEnum
 from typing import List, Union
 
-from pydantic import BaseModel, PositiveInt, field_validator
+from pydantic import (
+    BaseModel,
+    NonNegativeFloat,
+    PositiveInt,
+    field_validator,
+)
 
 from config import settings
-from src.models import Client, Facility, ObjectiveType
+from src.models import ClientBatch, Facility, ObjectiveType
 
 
 class CostType(IntEnum):
@@ -13,23 +18,36 @@ class CostType(IntEnum):
     SPHERICAL_DISTANCE = 1
     OSRM_DISTANCE = 2
     OSRM_DURATION = 3
+    OSRM_BLENDED_COST = 4
 
 
 OBJECTIVE_TYPE_MAPPING = {
     ObjectiveType.MIN_PROXIMITY: CostType.SPHERICAL_DISTANCE,
     ObjectiveType.MIN_TRAVEL_DISTANCE: CostType.OSRM_DISTANCE,
     ObjectiveType.MIN_TRAVEL_DURATION: CostType.OSRM_DURATION,
+    ObjectiveType.MIN_BLENDED_TRAVEL_COST: CostType.OSRM_BLENDED_COST,
 }
 
 
 class CostProblem(BaseModel):
-    """Cost problem model"""
+    """Cost problem model
 
-    clients: List[Client]
+    Arguments
+    ---------
+    clients
+        Clients of the problem, stored column-wise.
+    distance_weight, duration_weight
+        Weights of the OSRM distance, in meters, and duration, in seconds,
+        in the blended travel cost.
+    """
+
+    clients: ClientBatch
     facilities: List[Facility]
     cost_type: Union[CostType, ObjectiveType] = CostType.SPHERICAL_DISTANCE
     osrm_server_address: str = settings.OSRM_SERVER_ADDRESS
     osrm_batch_size: PositiveInt = settings.OSRM_BATCH_SIZE
+    distance_weight: NonNegativeFloat = settings.OSRM_BLEND_DISTANCE_WEIGHT
+    duration_weight: NonNegativeFloat = settings.OSRM_BLEND_DURATION_WEIGHT
 
     @field_validator("cost_type", mode="before")
     @classmethod
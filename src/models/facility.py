@@ -9,15 +9,16 @@ from pydantic import (
     field_serializer,
     field_validator,
 )
+from pydantic.alias_generators import to_camel
 from shapely import (
     GeometryCollection,
     MultiPolygon,
     Polygon,
     from_geojson,
-    to_geojson,
 )
+from shapely.geometry import mapping
 
-from src.models import Client
+from src.models import ClientBatch
 
 TYPE_ERROR_MSG = (
     "Not a valid GeoJSON dictionary or valid geometry. "
@@ -27,6 +28,15 @@ TYPE_ERROR_MSG = (
 )
 
 
+def _multipolygon_to_geojson_dict(multipolygon: MultiPolygon) -> dict:
+    """
+    GeoJSON dictionary of a shapely MultiPolygon, read from its
+    coordinates, without writing and parsing a GeoJSON string.
+    """
+
+    return mapping(multipolygon)
+
+
 def _geojson_dict_to_multipolygon(
     geojson_dict: dict,
 ) -> MultiPolygon:
@@ -119,6 +129,8 @@ class Facility(BaseModel):
 
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
+        alias_generator=to_camel,
+        populate_by_name=True,
     )
 
     id: str
@@ -131,7 +143,7 @@ class Facility(BaseModel):
 
     @field_serializer("exclusive_service_area")
     def exclusive_service_area_serializer(self, field: MultiPolygon) -> dict:
-        return json.loads(to_geojson(field))
+        return _multipolygon_to_geojson_dict(field)
 
     @field_validator("exclusive_service_area", mode="before")
     @classmethod
@@ -146,10 +158,12 @@ class AssignedFacility(BaseModel):
 
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
+        alias_generator=to_camel,
+        populate_by_name=True,
     )
 
     facility: Facility
-    assigned_clients: List[Client]
+    assigned_clients: ClientBatch
     expected_demand: NonNegativeFloat = 0.0
     service_area: MultiPolygon = MultiPolygon()
     expected_optimal_tsp_route_distance: NonNegativeFloat = 0.0
@@ -159,12 +173,17 @@ class AssignedFacility(BaseModel):
         return field.id
 
     @field_serializer("assigned_clients")
-    def assigned_clients_serializer(self, field: List[Client]) -> List[str]:
-        return [client.id for client in field]
+    def assigned_clients_serializer(self, field: ClientBatch) -> List[str]:
+        return field.ids.tolist()
+
+    @field_serializer("expected_demand")
+    def expected_demand_serializer(self, field: float) -> Union[int, float]:
+        # Whole demands are written as integers, like 1085 and not 1085.0
+        return int(field) if float(field).is_integer() else field
 
     @field_serializer("service_area")
     def service_area_serializer(self, field: MultiPolygon) -> dict:
-        return json.loads(to_geojson(field))
+        return _multipolygon_to_geojson_dict(field)
 
     @field_validator("service_area", mode="before")
     @classmethod
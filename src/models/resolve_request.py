@@ -0,0 +1,46 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, NonNegativeInt, PositiveInt
+from pydantic.alias_generators import to_camel
+
+from src.models import Client
+
+
+class FacilityDemandUpdate(BaseModel):
+    """New demand bounds of a facility, the omitted ones are kept"""
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    id: str
+    min_demand: Optional[NonNegativeInt] = None
+    max_demand: Optional[NonNegativeInt] = None
+
+
+class ResolveRequest(BaseModel):
+    """Re-solve request model
+
+    Arguments
+    ---------
+    solution_id
+        Identifier of the previous solution, as returned by the solve
+        endpoint
+    total_demand
+        New total demand, the previous one is kept when omitted
+    added_clients
+        Clients not present in the previous problem
+    changed_clients
+        Clients of the previous problem with new coordinates or demand
+    removed_client_ids
+        Identifiers of the clients of the previous problem to drop
+    facility_updates
+        New minimum or maximum demands of the facilities
+    """
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    solution_id: str
+    total_demand: Optional[PositiveInt] = None
+    added_clients: List[Client] = []
+    changed_clients: List[Client] = []
+    removed_client_ids: List[str] = []
+    facility_updates: List[FacilityDemandUpdate] = []
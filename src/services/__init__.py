@@ -1,23 +1,103 @@
 # isort: skip_file
-from .cost_calculator.cost_matrix import compute_cost_matrix  # noqa: F401
+from .cost_calculator.spherical_costs import (  # noqa: F401
+    compute_spherical_costs,
+)
+from .cost_calculator.osrm_client import fetch_osrm_costs  # noqa: F401
+from .cost_calculator.osrm_cost_cache import (  # noqa: F401
+    OSRMCostCache,
+    osrm_cost_cache,
+)
+from .cost_calculator.cost_matrix import (  # noqa: F401
+    compute_cost_matrix,
+    compute_screened_cost_matrix,
+    refine_screened_costs,
+)
+from .cost_calculator.cost_matrix_store import (  # noqa: F401
+    CostMatrixStore,
+    cost_matrix_store,
+    cost_problem_key,
+)
+from .spatial_index.exclusive_service_areas import (  # noqa: F401
+    locate_clients_in_exclusive_areas,
+)
 from .assignment_evaluator.clients_dispersion import (  # noqa: F401
+    select_dispersed_points,
     solve_clients_dispersion_problem,
 )
+from .assignment_evaluator.hex_grid import (  # noqa: F401
+    build_cell_lookup,
+    hex_cell_polygons,
+    hex_cells,
+    lookup_cell_facilities,
+    majority_cells,
+)
 from .assignment_evaluator.service_area import (  # noqa: F401
     compute_service_area,
+    compute_hex_grid_service_areas,
+    compute_service_area_polygons,
+    compute_voronoi_service_areas,
 )
 from .assignment_evaluator.evaluate_assignments import (  # noqa: F401
+    compute_expected_tsp_route_distance,
     evaluate_assigned_facilities,
+    remove_exclusive_area_overlaps,
 )
 from .assignment_solver.utils import (  # noqa: F401
+    group_clients_by_facility,
     scale_assignment_problem_parameters,
+    scale_costs,
 )
 from .assignment_solver.flow_assignment_formulation import (  # noqa: F401
+    FlowNetwork,
+    FlowSolution,
+    build_flow_assignment_solution,
+    build_flow_network,
+    compute_flow_reduced_costs,
+    extract_client_facilities,
+    select_candidate_arcs,
+    select_warm_start_arcs,
+    solve_core_mcf_model,
     solve_flow_assignment_formulation,
+    solve_mcf_model,
+)
+from .assignment_solver.transportation_formulation import (  # noqa: F401
+    search_facility_prices,
+    solve_transportation_formulation,
+    solve_transportation_model,
+)
+from .assignment_solver.decomposed_flow_formulation import (  # noqa: F401
+    cluster_facilities,
+    solve_decomposed_flow_formulation,
+    solve_decomposed_flow_model,
+)
+from .assignment_solver.client_aggregation import (  # noqa: F401
+    ClientAggregation,
+    aggregate_colocated_clients,
+    assignment_cost,
+    expand_assigned_facilities,
+    merge_colocated_clients,
+    violates_demand_bounds,
+)
+from .dataset_store.client_dataset_store import (  # noqa: F401
+    ClientDataset,
+    ClientDatasetStore,
+    DatasetNotFoundError,
+    client_dataset_store,
+)
+from .assignment_solver.solution_cache import (  # noqa: F401
+    CachedSolution,
+    SolutionCache,
+    SolutionNotFoundError,
+    solution_cache,
 )
 from .assignment_solver.milp_assignment_formulation import (  # noqa: F401
     solve_milp_assignment_formulation,
 )
+from .assignment_solver.highs_milp_assignment_formulation import (  # noqa: F401,E501
+    solve_highs_milp_assignment_formulation,
+)
 from .assignment_solver.solve_assignment_problem import (  # noqa: F401
+    ResolveChangeError,
+    resolve_facility_assignment,
     solve_facility_assignment,
 )
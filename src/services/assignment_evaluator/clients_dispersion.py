@@ -10,17 +10,24 @@ the facility's service area. This module brings together heuristics to
 solve the p-dispersion problem.
 """
 
-from typing import List
+from typing import Iterable, Tuple
 
 import cost_matrix
 import numpy as np
 
-from src.models import Client
+from config import settings
+from src.models import Client, ClientBatch
+
+# Number of distances computed at once while searching the farthest pair
+FARTHEST_PAIR_CHUNK_SIZE = 2**22
+
+# Slack, in meters, covering the rounding errors of the distance bounds
+DISTANCE_TOLERANCE = 1e-6
 
 
 def solve_clients_dispersion_problem(
-    clients: List[Client], subset_size: int
-) -> List[Client]:
+    clients: Iterable[Client], subset_size: int
+) -> ClientBatch:
     """
     Compute well dispersed subset of Clients.
     This uses the greedy construction heuristic explained
@@ -28,13 +35,12 @@ def solve_clients_dispersion_problem(
     Parameters
     ----------
     clients
-        A list containing the clients for which the dispersion problem
-        will be solved.
+        The clients for which the dispersion problem will be solved.
     subset_size
         The desired size of the subset.
     Returns
     -------
-    List
+    ClientBatch
         A subset of clients that maximizes the minimum distance between
         any pair of selected clients.
     References
@@ -44,28 +50,168 @@ def solve_clients_dispersion_problem(
         doi:10.1016/0305-0548(94)90041-8
     """
 
+    client_batch = ClientBatch.from_clients(clients)
+
+    return client_batch[
+        select_dispersed_points(client_batch.coordinates, subset_size)
+    ]
+
+
+def select_dispersed_points(
+    coordinates: np.ndarray,
+    subset_size: int,
+    max_exact_points: int = settings.DISPERSION_MAX_EXACT_CLIENTS,
+) -> np.ndarray:
+    """
+    Indices of a well dispersed subset of the (lat, lng) coordinates, with
+    the greedy construction heuristic of ``solve_clients_dispersion_problem``,
+    or of every coordinate when the subset size is not less than their
+    number.
+
+    The distance matrix is never built. The farthest pair starting the
+    subset is searched with distance bounds, and each selected point adds
+    one row of distances to the running minimum distance of every point to
+    the subset, in O(n) memory and O(n * subset_size) time. The selection
+    is the one of the full matrix.
+
+    Beyond ``max_exact_points`` points, when positive, the subset is
+    approximated by selecting among the first points of the cells of a
+    grid of about ``max_exact_points`` cells over the coordinates.
+    """
+
+    num_points = coordinates.shape[0]
+
     # If the subset size is not less than the number
-    # of clients, return all clients
-    if subset_size >= len(clients):
-        return clients
+    # of points, return all points
+    if subset_size >= num_points:
+        return np.arange(num_points)
 
-    # Compute distance matrix
-    client_locations = np.array(
-        [(client.lat, client.lng) for client in clients]
-    )
-    distance_matrix = cost_matrix.spherical(client_locations, client_locations)
+    if 0 < max_exact_points < num_points:
+        representatives = _grid_representatives(coordinates, max_exact_points)
+        if subset_size < representatives.size:
+            return representatives[
+                select_dispersed_points(
+                    coordinates[representatives], subset_size=subset_size
+                )
+            ]
 
     # Begin adding the farthest pair
-    selected_indices = list(
-        np.unravel_index(distance_matrix.argmax(), distance_matrix.shape)
+    selected_indices = list(_farthest_pair(coordinates))
+    min_distances = np.minimum(
+        _distances_from(coordinates, selected_indices[0]),
+        _distances_from(coordinates, selected_indices[1]),
     )
 
     # Add elements until the subset size is reached
     while len(selected_indices) < subset_size:
-        sub_distance_matrix = distance_matrix[selected_indices]
-
         # Add element with the greatest minimum distance among all pairs
-        new_index = sub_distance_matrix.min(axis=0).argmax()
+        new_index = int(min_distances.argmax())
         selected_indices.append(new_index)
+        np.minimum(
+            min_distances,
+            _distances_from(coordinates, new_index),
+            out=min_distances,
+        )
+
+    return np.array(selected_indices)
+
+
+def _distances_from(coordinates: np.ndarray, index: int) -> np.ndarray:
+    """Row of the spherical distance matrix of the coordinates"""
+
+    return cost_matrix.spherical(coordinates[[index]], coordinates)[0]
+
+
+def _farthest_pair(coordinates: np.ndarray) -> Tuple[int, int]:
+    """
+    Row and column of the first maximum, in row-major order, of the
+    spherical distance matrix of the coordinates, without building it.
+
+    The distance between two points is at most the sum of their distances
+    to a center, so a point can only be in the farthest pair with the
+    points far enough from the center. Points are scanned from the
+    farthest from the center on, each against the points it may reach
+    beyond the best distance found, until no pair can reach it. Rows of
+    the few points in pairs at that distance are then computed in full to
+    find the first maximum of the matrix, which is not exactly symmetric.
+    """
+
+    num_points = coordinates.shape[0]
+    radii = cost_matrix.spherical(
+        coordinates.mean(axis=0, keepdims=True), coordinates
+    )[0]
+    order = np.argsort(-radii, kind="stable")
+    sorted_radii = radii[order]
+
+    # Best distance of the pairs of each point scanned so far
+    point_distances = _distances_from(coordinates, order[0])
+    best_distance = point_distances.max()
+    point_distances[order[0]] = best_distance
+
+    start = 0
+    while start < num_points:
+        threshold = best_distance - DISTANCE_TOLERANCE
+        if sorted_radii[start] + sorted_radii[0] < threshold:
+            break
+
+        # Points within reach of the first point of the chunk, and so of
+        # the others, which are closer to the center
+        num_candidates = int(
+            np.searchsorted(
+                -sorted_radii, sorted_radii[start] - threshold, side="right"
+            )
+        )
+        end = min(
+            start + max(FARTHEST_PAIR_CHUNK_SIZE // num_candidates, 1),
+            num_points,
+        )
+        sources = order[start:end]
+        candidates = order[:num_candidates]
+        distances = cost_matrix.spherical(
+            coordinates[sources], coordinates[candidates]
+        )
+
+        best_distance = max(best_distance, distances.max())
+        point_distances[sources] = np.maximum(
+            point_distances[sources], distances.max(axis=1)
+        )
+        point_distances[candidates] = np.maximum(
+            point_distances[candidates], distances.max(axis=0)
+        )
+        start = end
+
+    # Co-located points share their rows
+    endpoints = np.flatnonzero(
+        point_distances >= best_distance - DISTANCE_TOLERANCE
+    )
+    _, first_endpoints, endpoint_rows = np.unique(
+        coordinates[endpoints], axis=0, return_index=True, return_inverse=True
+    )
+    rows = [
+        _distances_from(coordinates, endpoints[k]) for k in first_endpoints
+    ]
+    row_maxima = np.array([row.max() for row in rows])
+    endpoint_rows = endpoint_rows.reshape(-1)
+    k = np.flatnonzero(row_maxima[endpoint_rows] == row_maxima.max())[0]
+
+    return int(endpoints[k]), int(rows[endpoint_rows[k]].argmax())
+
+
+def _grid_representatives(
+    coordinates: np.ndarray, num_cells: int
+) -> np.ndarray:
+    """Indices of the first point of each non-empty cell of a square grid
+    of about ``num_cells`` cells over the coordinates"""
+
+    grid_size = max(int(np.sqrt(num_cells)), 1)
+    minimum = coordinates.min(axis=0)
+    extent = np.maximum(np.ptp(coordinates, axis=0), np.finfo(float).eps)
+    cells = np.minimum(
+        ((coordinates - minimum) / extent * grid_size).astype(np.int64),
+        grid_size - 1,
+    )
+    _, representatives = np.unique(
+        cells[:, 0] * grid_size + cells[:, 1], return_index=True
+    )
 
-    return [clients[index] for index in selected_indices]
+    return np.sort(representatives)
@@ -1,59 +1,270 @@
-from copy import deepcopy
-from typing import List
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from src.models import AssignedFacility
-from src.services import compute_service_area
+import numpy as np
+import shapely
+from shapely import MultiPolygon
+from shapely.geometry.base import BaseGeometry
+
+from config import settings
+from src.models import AssignedFacility, ServiceAreaType
+from src.services import (
+    compute_hex_grid_service_areas,
+    compute_service_area_polygons,
+    compute_voronoi_service_areas,
+)
+
+# Process pools by number of workers, shared by the evaluations of the
+# server
+_service_area_executors: Dict[int, ProcessPoolExecutor] = {}
+
+
+def compute_expected_tsp_route_distance(
+    num_clients: int, service_area: MultiPolygon
+) -> float:
+    """
+    Expected optimal distance of the TSP route visiting a number of
+    clients spread over the service area.
+    """
+
+    return round(
+        0.75 * (num_clients * service_area.area * 12_321) ** 0.5,
+        ndigits=2,
+    )
+
+
+def remove_exclusive_area_overlaps(
+    service_areas: Sequence[BaseGeometry],
+    exclusive_areas: Sequence[MultiPolygon],
+) -> List[BaseGeometry]:
+    """
+    Service areas without the exclusive service areas of the other
+    facilities.
+
+    The exclusive areas are indexed in an STRtree, queried once with every
+    service area, so only the pairs whose bounding boxes overlap are
+    tested, against the prepared exclusive areas. Each service area then
+    loses the union of the exclusive areas it intersects in a single
+    difference.
+    """
+
+    new_service_areas = list(service_areas)
+    exclusive_facilities = [
+        i for i, area in enumerate(exclusive_areas) if not area.is_empty
+    ]
+    if not exclusive_facilities:
+        return new_service_areas
+
+    exclusive_geometries = np.array(
+        [exclusive_areas[i] for i in exclusive_facilities]
+    )
+    shapely.prepare(exclusive_geometries)
+    tree = shapely.STRtree(exclusive_geometries)
+    service_area_indices, exclusive_indices = tree.query(
+        np.array(service_areas), predicate="intersects"
+    )
+    exclusive_facility_indices = np.array(exclusive_facilities)[
+        exclusive_indices
+    ]
+
+    # A facility keeps its own exclusive area
+    others = service_area_indices != exclusive_facility_indices
+    order = np.argsort(service_area_indices[others], kind="stable")
+    service_area_indices = service_area_indices[others][order]
+    exclusive_indices = exclusive_indices[others][order]
+
+    # Pairs are sorted by service area, so each one is a contiguous block
+    overlapped_areas, starts = np.unique(
+        service_area_indices, return_index=True
+    )
+    for j, overlapping_areas in zip(
+        overlapped_areas, np.split(exclusive_indices, starts[1:])
+    ):
+        new_service_areas[j] = new_service_areas[j].difference(
+            shapely.union_all(exclusive_geometries[overlapping_areas])
+        )
+
+    return new_service_areas
 
 
 def evaluate_assigned_facilities(
     assigned_facilities: List[AssignedFacility],
+    exclusive_area_masks: Optional[List[np.ndarray]] = None,
+    max_workers: int = settings.SERVICE_AREA_MAX_WORKERS,
+    parallel_min_clients: int = settings.SERVICE_AREA_PARALLEL_MIN_CLIENTS,
+    service_area_type: ServiceAreaType = ServiceAreaType.ALPHA_SHAPE,
 ) -> List[AssignedFacility]:
-    """Evaluate assigned facilities"""
+    """
+    Evaluate assigned facilities.
+
+    ``exclusive_area_masks`` holds, for each facility, a boolean mask of
+    its assigned clients lying inside its own exclusive service area, as
+    located by the solver. When it is not given, the clients are located
+    while computing each service area.
 
-    assigned_facilities_copy = deepcopy(assigned_facilities)
+    The service areas are computed in a process pool, ``max_workers`` at a
+    time, zero using every core, when the facilities have at least
+    ``parallel_min_clients`` clients, and in this process otherwise. Only
+    the coordinates of the clients outside the exclusive service areas are
+    sent to the workers.
+
+    With the ``VORONOI`` ``service_area_type``, the service areas are
+    instead the territories of the facilities, merged from the Voronoi
+    cells of their clients, which leave no gaps between them. With the
+    ``HEX_GRID`` one, they are the hexagonal grid cells where the
+    facilities are assigned most of the demand.
+    """
+
+    # The evaluated fields are replaced, never mutated, so the facilities
+    # and their clients can be shared with the input ones
+    assigned_facilities_copy = [
+        assigned_facility.model_copy()
+        for assigned_facility in assigned_facilities
+    ]
 
     # Compute facilities expected demand and service area
-    for i, assigned_facility_i in enumerate(assigned_facilities_copy):
-        assigned_facilities_copy[i].expected_demand = round(
-            sum(
-                client.demand
-                for client in assigned_facility_i.assigned_clients
-            )
+    for assigned_facility in assigned_facilities_copy:
+        assigned_facility.expected_demand = round(
+            float(assigned_facility.assigned_clients.demands.sum())
         )
-        assigned_facilities_copy[i].service_area = compute_service_area(
-            assigned_facility_i
+
+    if service_area_type == ServiceAreaType.VORONOI:
+        service_areas = compute_voronoi_service_areas(assigned_facilities_copy)
+    elif service_area_type == ServiceAreaType.HEX_GRID:
+        service_areas = compute_hex_grid_service_areas(
+            assigned_facilities_copy
+        )
+    else:
+        service_areas = _compute_alpha_shape_service_areas(
+            assigned_facilities=assigned_facilities_copy,
+            exclusive_area_masks=exclusive_area_masks,
+            max_workers=max_workers,
+            parallel_min_clients=parallel_min_clients,
         )
+    for i, service_area in enumerate(service_areas):
+        assigned_facilities_copy[i].service_area = service_area
 
     # Remove intersection between facilities service areas
-    for i, assigned_facility_i in enumerate(assigned_facilities_copy):
-        exclusive_area_i = assigned_facility_i.facility.exclusive_service_area
-        if exclusive_area_i.is_empty:
-            continue
-
-        for j, assigned_facility_j in enumerate(assigned_facilities_copy):
-            service_area_j = assigned_facility_j.service_area
-            if i == j or service_area_j.is_empty:
-                continue
-
-            intersection = exclusive_area_i.intersection(service_area_j)
-            if not intersection.is_empty:
-                new_service_area = service_area_j.difference(intersection)
-                assigned_facilities_copy[j].service_area = new_service_area
+    service_areas = remove_exclusive_area_overlaps(
+        service_areas=[
+            assigned_facility.service_area
+            for assigned_facility in assigned_facilities_copy
+        ],
+        exclusive_areas=[
+            assigned_facility.facility.exclusive_service_area
+            for assigned_facility in assigned_facilities_copy
+        ],
+    )
+    for i, service_area in enumerate(service_areas):
+        assigned_facilities_copy[i].service_area = service_area
 
     # Compute the expected optimal distance of the TSP route to meet the
     # demand of clients assigned to each facility.
     for i, assigned_facility in enumerate(assigned_facilities_copy):
-        service_area = assigned_facility.service_area
-        num_assigned_clients = len(assigned_facility.assigned_clients)
         assigned_facilities_copy[i].expected_optimal_tsp_route_distance = (
-            round(
-                (
-                    0.75
-                    * (num_assigned_clients * service_area.area * 12_321)
-                    ** 0.5
-                ),
-                ndigits=2,
+            compute_expected_tsp_route_distance(
+                num_clients=len(assigned_facility.assigned_clients),
+                service_area=assigned_facility.service_area,
             )
         )
 
     return assigned_facilities_copy
+
+
+def _compute_alpha_shape_service_areas(
+    assigned_facilities: List[AssignedFacility],
+    exclusive_area_masks: Optional[List[np.ndarray]],
+    max_workers: int,
+    parallel_min_clients: int,
+) -> List[MultiPolygon]:
+    """Alpha shape service areas of the assigned facilities, from their
+    clients outside their exclusive service areas"""
+
+    service_area_inputs = []
+    for i, assigned_facility in enumerate(assigned_facilities):
+        assigned_clients = assigned_facility.assigned_clients
+        exclusive_service_area = (
+            assigned_facility.facility.exclusive_service_area
+        )
+        exclusive_area_mask = (
+            exclusive_area_masks[i]
+            if exclusive_area_masks
+            else shapely.intersects_xy(
+                exclusive_service_area,
+                assigned_clients.lngs,
+                assigned_clients.lats,
+            )
+        )
+        service_area_inputs.append(
+            (
+                assigned_clients[
+                    ~np.asarray(exclusive_area_mask, dtype=bool)
+                ].coordinates,
+                exclusive_service_area,
+            )
+        )
+
+    return _compute_service_areas(
+        service_area_inputs=service_area_inputs,
+        max_workers=(
+            max_workers
+            if sum(len(coordinates) for coordinates, _ in service_area_inputs)
+            >= parallel_min_clients
+            else 1
+        ),
+    )
+
+
+def _compute_service_area(
+    service_area_input: Tuple[np.ndarray, MultiPolygon]
+) -> MultiPolygon:
+    coordinates, exclusive_service_area = service_area_input
+
+    return compute_service_area_polygons(
+        coordinates=coordinates,
+        exclusive_service_area=exclusive_service_area,
+    )
+
+
+def _service_area_executor(num_workers: int) -> ProcessPoolExecutor:
+    """Process pool of ``num_workers`` workers, started by the first
+    evaluation needing it, so that the server process does not fork new
+    workers on every request"""
+
+    if num_workers not in _service_area_executors:
+        _service_area_executors[num_workers] = ProcessPoolExecutor(
+            max_workers=num_workers
+        )
+
+    return _service_area_executors[num_workers]
+
+
+def _compute_service_areas(
+    service_area_inputs: List[Tuple[np.ndarray, MultiPolygon]],
+    max_workers: int,
+) -> List[MultiPolygon]:
+    """Service areas of the client coordinates and exclusive service areas
+    of the facilities, computed in a shared process pool, or in this
+    process when there is a single facility or worker, or when the pool
+    broke"""
+
+    num_workers = min(
+        max_workers or os.cpu_count() or 1, len(service_area_inputs)
+    )
+    if num_workers > 1:
+        try:
+            return list(
+                _service_area_executor(num_workers).map(
+                    _compute_service_area, service_area_inputs
+                )
+            )
+        except BrokenProcessPool:
+            # A worker died, start a new pool on the next evaluation
+            del _service_area_executors[num_workers]
+
+    return [
+        _compute_service_area(service_area_input)
+        for service_area_input in service_area_inputs
+    ]
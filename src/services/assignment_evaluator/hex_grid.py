@@ -0,0 +1,188 @@
+"""
+Hierarchical hexagonal grid of the (lng, lat) plane, whose cells make up
+the territories of the facilities and a lookup table of the facility of
+each cell.
+
+The cells are pointy-top hexagons in axial (q, r) coordinates. The
+vertices of all the cells lie on a lattice of ``sqrt(3) / 2`` by ``1 / 2``
+cell sizes, so neighbouring cells share their vertices exactly. Each
+level of the grid has cells twice as large as the previous one.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import shapely
+
+from config import settings
+from src.models import AssignedFacility, CellLookup
+
+SQRT_3 = np.sqrt(3)
+LEVEL_SCALE = 2
+
+# Vertices of a cell on the lattice, around its center at (2q + r, 3r)
+CORNER_X = np.array([1, 0, -1, -1, 0, 1])
+CORNER_Y = np.array([1, 2, 1, -1, -2, -1])
+
+
+def hex_cells(
+    lats: np.ndarray, lngs: np.ndarray, cell_size: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Axial coordinates of the cells of size ``cell_size`` holding the
+    points, rounded through cube coordinates"""
+
+    q = (SQRT_3 / 3 * np.asarray(lngs) - np.asarray(lats) / 3) / cell_size
+    r = 2 / 3 * np.asarray(lats) / cell_size
+    s = -q - r
+
+    rounded_q, rounded_r, rounded_s = np.round(q), np.round(r), np.round(s)
+    q_error = np.abs(rounded_q - q)
+    r_error = np.abs(rounded_r - r)
+    s_error = np.abs(rounded_s - s)
+    fix_q = (q_error > r_error) & (q_error > s_error)
+    fix_r = ~fix_q & (r_error > s_error)
+    rounded_q = np.where(fix_q, -rounded_r - rounded_s, rounded_q)
+    rounded_r = np.where(fix_r, -rounded_q - rounded_s, rounded_r)
+
+    return rounded_q.astype(np.int64), rounded_r.astype(np.int64)
+
+
+def hex_cell_polygons(
+    qs: np.ndarray, rs: np.ndarray, cell_size: float
+) -> np.ndarray:
+    """Polygons of the cells of size ``cell_size`` at the axial
+    coordinates"""
+
+    xs = (2 * np.asarray(qs) + np.asarray(rs))[:, None] + CORNER_X
+    ys = 3 * np.asarray(rs)[:, None] + CORNER_Y
+
+    return shapely.polygons(
+        np.stack(
+            (xs * (SQRT_3 / 2 * cell_size), ys * (cell_size / 2)), axis=-1
+        )
+    )
+
+
+def majority_cells(
+    assigned_facilities: List[AssignedFacility], cell_size: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Axial coordinates of the cells of size ``cell_size`` holding assigned
+    clients, and index of the facility assigned most of the demand of the
+    clients of each cell, the first one on ties.
+    """
+
+    assigned_clients = [
+        assigned_facility.assigned_clients
+        for assigned_facility in assigned_facilities
+    ]
+    client_facilities = np.repeat(
+        np.arange(len(assigned_facilities)),
+        [len(clients) for clients in assigned_clients],
+    )
+    qs, rs = hex_cells(
+        lats=np.concatenate(
+            [clients.lats for clients in assigned_clients] + [np.empty(0)]
+        ),
+        lngs=np.concatenate(
+            [clients.lngs for clients in assigned_clients] + [np.empty(0)]
+        ),
+        cell_size=cell_size,
+    )
+    demands = np.concatenate(
+        [clients.demands for clients in assigned_clients] + [np.empty(0)]
+    )
+
+    # Demand of each facility in each cell
+    cell_facilities, inverse = np.unique(
+        np.column_stack((qs, rs, client_facilities)),
+        axis=0,
+        return_inverse=True,
+    )
+    cell_demands = np.bincount(
+        inverse.reshape(-1), weights=demands, minlength=len(cell_facilities)
+    )
+
+    # Facilities of each cell by decreasing demand, keeping the first one
+    order = np.lexsort(
+        (
+            cell_facilities[:, 2],
+            -cell_demands,
+            cell_facilities[:, 1],
+            cell_facilities[:, 0],
+        )
+    )
+    cell_facilities = cell_facilities[order]
+    first = np.ones(len(cell_facilities), dtype=bool)
+    first[1:] = (cell_facilities[1:, :2] != cell_facilities[:-1, :2]).any(
+        axis=1
+    )
+    cell_facilities = cell_facilities[first]
+
+    return cell_facilities[:, 0], cell_facilities[:, 1], cell_facilities[:, 2]
+
+
+def build_cell_lookup(
+    assigned_facilities: List[AssignedFacility],
+    cell_size: float = settings.HEX_GRID_CELL_SIZE,
+    num_levels: int = settings.HEX_GRID_NUM_LEVELS,
+) -> CellLookup:
+    """Lookup table of the facility of the cells holding assigned
+    clients, on every level of the grid"""
+
+    facility_ids = [
+        assigned_facility.facility.id
+        for assigned_facility in assigned_facilities
+    ]
+    cell_facilities: Dict[str, str] = {}
+    for level in range(num_levels):
+        qs, rs, facilities = majority_cells(
+            assigned_facilities, cell_size * LEVEL_SCALE**level
+        )
+        cell_facilities.update(
+            (f"{level}:{q}:{r}", facility_ids[i])
+            for q, r, i in zip(qs.tolist(), rs.tolist(), facilities.tolist())
+        )
+
+    return CellLookup(
+        cell_size=cell_size,
+        num_levels=num_levels,
+        cell_facilities=cell_facilities,
+    )
+
+
+def lookup_cell_facilities(
+    cell_lookup: CellLookup, lats: np.ndarray, lngs: np.ndarray
+) -> List[Optional[str]]:
+    """
+    Facility id of the points, read from the lookup table with one hash
+    lookup per level instead of point in polygon tests. A point takes the
+    facility of its cell on the finest level that holds assigned clients,
+    or None when no level does. The exclusive service areas are not
+    checked.
+    """
+
+    level_keys = []
+    for level in range(cell_lookup.num_levels):
+        qs, rs = hex_cells(
+            lats, lngs, cell_lookup.cell_size * LEVEL_SCALE**level
+        )
+        level_keys.append(
+            [f"{level}:{q}:{r}" for q, r in zip(qs.tolist(), rs.tolist())]
+        )
+
+    cell_facilities = cell_lookup.cell_facilities
+    facility_ids: List[Optional[str]] = []
+    for keys in zip(*level_keys):
+        facility_ids.append(
+            next(
+                (
+                    cell_facilities[key]
+                    for key in keys
+                    if key in cell_facilities
+                ),
+                None,
+            )
+        )
+
+    return facility_ids
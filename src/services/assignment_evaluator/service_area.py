@@ -1,43 +1,77 @@
-from copy import deepcopy
+from typing import List, Optional
 
-from shapely import MultiPolygon, Point, Polygon
+import numpy as np
+import shapely
+from shapely import MultiPolygon, Polygon
+from shapely.geometry.base import BaseGeometry
 from uhull.alpha_shape import get_alpha_shape_polygons
 
 from config import settings
 from src.models import AssignedFacility
-from src.services import solve_clients_dispersion_problem
+from src.services import (
+    hex_cell_polygons,
+    majority_cells,
+    select_dispersed_points,
+)
 
 
 def compute_service_area(
     assigned_facility: AssignedFacility,
     alpha=settings.ALPHA_VALUE_CONCAVE_HULL_CONCAVITY,
+    exclusive_area_mask: Optional[np.ndarray] = None,
 ) -> MultiPolygon:
-    """Compute facility service area"""
+    """
+    Compute facility service area.
 
-    facility = deepcopy(assigned_facility.facility)
-    assigned_clients = deepcopy(assigned_facility.assigned_clients)
+    ``exclusive_area_mask`` tells which assigned clients lie inside the
+    facility exclusive service area, as located by the solver. When it
+    is not given, the clients are located here.
+    """
 
-    clients_subset = solve_clients_dispersion_problem(
-        clients=assigned_clients,
-        subset_size=settings.DISPERSED_CLIENTS_SUBSET_SIZE,
+    facility = assigned_facility.facility
+    assigned_clients = assigned_facility.assigned_clients
+
+    if exclusive_area_mask is None:
+        exclusive_area_mask = shapely.intersects_xy(
+            facility.exclusive_service_area,
+            assigned_clients.lngs,
+            assigned_clients.lats,
+        )
+
+    return compute_service_area_polygons(
+        coordinates=assigned_clients[
+            ~np.asarray(exclusive_area_mask, dtype=bool)
+        ].coordinates,
+        exclusive_service_area=facility.exclusive_service_area,
+        alpha=alpha,
     )
 
-    if not facility.exclusive_service_area.is_empty:
-        filtered_clients = [
-            client
-            for client in assigned_clients
-            if not facility.exclusive_service_area.intersects(
-                Point(client.lng, client.lat)
-            )
-        ]
-        clients_subset = solve_clients_dispersion_problem(
-            clients=filtered_clients,
-            subset_size=settings.DISPERSED_CLIENTS_SUBSET_SIZE,
+
+def compute_service_area_polygons(
+    coordinates: np.ndarray,
+    exclusive_service_area: MultiPolygon,
+    alpha: float = settings.ALPHA_VALUE_CONCAVE_HULL_CONCAVITY,
+) -> MultiPolygon:
+    """
+    Service area of a facility from the (lat, lng) coordinates of its
+    assigned clients outside its exclusive service area: the exclusive
+    service area and the alpha shape of a dispersed subset of the clients.
+    """
+
+    subset_coordinates = coordinates[
+        select_dispersed_points(
+            coordinates, subset_size=settings.DISPERSED_CLIENTS_SUBSET_SIZE
         )
+    ]
 
-    polygons = list(facility.exclusive_service_area.geoms)
+    polygons = list(exclusive_service_area.geoms)
     client_coordinates = list(
-        set((client.lng, client.lat) for client in clients_subset)
+        set(
+            zip(
+                subset_coordinates[:, 1].tolist(),
+                subset_coordinates[:, 0].tolist(),
+            )
+        )
     )
 
     if len(client_coordinates) > 3:
@@ -50,3 +84,141 @@ def compute_service_area(
                 polygons.append(new_polygon)
 
     return MultiPolygon(polygons)
+
+
+def compute_voronoi_service_areas(
+    assigned_facilities: List[AssignedFacility],
+    boundary_buffer: float = settings.VORONOI_BOUNDARY_BUFFER,
+) -> List[MultiPolygon]:
+    """
+    Service areas of the facilities as territories partitioning the
+    region of their clients: the Voronoi cells of the assigned clients,
+    merged per facility, together with its exclusive service area.
+
+    The region is the convex hull of the clients, buffered by
+    ``boundary_buffer`` degrees, and the diagram of all the clients is
+    built in a single call. Co-located clients assigned to different
+    facilities share one cell, given to the first of these facilities.
+    """
+
+    exclusive_areas = [
+        assigned_facility.facility.exclusive_service_area
+        for assigned_facility in assigned_facilities
+    ]
+    assigned_clients = [
+        assigned_facility.assigned_clients
+        for assigned_facility in assigned_facilities
+    ]
+    client_facilities = np.repeat(
+        np.arange(len(assigned_facilities)),
+        [len(clients) for clients in assigned_clients],
+    )
+    coordinates, first_indices = np.unique(
+        np.column_stack(
+            (
+                np.concatenate(
+                    [clients.lngs for clients in assigned_clients]
+                    + [np.empty(0)]
+                ),
+                np.concatenate(
+                    [clients.lats for clients in assigned_clients]
+                    + [np.empty(0)]
+                ),
+            )
+        ),
+        axis=0,
+        return_index=True,
+    )
+    if not len(coordinates):
+        return list(exclusive_areas)
+
+    points = shapely.points(coordinates)
+    region = shapely.convex_hull(shapely.multipoints(points)).buffer(
+        boundary_buffer
+    )
+    if len(points) == 1:
+        cells = np.array([region])
+        cell_facilities = client_facilities[first_indices]
+    else:
+        cells = shapely.get_parts(
+            shapely.voronoi_polygons(
+                shapely.multipoints(points), extend_to=region
+            )
+        )
+        # The cells do not follow the order of the points, each one is
+        # matched to the single point it contains
+        cell_indices, point_indices = shapely.STRtree(points).query(
+            cells, predicate="contains"
+        )
+        cells = cells[cell_indices]
+        cell_facilities = client_facilities[first_indices[point_indices]]
+
+    # The cells share their edges exactly, so the cells of a facility are
+    # merged as a coverage, and only the merged territory is clipped
+    order = np.argsort(cell_facilities, kind="stable")
+    facilities, starts = np.unique(cell_facilities[order], return_index=True)
+    territories = shapely.intersection(
+        np.array(
+            [
+                shapely.coverage_union_all(facility_cells)
+                for facility_cells in np.split(cells[order], starts[1:])
+            ]
+        ),
+        region,
+    )
+
+    service_areas = list(exclusive_areas)
+    for i, territory in zip(facilities, territories):
+        service_areas[i] = _to_multipolygon(
+            territory.union(exclusive_areas[i])
+            if not exclusive_areas[i].is_empty
+            else territory
+        )
+
+    return service_areas
+
+
+def compute_hex_grid_service_areas(
+    assigned_facilities: List[AssignedFacility],
+    cell_size: float = settings.HEX_GRID_CELL_SIZE,
+) -> List[MultiPolygon]:
+    """
+    Service areas of the facilities as the union of the hexagonal grid
+    cells, of size ``cell_size`` degrees, where they are assigned most of
+    the demand, together with their exclusive service areas. The cells
+    share their vertices exactly, so they are merged as a coverage.
+    """
+
+    exclusive_areas = [
+        assigned_facility.facility.exclusive_service_area
+        for assigned_facility in assigned_facilities
+    ]
+    qs, rs, cell_facilities = majority_cells(assigned_facilities, cell_size)
+    cells = hex_cell_polygons(qs, rs, cell_size)
+
+    order = np.argsort(cell_facilities, kind="stable")
+    facilities, starts = np.unique(cell_facilities[order], return_index=True)
+    service_areas = list(exclusive_areas)
+    for i, facility_cells in zip(
+        facilities, np.split(cells[order], starts[1:])
+    ):
+        territory = shapely.coverage_union_all(facility_cells)
+        service_areas[i] = _to_multipolygon(
+            territory.union(exclusive_areas[i])
+            if not exclusive_areas[i].is_empty
+            else territory
+        )
+
+    return service_areas
+
+
+def _to_multipolygon(geometry: BaseGeometry) -> MultiPolygon:
+    """MultiPolygon of the polygons of a geometry"""
+
+    return MultiPolygon(
+        [
+            part
+            for part in shapely.get_parts(geometry)
+            if isinstance(part, Polygon)
+        ]
+    )
@@ -0,0 +1,230 @@
+from typing import Iterable, List, NamedTuple
+
+import numpy as np
+
+from src.models import (
+    AssignedFacility,
+    AssignmentProblem,
+    Client,
+    ClientBatch,
+)
+from src.services import (
+    compute_expected_tsp_route_distance,
+    group_clients_by_facility,
+)
+
+
+class ClientAggregation(NamedTuple):
+    """
+    Clients grouped by identical coordinates.
+
+    Attributes
+    ----------
+    locations
+        One client per distinct coordinate, in order of first appearance,
+        with the id of the first client at the coordinate and unit demand.
+    client_locations
+        Index in ``locations`` of the coordinate of each client.
+    """
+
+    locations: ClientBatch
+    client_locations: np.ndarray
+
+    @property
+    def reduction_ratio(self) -> float:
+        """Share of the clients removed by merging co-located ones"""
+
+        return 1 - len(self.locations) / max(self.client_locations.size, 1)
+
+
+def aggregate_colocated_clients(
+    clients: Iterable[Client],
+) -> ClientAggregation:
+    """Group clients with identical coordinates"""
+
+    client_batch = ClientBatch.from_clients(clients)
+    _, first_indices, inverse = np.unique(
+        client_batch.coordinates,
+        axis=0,
+        return_index=True,
+        return_inverse=True,
+    )
+
+    # np.unique sorts the coordinates, restore the order of first
+    # appearance so that a problem without co-located clients is unchanged.
+    order = np.argsort(first_indices)
+    ranks = np.empty_like(order)
+    ranks[order] = np.arange(order.size)
+
+    return ClientAggregation(
+        locations=client_batch[first_indices[order]].with_demands(
+            np.ones(order.size)
+        ),
+        client_locations=ranks[inverse.reshape(-1)],
+    )
+
+
+def merge_colocated_clients(
+    assignment_problem: AssignmentProblem, aggregation: ClientAggregation
+) -> AssignmentProblem:
+    """
+    Merge the clients of the problem sharing a coordinate into weighted
+    super-clients.
+
+    Each super-client holds the sum of the demands and of the cost matrix
+    columns of its clients, and the scaled unit costs of its first client.
+    Co-located clients have proportional costs to every facility, so the
+    Min Cost Flow formulation of the merged problem has the same optimal
+    cost as the original one.
+    """
+
+    num_locations = len(aggregation.locations)
+    client_locations = aggregation.client_locations
+    demands = np.bincount(
+        client_locations,
+        weights=assignment_problem.clients.demands,
+        minlength=num_locations,
+    )
+
+    order = np.argsort(client_locations, kind="stable")
+    starts = np.searchsorted(client_locations[order], np.arange(num_locations))
+    cost_matrix = None
+    if assignment_problem.cost_matrix is not None:
+        cost_matrix = np.add.reduceat(
+            assignment_problem.cost_matrix[:, order], starts, axis=1
+        )
+    scaled_unit_costs = None
+    if assignment_problem.scaled_unit_costs is not None:
+        scaled_unit_costs = assignment_problem.scaled_unit_costs[
+            :, order[starts]
+        ]
+
+    # A super-client is warm started from the facility of its first client
+    initial_client_facilities = None
+    if assignment_problem.initial_client_facilities is not None:
+        initial_client_facilities = np.full(num_locations, -1)
+        initial_client_facilities[client_locations[::-1]] = (
+            assignment_problem.initial_client_facilities[::-1]
+        )
+
+    return assignment_problem.model_copy(
+        update={
+            "initial_client_facilities": initial_client_facilities,
+            "clients": aggregation.locations.with_demands(demands),
+            "cost_matrix": cost_matrix,
+            "scaled_unit_costs": scaled_unit_costs,
+        }
+    )
+
+
+def expand_assigned_facilities(
+    assigned_facilities: List[AssignedFacility],
+    clients: Iterable[Client],
+    aggregation: ClientAggregation,
+) -> List[AssignedFacility]:
+    """
+    Replace the super-clients assigned to each facility by the clients
+    they merge, updating the expected TSP route distance to the number of
+    clients served.
+    """
+
+    client_batch = ClientBatch.from_clients(clients)
+    location_indices = {
+        coordinate: index
+        for index, coordinate in enumerate(
+            zip(
+                aggregation.locations.lats.tolist(),
+                aggregation.locations.lngs.tolist(),
+            )
+        )
+    }
+    location_members = group_clients_by_facility(
+        client_facilities=aggregation.client_locations,
+        num_facilities=len(aggregation.locations),
+    )
+
+    expanded_facilities = []
+    for assigned_facility in assigned_facilities:
+        super_clients = assigned_facility.assigned_clients
+        assigned_clients = client_batch[
+            np.concatenate(
+                [
+                    location_members[location_indices[coordinate]]
+                    for coordinate in zip(
+                        super_clients.lats.tolist(),
+                        super_clients.lngs.tolist(),
+                    )
+                ]
+                + [np.empty(0, dtype=np.int64)]
+            )
+        ]
+        expanded_facilities.append(
+            assigned_facility.model_copy(
+                update={
+                    "assigned_clients": assigned_clients,
+                    "expected_optimal_tsp_route_distance": (
+                        compute_expected_tsp_route_distance(
+                            num_clients=len(assigned_clients),
+                            service_area=assigned_facility.service_area,
+                        )
+                    ),
+                }
+            )
+        )
+
+    return expanded_facilities
+
+
+def violates_demand_bounds(
+    assigned_facilities: List[AssignedFacility],
+    tolerance: float = 1e-6,
+) -> bool:
+    """
+    Whether some facility is assigned more demand than its maximum, when
+    it has one, or less than its minimum.
+
+    Expanding a super-client gives all its clients to the facility of its
+    largest flow, so a super-client whose flow was split by a binding
+    demand bound moves the excess past that bound.
+    """
+
+    for assigned_facility in assigned_facilities:
+        facility = assigned_facility.facility
+        demand = float(assigned_facility.assigned_clients.demands.sum())
+        if facility.max_demand and demand > facility.max_demand + tolerance:
+            return True
+        if demand < facility.min_demand - tolerance:
+            return True
+
+    return False
+
+
+def assignment_cost(
+    assigned_facilities: List[AssignedFacility],
+    clients: ClientBatch,
+    aggregation: ClientAggregation,
+    location_costs: np.ndarray,
+) -> float:
+    """
+    Cost of the assignment of the ``clients`` to the facilities, each
+    client costing its demand times the cost of its location, grouped by
+    ``aggregation``, in ``location_costs``.
+
+    Expanding a super-client whose flow was split gives all its clients
+    to one facility, so the expanded assignment costs more than the flow.
+    """
+
+    client_indices = dict(zip(clients.ids.tolist(), range(len(clients))))
+
+    cost = 0.0
+    for i, assigned_facility in enumerate(assigned_facilities):
+        indices = [
+            client_indices[client_id]
+            for client_id in assigned_facility.assigned_clients.ids.tolist()
+        ]
+        cost += float(
+            location_costs[i, aggregation.client_locations[indices]]
+            @ clients.demands[indices]
+        )
+
+    return cost
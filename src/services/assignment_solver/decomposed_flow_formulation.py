@@ -0,0 +1,336 @@
+"""
+Metropolitan-scale instances are split into spatial regions by clustering
+the facility coordinates, each client joining the region of its cheapest
+facility. The regions are solved as independent Min Cost Flow problems in
+a process pool, started once and reused by the next solves, and a coupling
+solve then reassigns the border clients, those with a facility of another
+region nearly as cheap, and the clients the regions could not serve,
+checking the reduced costs of every arc to prove the combined assignment
+optimal.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import settings
+from src.models import (
+    AssignmentProblem,
+    AssignmentSolution,
+    Facility,
+    SolutionStatus,
+)
+from src.services import (
+    FlowNetwork,
+    FlowSolution,
+    build_flow_assignment_solution,
+    build_flow_network,
+    extract_client_facilities,
+    locate_clients_in_exclusive_areas,
+    select_candidate_arcs,
+    solve_core_mcf_model,
+    solve_mcf_model,
+)
+
+MAX_KMEANS_ITERATIONS = 100
+REGION_CANDIDATE_FACILITIES = 5
+
+# Process pools by number of workers, shared by the solves of the server
+_region_executors: Dict[int, ProcessPoolExecutor] = {}
+
+
+def cluster_facilities(
+    facilities: List[Facility], num_regions: int, seed: int = 2024
+) -> np.ndarray:
+    """
+    Cluster the facility coordinates into at most ``num_regions`` regions
+    with k-means, seeded with k-means++, and return the region index of
+    each facility. The regions are numbered from zero and none is empty.
+    """
+
+    coordinates = np.array(
+        [(facility.lng, facility.lat) for facility in facilities]
+    )
+    # Equirectangular projection, so both axes measure the same distance
+    coordinates[:, 0] *= np.cos(np.radians(coordinates[:, 1].mean()))
+
+    num_facilities = len(facilities)
+    num_regions = min(num_regions, num_facilities)
+    rng = np.random.default_rng(seed)
+
+    centers = coordinates[[rng.integers(num_facilities)]]
+    for _ in range(1, num_regions):
+        distances = (
+            ((coordinates[:, np.newaxis] - centers[np.newaxis]) ** 2)
+            .sum(axis=2)
+            .min(axis=1)
+        )
+        if not distances.sum():
+            break
+        next_center = rng.choice(num_facilities, p=distances / distances.sum())
+        centers = np.vstack((centers, coordinates[next_center]))
+
+    for _ in range(MAX_KMEANS_ITERATIONS):
+        regions = (
+            ((coordinates[:, np.newaxis] - centers[np.newaxis]) ** 2)
+            .sum(axis=2)
+            .argmin(axis=1)
+        )
+        new_centers = centers.copy()
+        for region in np.unique(regions):
+            new_centers[region] = coordinates[regions == region].mean(axis=0)
+        if np.allclose(new_centers, centers):
+            break
+        centers = new_centers
+
+    return np.unique(regions, return_inverse=True)[1]
+
+
+def _build_region_network(
+    network: FlowNetwork,
+    region_facilities: np.ndarray,
+    region_clients: np.ndarray,
+    overflow_cost: int,
+) -> FlowNetwork:
+    """
+    Network of the clients and facilities of a region, plus an overflow
+    facility that takes, at ``overflow_cost``, the clients the region
+    facilities cannot serve. The minimum demands are left to the coupling
+    solve, so the regional network is always feasible.
+    """
+
+    num_clients = region_clients.size
+    upper = network.facility_min_demands + network.facility_capacities
+    client_supplies = network.client_supplies[region_clients]
+
+    return FlowNetwork(
+        client_supplies=client_supplies,
+        facility_min_demands=np.zeros(
+            region_facilities.size + 1, dtype=np.int64
+        ),
+        facility_capacities=np.append(
+            upper[region_facilities], client_supplies.sum()
+        ),
+        unit_costs=np.vstack(
+            (
+                network.unit_costs[np.ix_(region_facilities, region_clients)],
+                np.full((1, num_clients), overflow_cost),
+            )
+        ),
+        eligible=np.vstack(
+            (
+                network.eligible[np.ix_(region_facilities, region_clients)],
+                np.ones((1, num_clients), dtype=bool),
+            )
+        ),
+    )
+
+
+def _solve_region(network: FlowNetwork) -> np.ndarray:
+    """
+    Facility index of each client in the optimal flow of a region. The
+    clients whose demand is split among several facilities get the index
+    of the overflow facility, the last one, as they are left to the
+    coupling solve.
+    """
+
+    result = solve_mcf_model(
+        network=network,
+        candidate_arcs=select_candidate_arcs(
+            network=network,
+            num_candidate_facilities=REGION_CANDIDATE_FACILITIES,
+        ),
+    )
+
+    num_clients = network.client_supplies.size
+    client_facilities = extract_client_facilities(
+        model=result.model,
+        arc_clients=result.arc_clients,
+        arc_facilities=result.arc_facilities,
+        num_clients=num_clients,
+    )
+
+    flows = result.model.flows(
+        np.arange(result.arc_clients.size, dtype=np.int32)
+    )
+    split_clients = (
+        np.bincount(result.arc_clients[flows > 0], minlength=num_clients) > 1
+    )
+    client_facilities[split_clients] = network.facility_min_demands.size - 1
+
+    return client_facilities
+
+
+def _region_executor(num_workers: int) -> ProcessPoolExecutor:
+    """Process pool of ``num_workers`` workers, started by the first solve
+    needing it, so that the server process does not fork new workers on
+    every request"""
+
+    if num_workers not in _region_executors:
+        _region_executors[num_workers] = ProcessPoolExecutor(
+            max_workers=num_workers
+        )
+
+    return _region_executors[num_workers]
+
+
+def _solve_regions(
+    region_networks: List[FlowNetwork], max_workers: int
+) -> List[np.ndarray]:
+    """Solve the regions in a shared process pool, or in this process when
+    there is a single region or worker, or when the pool broke"""
+
+    num_workers = min(max_workers or os.cpu_count() or 1, len(region_networks))
+    if num_workers > 1:
+        try:
+            return list(
+                _region_executor(num_workers).map(
+                    _solve_region, region_networks
+                )
+            )
+        except BrokenProcessPool:
+            # A worker died, start a new pool on the next solve
+            del _region_executors[num_workers]
+
+    return [_solve_region(network) for network in region_networks]
+
+
+def solve_decomposed_flow_model(
+    network: FlowNetwork,
+    facility_regions: np.ndarray,
+    border_tolerance: float = settings.DECOMPOSITION_BORDER_TOLERANCE,
+    max_workers: int = settings.DECOMPOSITION_MAX_WORKERS,
+    max_coupling_rounds: int = settings.DECOMPOSITION_MAX_COUPLING_ROUNDS,
+    parallel_min_clients: int = settings.DECOMPOSITION_PARALLEL_MIN_CLIENTS,
+) -> Optional[FlowSolution]:
+    """
+    Solve the network by regions.
+
+    Each client joins the region of its cheapest eligible facility and the
+    regions are solved in parallel, ``max_workers`` at a time, zero using
+    every core, when the network has at least ``parallel_min_clients``
+    clients, and in this process otherwise. The coupling solve then frees
+    the clients left over by the regions and the border clients, whose
+    cheapest facility in another region costs at most ``border_tolerance``
+    more than their regional one, keeping the other clients at their
+    regional facility unless the reduced costs show that moving them
+    improves the solution. The coupling is repeated until the solution is
+    proven optimal, or for at most ``max_coupling_rounds`` rounds when
+    positive, trading the proof for a small gap.
+
+    Returns
+    -------
+    Optional
+        The solution, or None when the problem is infeasible.
+    """
+
+    num_clients = network.client_supplies.size
+    clients = np.arange(num_clients)
+    costs = np.where(network.eligible, network.unit_costs, np.inf)
+    cheapest = costs.argmin(axis=0)
+    client_regions = facility_regions[cheapest]
+
+    # Solve the regions, an overflow facility taking their excess clients
+    overflow_cost = int(network.unit_costs.max()) + 1
+    regions = [
+        (
+            np.flatnonzero(facility_regions == region),
+            np.flatnonzero(client_regions == region),
+        )
+        for region in np.unique(client_regions)
+    ]
+    region_solutions = _solve_regions(
+        region_networks=[
+            _build_region_network(
+                network=network,
+                region_facilities=region_facilities,
+                region_clients=region_clients,
+                overflow_cost=overflow_cost,
+            )
+            for region_facilities, region_clients in regions
+        ],
+        max_workers=max_workers if num_clients >= parallel_min_clients else 1,
+    )
+
+    client_facilities = cheapest.copy()
+    overflowed = np.zeros(num_clients, dtype=bool)
+    for (region_facilities, region_clients), region_client_facilities in zip(
+        regions, region_solutions
+    ):
+        served = region_client_facilities < region_facilities.size
+        client_facilities[region_clients[served]] = region_facilities[
+            region_client_facilities[served]
+        ]
+        overflowed[region_clients[~served]] = True
+
+    # Relative extra cost of the cheapest facility of another region
+    assigned_costs = costs[client_facilities, clients]
+    costs[facility_regions[:, np.newaxis] == client_regions] = np.inf
+    with np.errstate(divide="ignore", invalid="ignore"):
+        priorities = costs.min(axis=0) / assigned_costs - 1
+    priorities = np.nan_to_num(priorities, nan=0, posinf=np.inf)
+    priorities[overflowed] = -np.inf
+    del costs
+
+    candidate_arcs = select_candidate_arcs(
+        network=network, num_candidate_facilities=2
+    ).copy()
+    candidate_arcs[client_facilities, clients] = True
+
+    return solve_core_mcf_model(
+        network=network,
+        client_facilities=client_facilities,
+        priorities=priorities,
+        candidate_arcs=candidate_arcs,
+        core_share=np.mean(priorities <= border_tolerance),
+        max_rounds=max_coupling_rounds,
+    )
+
+
+def solve_decomposed_flow_formulation(
+    assignment_problem: AssignmentProblem,
+) -> AssignmentSolution:
+    """
+    Solve assignment problem via Min Cost Flow, split into spatial regions
+    of the facilities solved in parallel and coupled by a final solve over
+    the border clients. Unless the coupling rounds are limited, it
+    reaches the Min Cost Flow optimum.
+    """
+
+    # Locate the clients inside exclusive service areas
+    try:
+        client_exclusive_facilities = locate_clients_in_exclusive_areas(
+            clients=assignment_problem.clients,
+            facilities=assignment_problem.facilities,
+        )
+    except ValueError as e:
+        return AssignmentSolution(
+            solution_status=SolutionStatus.INFEASIBLE,
+            message=str(e),
+        )
+
+    network = build_flow_network(
+        assignment_problem=assignment_problem,
+        client_exclusive_facilities=client_exclusive_facilities,
+    )
+    solution = solve_decomposed_flow_model(
+        network=network,
+        facility_regions=cluster_facilities(
+            facilities=assignment_problem.facilities,
+            num_regions=assignment_problem.num_regions,
+        ),
+    )
+
+    if solution is not None:
+        return build_flow_assignment_solution(
+            assignment_problem=assignment_problem,
+            client_facilities=solution.client_facilities,
+            cost=solution.cost,
+            client_exclusive_facilities=client_exclusive_facilities,
+            optimal=solution.optimal,
+        )
+
+    return AssignmentSolution(message="No optimal solution found")
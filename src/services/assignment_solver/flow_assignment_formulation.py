@@ -1,7 +1,7 @@
-from typing import Dict, List
+from typing import NamedTuple, Optional, Tuple
 
+import numpy as np
 from ortools.graph.python import min_cost_flow
-from shapely import Point
 
 from config import settings
 from src.models import (
@@ -12,153 +12,722 @@ from src.models import (
 )
 from src.services import (
     evaluate_assigned_facilities,
+    group_clients_by_facility,
+    locate_clients_in_exclusive_areas,
     scale_assignment_problem_parameters,
 )
 
 
-def _build_mcf_model(
+class FlowNetwork(NamedTuple):
+    """
+    Integer data of the Min Cost Flow network.
+
+    Attributes
+    ----------
+    client_supplies
+        Scaled demand of each client, supplied by its node.
+    facility_min_demands
+        Scaled minimum demand of each facility, demanded by its node.
+    facility_capacities
+        Capacity of the arc from each facility to the terminal node, that
+        is the scaled maximum demand minus the minimum demand.
+    unit_costs
+        Scaled unit costs of shape (num_facilities, num_clients).
+    eligible
+        Boolean mask of shape (num_facilities, num_clients) of the client
+        to facility arcs allowed by the exclusive service areas.
+    """
+
+    client_supplies: np.ndarray
+    facility_min_demands: np.ndarray
+    facility_capacities: np.ndarray
+    unit_costs: np.ndarray
+    eligible: np.ndarray
+
+
+class FlowSolution(NamedTuple):
+    """
+    Assignment found by a flow solver.
+
+    Attributes
+    ----------
+    client_facilities
+        Index of the facility assigned to each client.
+    cost
+        Scaled cost of the flow.
+    optimal
+        Whether the reduced costs prove the flow optimal.
+    """
+
+    client_facilities: np.ndarray
+    cost: int
+    optimal: bool
+
+
+class MCFResult(NamedTuple):
+    """
+    Solved Min Cost Flow model.
+
+    Attributes
+    ----------
+    status
+        Status returned by the solver.
+    model
+        The solved model.
+    arc_clients, arc_facilities
+        Client and facility indices of the client to facility arcs, which
+        are the first arcs of the model.
+    """
+
+    status: min_cost_flow.SimpleMinCostFlow.Status
+    model: min_cost_flow.SimpleMinCostFlow
+    arc_clients: np.ndarray
+    arc_facilities: np.ndarray
+
+
+def _build_eligibility_mask(
+    client_exclusive_facilities: np.ndarray, num_facilities: int
+) -> np.ndarray:
+    """
+    Build a boolean mask of shape (num_facilities, num_clients) whose
+    entry (i, j) tells whether client j may be assigned to facility i.
+    A client inside an exclusive service area may only be assigned to the
+    facility that owns that area, the remaining clients may be assigned to
+    any facility.
+    """
+
+    num_clients = client_exclusive_facilities.size
+    eligible = np.ones((num_facilities, num_clients), dtype=bool)
+
+    exclusive_clients = np.flatnonzero(client_exclusive_facilities >= 0)
+    eligible[:, exclusive_clients] = False
+    eligible[
+        client_exclusive_facilities[exclusive_clients], exclusive_clients
+    ] = True
+
+    return eligible
+
+
+def build_flow_network(
     assignment_problem: AssignmentProblem,
-) -> min_cost_flow.SimpleMinCostFlow:
-    """Build the Min Cost Flow model"""
+    client_exclusive_facilities: np.ndarray,
+) -> FlowNetwork:
+    """
+    Scale the problem parameters to become integer and gather the data of
+    the Min Cost Flow network. ``client_exclusive_facilities`` holds, for
+    each client, the index of the facility whose exclusive service area
+    contains it, or -1.
+    """
 
-    # Create model for the problem
-    model = min_cost_flow.SimpleMinCostFlow()
+    (
+        client_supplies,
+        facility_min_demands,
+        facility_max_demands,
+        scaled_cost_matrix,
+    ) = scale_assignment_problem_parameters(
+        assignment_problem=assignment_problem,
+        scale_factor=settings.MCF_SCALE_FACTOR,
+    )
 
-    # Scale problem parameters to become integer
-    scaled_clients, scaled_facilities, scaled_cost_matrix = (
-        scale_assignment_problem_parameters(
-            assignment_problem=assignment_problem,
-            scale_factor=settings.MCF_SCALE_FACTOR,
+    facility_capacities = (
+        np.where(
+            facility_max_demands > 0,
+            facility_max_demands,
+            client_supplies.sum(),
         )
+        - facility_min_demands
     )
 
-    # Define the directed graph for the flow.
-    # Each client has a supply equal to its demand.
-    supplies = [int(client.demand) for client in scaled_clients]
-    total_clients_supplies = sum(supplies)
+    return FlowNetwork(
+        client_supplies=client_supplies,
+        facility_min_demands=facility_min_demands,
+        facility_capacities=facility_capacities,
+        unit_costs=scaled_cost_matrix,
+        eligible=_build_eligibility_mask(
+            client_exclusive_facilities=client_exclusive_facilities,
+            num_facilities=facility_min_demands.size,
+        ),
+    )
 
-    # Get the demands for each facility.
-    num_clients = len(scaled_clients)
-    num_facilities = len(scaled_facilities)
-    terminal_node = num_clients + num_facilities
-    total_facilities_demand = 0
 
-    for i in range(num_clients, terminal_node):
-        facility_demand = scaled_facilities[i - num_clients].min_demand
-        total_facilities_demand += facility_demand
-        supplies.append(-facility_demand)
+def _build_mcf_model(
+    network: FlowNetwork,
+    arcs_mask: np.ndarray,
+) -> Tuple[min_cost_flow.SimpleMinCostFlow, np.ndarray, np.ndarray]:
+    """
+    Build the Min Cost Flow model.
+
+    Nodes and arcs are assembled as NumPy arrays and loaded into the model
+    with the bulk OR-Tools APIs, so no Python-level call is made per arc.
+    Nodes ``0..num_clients - 1`` are the clients, the next
+    ``num_facilities`` nodes are the facilities and the last node is the
+    terminal node. Only the client to facility arcs set in ``arcs_mask``,
+    of shape (num_facilities, num_clients), are added.
+
+    Returns the model together with the client and facility indices of
+    the client to facility arcs, which are the first arcs of the model.
+    """
+
+    # Create model for the problem
+    model = min_cost_flow.SimpleMinCostFlow()
+
+    # Each client has a supply equal to its demand and each facility
+    # demands its minimum demand.
+    num_clients = network.client_supplies.size
+    num_facilities = network.facility_min_demands.size
+    terminal_node = num_clients + num_facilities
 
     # The total demand defined for the terminal node must be the difference
     # between supplies minus the sum of demands from all facilities
-    supplies.append(-(total_clients_supplies - total_facilities_demand))
+    supplies = np.concatenate(
+        (
+            network.client_supplies,
+            -network.facility_min_demands,
+            [
+                network.facility_min_demands.sum()
+                - network.client_supplies.sum()
+            ],
+        )
+    )
+    model.set_nodes_supplies(
+        np.arange(terminal_node + 1, dtype=np.int32), supplies
+    )
+
+    # Arcs from clients to facilities, ordered by client and then by
+    # facility, followed by the arcs from facilities to terminal node
+    arc_clients, arc_facilities = np.nonzero(arcs_mask.T)
+    model.add_arcs_with_capacity_and_unit_cost(
+        np.concatenate(
+            (arc_clients, np.arange(num_clients, terminal_node))
+        ).astype(np.int32),
+        np.concatenate(
+            (
+                num_clients + arc_facilities,
+                np.full(num_facilities, terminal_node),
+            )
+        ).astype(np.int32),
+        np.concatenate(
+            (
+                network.client_supplies[arc_clients],
+                network.facility_capacities,
+            )
+        ).astype(np.int64),
+        np.concatenate(
+            (
+                network.unit_costs[arc_facilities, arc_clients],
+                np.zeros(num_facilities),
+            )
+        ).astype(np.int64),
+    )
 
-    # Add supply/demand nodes to the graph.
-    for i, value in enumerate(supplies):
-        model.set_node_supply(i, value)
+    return model, arc_clients, arc_facilities
 
-    # Add arcs from clients to facilities
-    exclusive_service_areas = [
-        (i, facility.exclusive_service_area)
-        for i, facility in enumerate(scaled_facilities)
-        if not facility.exclusive_service_area.is_empty
-    ]
-    for j, client in enumerate(scaled_clients):
-        areas_containing_client = [
-            i
-            for i, area in exclusive_service_areas
-            if area.intersects(Point(client.lng, client.lat))
-        ]
-        if len(areas_containing_client) > 1:
-            intersecting_facilities = [
-                scaled_facilities[i].name for i in areas_containing_client
-            ]
-            raise ValueError(
-                "Impossible solve the problem! "
-                "There is an intersection in the exclusive service areas "
-                f"of the following facilities: {intersecting_facilities}. "
-                "The following coordinates belongs to this intersection: "
-                f"{(client.lat, client.lng)}."
+
+def select_candidate_arcs(
+    network: FlowNetwork, num_candidate_facilities: int
+) -> np.ndarray:
+    """
+    Keep, among the eligible arcs, the arcs from each client to its
+    ``num_candidate_facilities`` cheapest facilities. Clients inside an
+    exclusive service area keep their only eligible arc. A non-positive
+    number of candidate facilities keeps every eligible arc.
+    """
+
+    num_facilities = network.facility_min_demands.size
+    if not 0 < num_candidate_facilities < num_facilities:
+        return network.eligible
+
+    cheapest_facilities = np.argpartition(
+        network.unit_costs, num_candidate_facilities - 1, axis=0
+    )[:num_candidate_facilities]
+    candidates = np.zeros_like(network.eligible)
+    np.put_along_axis(candidates, cheapest_facilities, True, axis=0)
+
+    exclusive_clients = network.eligible.sum(axis=0) == 1
+    candidates[:, exclusive_clients] = True
+
+    return candidates & network.eligible
+
+
+def select_warm_start_arcs(
+    network: FlowNetwork,
+    initial_client_facilities: np.ndarray,
+    num_candidate_facilities: int,
+) -> np.ndarray:
+    """
+    Candidate arcs seeded with a previous solution: the arc from each
+    client to its previous facility, when it has one, plus the arcs to its
+    cheapest facilities, at least one of them.
+    """
+
+    candidates = select_candidate_arcs(
+        network=network,
+        num_candidate_facilities=max(num_candidate_facilities, 1),
+    ).copy()
+
+    num_facilities = network.facility_min_demands.size
+    previous_clients = np.flatnonzero(
+        (initial_client_facilities >= 0)
+        & (initial_client_facilities < num_facilities)
+    )
+    candidates[
+        initial_client_facilities[previous_clients], previous_clients
+    ] = True
+
+    return candidates & network.eligible
+
+
+def _compute_node_potentials(
+    network: FlowNetwork,
+    arcs_mask: np.ndarray,
+    served_clients: np.ndarray,
+    serving_facilities: np.ndarray,
+    terminal_flows: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute node potentials (dual prices) proving the optimality of a
+    flow over the arcs in ``arcs_mask``, given by the client to facility
+    arcs with positive flow and the flows of the facility to terminal
+    arcs.
+
+    The potentials are shortest path distances in the residual network.
+    Every path between facilities goes through a client, so they are found
+    on a small graph over the facilities and the terminal node, where the
+    edge from facility i to facility k costs the cheapest move of a client
+    served by i over to k. Client potentials then follow from the
+    facilities serving them.
+
+    Returns
+    -------
+    Tuple
+        The potentials of the facilities and of the clients.
+    """
+
+    num_facilities = network.facility_min_demands.size
+    num_clients = network.client_supplies.size
+    unit_costs = network.unit_costs
+
+    # Edges of the facilities graph, the terminal node being the last one
+    edges = np.full((num_facilities + 1, num_facilities + 1), np.inf)
+    for i in range(num_facilities):
+        clients = served_clients[serving_facilities == i]
+        if clients.size:
+            moves = np.where(
+                arcs_mask[:, clients],
+                unit_costs[:, clients] - unit_costs[i, clients],
+                np.inf,
+            )
+            edges[i, :num_facilities] = moves.min(axis=1)
+    edges[:num_facilities, num_facilities] = np.where(
+        terminal_flows < network.facility_capacities, 0, np.inf
+    )
+    edges[num_facilities, :num_facilities] = np.where(
+        terminal_flows > 0, 0, np.inf
+    )
+
+    # Bellman-Ford from a virtual source linked to every node
+    potentials = np.zeros(num_facilities + 1)
+    for _ in range(num_facilities + 1):
+        relaxed = np.minimum(
+            potentials, (potentials[:, np.newaxis] + edges).min(axis=0)
+        )
+        if np.array_equal(relaxed, potentials):
+            break
+        potentials = relaxed
+
+    facility_potentials = potentials[:num_facilities]
+    client_potentials = np.full(num_clients, np.inf)
+    np.minimum.at(
+        client_potentials,
+        served_clients,
+        facility_potentials[serving_facilities]
+        - unit_costs[serving_facilities, served_clients],
+    )
+
+    return facility_potentials, client_potentials
+
+
+def compute_flow_reduced_costs(
+    network: FlowNetwork,
+    arcs_mask: np.ndarray,
+    served_clients: np.ndarray,
+    serving_facilities: np.ndarray,
+    terminal_flows: np.ndarray,
+) -> np.ndarray:
+    """
+    Reduced costs, of shape (num_facilities, num_clients), of the client to
+    facility arcs with respect to the node potentials of an optimal flow
+    over the arcs in ``arcs_mask``. The flow is given by the client to
+    facility arcs with positive flow and the flows of the facility to
+    terminal arcs, and is optimal over any set of arcs whose reduced costs
+    are all non-negative.
+    """
+
+    facility_potentials, client_potentials = _compute_node_potentials(
+        network=network,
+        arcs_mask=arcs_mask,
+        served_clients=served_clients,
+        serving_facilities=serving_facilities,
+        terminal_flows=terminal_flows,
+    )
+
+    return (
+        network.unit_costs
+        + client_potentials[np.newaxis, :]
+        - facility_potentials[:, np.newaxis]
+    )
+
+
+def compute_reduced_costs(
+    network: FlowNetwork, arcs_mask: np.ndarray, result: MCFResult
+) -> np.ndarray:
+    """
+    Reduced costs, of shape (num_facilities, num_clients), of the client to
+    facility arcs with respect to the node potentials of the optimal flow
+    of a model solved over the arcs in ``arcs_mask``.
+    """
+
+    num_facilities = network.facility_min_demands.size
+    num_client_arcs = result.arc_clients.size
+    flows = result.model.flows(
+        np.arange(num_client_arcs + num_facilities, dtype=np.int32)
+    )
+    positive = flows[:num_client_arcs] > 0
+
+    return compute_flow_reduced_costs(
+        network=network,
+        arcs_mask=arcs_mask,
+        served_clients=result.arc_clients[positive],
+        serving_facilities=result.arc_facilities[positive],
+        terminal_flows=flows[num_client_arcs:],
+    )
+
+
+def solve_mcf_model(
+    network: FlowNetwork, candidate_arcs: np.ndarray
+) -> MCFResult:
+    """
+    Solve the Min Cost Flow model over the candidate client to facility
+    arcs, pricing in the remaining eligible arcs.
+
+    After each solve, the node potentials of the optimal flow give the
+    reduced cost of the arcs left out. Arcs with negative reduced cost are
+    added and the model is solved again, until none is left, which proves
+    the flow optimal over all eligible arcs. While the arcs do not admit a
+    feasible flow, the number of candidate facilities of each client is
+    doubled, up to all eligible arcs.
+    """
+
+    arcs_mask = candidate_arcs & network.eligible
+    num_facilities = network.facility_min_demands.size
+    while True:
+        model, arc_clients, arc_facilities = _build_mcf_model(
+            network=network, arcs_mask=arcs_mask
+        )
+        result = MCFResult(
+            status=model.solve(),
+            model=model,
+            arc_clients=arc_clients,
+            arc_facilities=arc_facilities,
+        )
+
+        if result.status != model.OPTIMAL:
+            if np.array_equal(arcs_mask, network.eligible):
+                return result
+            num_candidate_facilities = 2 * arcs_mask.sum(axis=0).max()
+            arcs_mask = arcs_mask | select_candidate_arcs(
+                network=network,
+                num_candidate_facilities=min(
+                    num_candidate_facilities, num_facilities
+                ),
+            )
+            continue
+
+        improving_arcs = (
+            network.eligible
+            & ~arcs_mask
+            & (compute_reduced_costs(network, arcs_mask, result) < 0)
+        )
+        if not improving_arcs.any():
+            return result
+
+        arcs_mask = arcs_mask | improving_arcs
+
+
+def extract_client_facilities(
+    model: min_cost_flow.SimpleMinCostFlow,
+    arc_clients: np.ndarray,
+    arc_facilities: np.ndarray,
+    num_clients: int,
+) -> np.ndarray:
+    """
+    Get the index of the facility assigned to each client from the flows
+    of the client to facility arcs, read in a single bulk call.
+
+    A client whose supply is split among several facilities is assigned
+    to the facility receiving the largest flow, ties going to the lowest
+    facility index, so the extraction is deterministic.
+    """
+
+    flows = model.flows(np.arange(arc_clients.size, dtype=np.int32))
+    positive = flows > 0
+    clients = arc_clients[positive]
+    facilities = arc_facilities[positive]
+
+    # Sort by client, then by decreasing flow, then by facility and keep
+    # the first arc of each client
+    order = np.lexsort((facilities, -flows[positive], clients))
+    first = np.unique(clients[order], return_index=True)[1]
+
+    client_facilities = np.full(num_clients, -1, dtype=np.int64)
+    client_facilities[clients[order][first]] = facilities[order][first]
+
+    return client_facilities
+
+
+def _select_core_clients(
+    priorities: np.ndarray, core_share: float
+) -> np.ndarray:
+    """Mask of the share of clients with the smallest priorities"""
+
+    if core_share >= 1:
+        return np.ones(priorities.size, dtype=bool)
+
+    return priorities <= np.quantile(priorities, core_share, method="lower")
+
+
+def solve_core_mcf_model(
+    network: FlowNetwork,
+    client_facilities: np.ndarray,
+    priorities: np.ndarray,
+    candidate_arcs: np.ndarray,
+    core_share: float,
+    max_rounds: int = 0,
+) -> Optional[FlowSolution]:
+    """
+    Solve the network exactly, starting from a facility for each client.
+
+    The ``core_share`` of clients with the smallest ``priorities`` forms
+    the core, the other clients are fixed to their starting facility and
+    only load it. The core clients are solved as a Min Cost Flow problem
+    over the ``candidate_arcs``, pricing in the rest. The node potentials
+    of the combined flow then give the reduced cost of every eligible arc.
+    Clients with a negative one join the core and the core is solved
+    again, until none is left, which proves the assignment optimal. While
+    the fixed clients leave no feasible flow, the core share is doubled,
+    up to all clients. When ``max_rounds`` is positive, the assignment
+    found by the last allowed core solve is returned, unproven.
+
+    Returns
+    -------
+    Optional
+        The solution, or None when the problem is infeasible.
+    """
+
+    num_facilities, num_clients = network.unit_costs.shape
+    supplies = network.client_supplies
+    upper = network.facility_min_demands + network.facility_capacities
+    arcs_mask = candidate_arcs & network.eligible
+
+    core = _select_core_clients(priorities, core_share)
+    num_rounds = 0
+    while True:
+        fixed = np.flatnonzero(~core)
+        core_clients = np.flatnonzero(core)
+        preloads = np.bincount(
+            client_facilities[fixed],
+            weights=supplies[fixed],
+            minlength=num_facilities,
+        ).astype(np.int64)
+
+        result = None
+        if (preloads <= upper).all() and core_clients.size:
+            core_network = FlowNetwork(
+                client_supplies=supplies[core_clients],
+                facility_min_demands=np.maximum(
+                    network.facility_min_demands - preloads, 0
+                ),
+                facility_capacities=upper
+                - np.maximum(network.facility_min_demands, preloads),
+                unit_costs=network.unit_costs[:, core_clients],
+                eligible=network.eligible[:, core_clients],
             )
-        if len(areas_containing_client) == 1:
-            i = num_clients + areas_containing_client[0]
-            cost = scaled_cost_matrix[i - num_clients][j]
-            model.add_arc_with_capacity_and_unit_cost(
-                tail=j, head=i, capacity=supplies[j], unit_cost=cost
+            result = solve_mcf_model(
+                network=core_network,
+                candidate_arcs=arcs_mask[:, core_clients],
             )
+
+        if result is None or result.status != result.model.OPTIMAL:
+            if core.all():
+                return None
+            core_share = 2 * max(core_share, core.mean(), 1 / num_clients)
+            core |= _select_core_clients(priorities, core_share)
             continue
-        for i in range(num_clients, terminal_node):
-            cost = scaled_cost_matrix[i - num_clients][j]
-            model.add_arc_with_capacity_and_unit_cost(
-                tail=j, head=i, capacity=supplies[j], unit_cost=cost
+
+        # Combine the fixed clients with the flow of the core clients
+        num_client_arcs = result.arc_clients.size
+        flows = result.model.flows(
+            np.arange(num_client_arcs + num_facilities, dtype=np.int32)
+        )
+        positive = flows[:num_client_arcs] > 0
+        model_arcs_mask = np.zeros_like(network.eligible)
+        model_arcs_mask[client_facilities[fixed], fixed] = True
+        model_arcs_mask[
+            result.arc_facilities, core_clients[result.arc_clients]
+        ] = True
+
+        reduced_costs = compute_flow_reduced_costs(
+            network=network,
+            arcs_mask=model_arcs_mask,
+            served_clients=np.concatenate(
+                (fixed, core_clients[result.arc_clients[positive]])
+            ),
+            serving_facilities=np.concatenate(
+                (client_facilities[fixed], result.arc_facilities[positive])
+            ),
+            terminal_flows=flows[num_client_arcs:]
+            + np.maximum(network.facility_min_demands, preloads)
+            - network.facility_min_demands,
+        )
+        improving_arcs = (
+            network.eligible & ~model_arcs_mask & (reduced_costs < 0)
+        )
+        num_rounds += 1
+        optimal = not improving_arcs.any()
+        if optimal or num_rounds == max_rounds:
+            solved_client_facilities = client_facilities.copy()
+            solved_client_facilities[core_clients] = extract_client_facilities(
+                model=result.model,
+                arc_clients=result.arc_clients,
+                arc_facilities=result.arc_facilities,
+                num_clients=core_clients.size,
+            )
+            cost = result.model.optimal_cost() + int(
+                network.unit_costs[client_facilities[fixed], fixed]
+                @ supplies[fixed]
             )
 
-    # Add arc from facilities to terminal node
-    for i in range(num_clients, terminal_node):
-        max_demand = scaled_facilities[i - num_clients].max_demand
-        capacity = max_demand or total_clients_supplies
-        if supplies[i] < 0:
-            capacity += supplies[i]
-        model.add_arc_with_capacity_and_unit_cost(
-            tail=i, head=terminal_node, capacity=capacity, unit_cost=0
+            return FlowSolution(
+                client_facilities=solved_client_facilities,
+                cost=cost,
+                optimal=optimal,
+            )
+
+        arcs_mask |= improving_arcs
+        core |= improving_arcs.any(axis=0)
+
+
+def build_flow_assignment_solution(
+    assignment_problem: AssignmentProblem,
+    client_facilities: np.ndarray,
+    cost: int,
+    client_exclusive_facilities: np.ndarray,
+    optimal: bool = True,
+) -> AssignmentSolution:
+    """
+    Assignment solution from the facility index of each client and the
+    cost of the scaled flow problem, with the assigned facilities
+    evaluated. ``client_exclusive_facilities`` holds, for each client, the
+    index of the facility whose exclusive service area contains it, or -1.
+    """
+
+    assignments = group_clients_by_facility(
+        client_facilities=client_facilities,
+        num_facilities=len(assignment_problem.facilities),
+    )
+
+    assigned_facilities = [
+        AssignedFacility(
+            facility=facility,
+            assigned_clients=assignment_problem.clients[assignments[i]],
         )
+        for i, facility in enumerate(assignment_problem.facilities)
+    ]
 
-    return model
+    # Evaluate assigned facilities
+    evaluated_assigned_facilities = evaluate_assigned_facilities(
+        assigned_facilities=assigned_facilities,
+        exclusive_area_masks=[
+            client_exclusive_facilities[assigned_clients] == i
+            for i, assigned_clients in enumerate(assignments)
+        ],
+        service_area_type=assignment_problem.service_area_type,
+    )
+
+    return AssignmentSolution(
+        objective_value=round(cost / (settings.MCF_SCALE_FACTOR**2)),
+        assigned_facilities=evaluated_assigned_facilities,
+        solution_status=(
+            SolutionStatus.OPTIMAL if optimal else SolutionStatus.FEASIBLE
+        ),
+        message=(
+            "Optimal solution found" if optimal else "Feasible solution found"
+        ),
+    )
 
 
 def solve_flow_assignment_formulation(
     assignment_problem: AssignmentProblem,
 ) -> AssignmentSolution:
-    """Solve assignment problem via Min Cost Flow"""
+    """
+    Solve assignment problem via Min Cost Flow.
+
+    When the problem sets ``num_candidate_facilities``, each client starts
+    with arcs to its cheapest facilities only and the remaining arcs are
+    priced in until the solution is proven optimal. When it sets
+    ``initial_client_facilities``, the arcs of the previous assignments
+    are added to the starting ones, so small changes to a solved problem
+    need few arcs to be priced in.
+    """
 
-    # Build the Min Cost Flow model
+    # Locate the clients inside exclusive service areas
     try:
-        model = _build_mcf_model(assignment_problem)
+        client_exclusive_facilities = locate_clients_in_exclusive_areas(
+            clients=assignment_problem.clients,
+            facilities=assignment_problem.facilities,
+        )
     except ValueError as e:
         return AssignmentSolution(
             solution_status=SolutionStatus.INFEASIBLE,
             message=str(e),
         )
 
-    # Solve the Min Cost Flow model
-    status = model.solve()
-
-    # If the problem is feasible, get the assignments
-    if status == model.OPTIMAL:
-        num_facilities = len(assignment_problem.facilities)
-        num_clients = len(assignment_problem.clients)
-        terminal_node = num_clients + num_facilities
-        assignments: Dict[int, List[int]] = {
-            i: [] for i in range(num_facilities)
-        }
-
-        for arc in range(model.num_arcs()):
-            if model.head(arc) != terminal_node and model.flow(arc) > 0:
-                assignments[model.head(arc) - num_clients].append(
-                    model.tail(arc)
-                )
-
-        assigned_facilities = [
-            AssignedFacility(
-                facility=facility,
-                assigned_clients=[
-                    assignment_problem.clients[j] for j in assignments[i]
-                ],
-            )
-            for i, facility in enumerate(assignment_problem.facilities)
-        ]
-
-        # Evaluate assigned facilities
-        evaluated_assigned_facilities = evaluate_assigned_facilities(
-            assigned_facilities
+    # Build and solve the Min Cost Flow model
+    network = build_flow_network(
+        assignment_problem=assignment_problem,
+        client_exclusive_facilities=client_exclusive_facilities,
+    )
+    if assignment_problem.initial_client_facilities is None:
+        candidate_arcs = select_candidate_arcs(
+            network=network,
+            num_candidate_facilities=(
+                assignment_problem.num_candidate_facilities
+            ),
         )
+    else:
+        candidate_arcs = select_warm_start_arcs(
+            network=network,
+            initial_client_facilities=(
+                assignment_problem.initial_client_facilities
+            ),
+            num_candidate_facilities=(
+                assignment_problem.num_candidate_facilities
+            ),
+        )
+    result = solve_mcf_model(network=network, candidate_arcs=candidate_arcs)
 
-        return AssignmentSolution(
-            objective_value=round(
-                model.optimal_cost() / (settings.MCF_SCALE_FACTOR**2)
+    # If the problem is feasible, get the assignments
+    if result.status == result.model.OPTIMAL:
+        return build_flow_assignment_solution(
+            assignment_problem=assignment_problem,
+            client_facilities=extract_client_facilities(
+                model=result.model,
+                arc_clients=result.arc_clients,
+                arc_facilities=result.arc_facilities,
+                num_clients=len(assignment_problem.clients),
             ),
-            assigned_facilities=evaluated_assigned_facilities,
-            solution_status=SolutionStatus.OPTIMAL,
-            message="Optimal solution found",
+            cost=result.model.optimal_cost(),
+            client_exclusive_facilities=client_exclusive_facilities,
         )
 
     return AssignmentSolution(message="No optimal solution found")
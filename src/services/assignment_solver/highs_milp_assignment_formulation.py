@@ -0,0 +1,280 @@
+import highspy
+import numpy as np
+
+from config import settings
+from src.models import (
+    AssignedFacility,
+    AssignmentProblem,
+    AssignmentSolution,
+    SolutionStatus,
+)
+from src.services import (
+    evaluate_assigned_facilities,
+    group_clients_by_facility,
+    locate_clients_in_exclusive_areas,
+    scale_assignment_problem_parameters,
+)
+
+MODEL_STATUS_MAPPING = {
+    highspy.HighsModelStatus.kOptimal: "Found an optimal solution",
+    highspy.HighsModelStatus.kInfeasible: (
+        "Demonstrated that problem is infeasible"
+    ),
+    highspy.HighsModelStatus.kUnboundedOrInfeasible: (
+        "Demonstrated that problem is infeasible"
+    ),
+    highspy.HighsModelStatus.kUnbounded: (
+        "Demonstrated that problem is unbounded"
+    ),
+    highspy.HighsModelStatus.kTimeLimit: "Exceeded maximum time limit allowed",
+    highspy.HighsModelStatus.kIterationLimit: (
+        "Exceeded maximum number of iterations allowed"
+    ),
+    highspy.HighsModelStatus.kSolutionLimit: (
+        "Exceeded maximum number of problem evaluations "
+        "(e.g., branch and bound nodes)"
+    ),
+    highspy.HighsModelStatus.kInterrupt: (
+        "Interrupt signal generated by user"
+    ),
+    highspy.HighsModelStatus.kMemoryLimit: (
+        "Interrupt signal in resources used by the solver"
+    ),
+    highspy.HighsModelStatus.kModelError: (
+        "The problem setup or characteristics are not valid for the solver"
+    ),
+    highspy.HighsModelStatus.kSolveError: (
+        "Solver failed to terminate correctly"
+    ),
+}
+
+
+def _build_highs_milp_model(
+    assignment_problem: AssignmentProblem,
+    client_exclusive_facilities: np.ndarray,
+) -> highspy.Highs:
+    """
+    Build the MILP model for the assignment problem directly in HiGHS.
+
+    The column-wise constraint matrix is assembled with NumPy and passed
+    to HiGHS in one call. Column ``j * num_facilities + i`` is the binary
+    assigning client j to facility i, which has two nonzeros: one in the
+    row of client j, making it assigned to exactly one facility, and one
+    in the row of facility i, bounding its demand between the facility
+    minimum and maximum demands. ``client_exclusive_facilities`` holds,
+    for each client, the index of the facility whose exclusive service
+    area contains it, or -1.
+    """
+
+    # Scale problem parameters to become integer
+    (
+        client_demands,
+        facility_min_demands,
+        facility_max_demands,
+        scaled_cost_matrix,
+    ) = scale_assignment_problem_parameters(
+        assignment_problem=assignment_problem,
+        scale_factor=settings.MILP_SCALE_FACTOR,
+    )
+
+    num_clients = client_demands.size
+    num_facilities = facility_min_demands.size
+    num_cols = num_clients * num_facilities
+    num_rows = num_clients + num_facilities
+    total_demand = client_demands.sum()
+
+    # Rows of the client constraints come first, followed by the rows of
+    # the facility demand constraints
+    row_lower = np.concatenate(
+        (np.ones(num_clients), facility_min_demands)
+    ).astype(float)
+    row_upper = np.concatenate(
+        (
+            np.ones(num_clients),
+            np.where(
+                facility_max_demands > 0, facility_max_demands, total_demand
+            ),
+        )
+    ).astype(float)
+
+    col_clients = np.repeat(np.arange(num_clients), num_facilities)
+    col_facilities = np.tile(np.arange(num_facilities), num_clients)
+    a_start = np.arange(0, 2 * num_cols + 1, 2, dtype=np.int32)
+    a_index = np.column_stack(
+        (col_clients, num_clients + col_facilities)
+    ).ravel()
+    a_value = np.column_stack(
+        (np.ones(num_cols), client_demands[col_clients])
+    ).ravel()
+
+    # Exclusive service areas are respected by fixing the binaries of the
+    # clients inside them
+    col_lower = np.zeros(num_cols)
+    exclusive_clients = np.flatnonzero(client_exclusive_facilities >= 0)
+    col_lower[
+        exclusive_clients * num_facilities
+        + client_exclusive_facilities[exclusive_clients]
+    ] = 1
+
+    model = highspy.Highs()
+    model.setOptionValue("output_flag", False)
+    model.passModel(
+        num_cols,
+        num_rows,
+        a_value.size,
+        int(highspy.MatrixFormat.kColwise),
+        int(highspy.ObjSense.kMinimize),
+        0.0,
+        scaled_cost_matrix.T.ravel().astype(float),
+        col_lower,
+        np.ones(num_cols),
+        row_lower,
+        row_upper,
+        a_start,
+        a_index.astype(np.int32),
+        a_value.astype(float),
+        np.full(num_cols, int(highspy.HighsVarType.kInteger), dtype=np.int32),
+    )
+
+    return model
+
+
+def _build_initial_solution(
+    assignment_problem: AssignmentProblem,
+    initial_client_facilities: np.ndarray,
+    client_exclusive_facilities: np.ndarray,
+) -> highspy.HighsSolution:
+    """
+    Initial solution assigning each client to its previous facility, or
+    else to the facility of its exclusive service area or its cheapest
+    facility. HiGHS discards it when it breaks the demand constraints.
+    """
+
+    cost_matrix = assignment_problem.cost_matrix
+    if cost_matrix is None:
+        raise ValueError("The problem has no cost matrix")
+
+    num_facilities = len(assignment_problem.facilities)
+    client_facilities = np.where(
+        client_exclusive_facilities >= 0,
+        client_exclusive_facilities,
+        initial_client_facilities,
+    )
+    new_clients = (client_facilities < 0) | (
+        client_facilities >= num_facilities
+    )
+    client_facilities[new_clients] = np.argmin(
+        cost_matrix[:, new_clients], axis=0
+    )
+
+    col_value = np.zeros((client_facilities.size, num_facilities))
+    col_value[np.arange(client_facilities.size), client_facilities] = 1
+
+    solution = highspy.HighsSolution()
+    solution.col_value = col_value.ravel().tolist()
+    solution.value_valid = True
+
+    return solution
+
+
+def solve_highs_milp_assignment_formulation(
+    assignment_problem: AssignmentProblem,
+) -> AssignmentSolution:
+    """Solve assignment problem via Mixed Integer Linear Programming,
+    passing the constraint matrix straight to the HiGHS solver"""
+
+    # Locate the clients inside exclusive service areas
+    try:
+        client_exclusive_facilities = locate_clients_in_exclusive_areas(
+            clients=assignment_problem.clients,
+            facilities=assignment_problem.facilities,
+        )
+    except ValueError as e:
+        return AssignmentSolution(
+            solution_status=SolutionStatus.INFEASIBLE,
+            message=str(e),
+        )
+
+    # Build the MILP model
+    model = _build_highs_milp_model(
+        assignment_problem=assignment_problem,
+        client_exclusive_facilities=client_exclusive_facilities,
+    )
+
+    # Warm start from the previous assignments, if any
+    if assignment_problem.initial_client_facilities is not None:
+        model.setSolution(
+            _build_initial_solution(
+                assignment_problem=assignment_problem,
+                initial_client_facilities=(
+                    assignment_problem.initial_client_facilities
+                ),
+                client_exclusive_facilities=client_exclusive_facilities,
+            )
+        )
+
+    # Set HiGHS solver options and solve the problem
+    model.setOptionValue(
+        "time_limit", float(assignment_problem.solver_time_limit_seconds)
+    )
+    model.run()
+
+    model_status = model.getModelStatus()
+    message = MODEL_STATUS_MAPPING.get(
+        model_status, "Other, uncategorized normal termination"
+    )
+    info = model.getInfo()
+
+    # Check if the problem was solved
+    if info.primal_solution_status == highspy.kSolutionStatusFeasible:
+        num_facilities = len(assignment_problem.facilities)
+
+        # Create assigned facilities
+        col_values = np.reshape(
+            model.getSolution().col_value, (-1, num_facilities)
+        )
+        client_facilities = np.where(
+            col_values.max(axis=1) > 0.5, col_values.argmax(axis=1), -1
+        )
+        assignments = group_clients_by_facility(
+            client_facilities=client_facilities,
+            num_facilities=num_facilities,
+        )
+        assigned_facilities = [
+            AssignedFacility(
+                facility=facility,
+                assigned_clients=assignment_problem.clients[assignments[i]],
+            )
+            for i, facility in enumerate(assignment_problem.facilities)
+        ]
+
+        # Evaluate assigned facilities
+        evaluated_assigned_facilities = evaluate_assigned_facilities(
+            assigned_facilities=assigned_facilities,
+            exclusive_area_masks=[
+                client_exclusive_facilities[assigned_clients] == i
+                for i, assigned_clients in enumerate(assignments)
+            ],
+            service_area_type=assignment_problem.service_area_type,
+        )
+
+        solution_status = (
+            SolutionStatus.OPTIMAL
+            if model_status == highspy.HighsModelStatus.kOptimal
+            else SolutionStatus.FEASIBLE
+        )
+
+        return AssignmentSolution(
+            objective_value=round(
+                info.objective_function_value / settings.MILP_SCALE_FACTOR
+            ),
+            assigned_facilities=evaluated_assigned_facilities,
+            solution_status=solution_status,
+            message=message,
+        )
+
+    # If the problem was not solved, return infeasible solution
+    return AssignmentSolution(
+        solution_status=SolutionStatus.INFEASIBLE,
+        message=message,
+    )
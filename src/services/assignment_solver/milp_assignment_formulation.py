@@ -1,6 +1,6 @@
+import numpy as np
 import pyomo.environ as pyo
 from pyomo.contrib import appsi
-from shapely import Point
 
 from config import settings
 from src.models import (
@@ -11,6 +11,8 @@ from src.models import (
 )
 from src.services import (
     evaluate_assigned_facilities,
+    group_clients_by_facility,
+    locate_clients_in_exclusive_areas,
     scale_assignment_problem_parameters,
 )
 
@@ -43,19 +45,28 @@ TERMINATION_CONDITION_MAPPING = {
 
 def _build_milp_model(
     assignment_problem: AssignmentProblem,
+    client_exclusive_facilities: np.ndarray,
 ) -> pyo.ConcreteModel:
-    """Build the MILP model for the assignment problem"""
+    """
+    Build the MILP model for the assignment problem.
+    ``client_exclusive_facilities`` holds, for each client, the index of
+    the facility whose exclusive service area contains it, or -1.
+    """
 
     # Create model for the problem
     model = pyo.ConcreteModel(name="Linear_Assignment_Problem")
 
     # Scale problem parameters to become integer
-    scaled_clients, scaled_facilities, scaled_cost_matrix = (
-        scale_assignment_problem_parameters(
-            assignment_problem=assignment_problem,
-            scale_factor=settings.MILP_SCALE_FACTOR,
-        )
+    (
+        client_demands,
+        facility_min_demands,
+        facility_max_demands,
+        scaled_cost_matrix,
+    ) = scale_assignment_problem_parameters(
+        assignment_problem=assignment_problem,
+        scale_factor=settings.MILP_SCALE_FACTOR,
     )
+    demands = client_demands.tolist()
 
     # Decision variables
     num_facilities = len(assignment_problem.facilities)
@@ -83,60 +94,30 @@ def _build_milp_model(
         )
 
     # Maximum facility demand is respected
-    total_demand = sum(client.demand for client in scaled_clients)
+    total_demand = sum(demands)
     model.maximum_facility_demand_constraints = pyo.ConstraintList()
-    for i, facility in enumerate(scaled_facilities):
-        max_demand = facility.max_demand or total_demand
+    for i in range(num_facilities):
+        max_demand = int(facility_max_demands[i]) or total_demand
         model.maximum_facility_demand_constraints.add(
-            sum(
-                client.demand * model.x[i, j]
-                for j, client in enumerate(scaled_clients)
-            )
+            sum(demand * model.x[i, j] for j, demand in enumerate(demands))
             <= max_demand
         )
 
     # Minimum facility demand is respected
     model.minimum_facility_demand_constraints = pyo.ConstraintList()
-    for i, facility in enumerate(scaled_facilities):
+    for i in range(num_facilities):
         model.minimum_facility_demand_constraints.add(
-            sum(
-                client.demand * model.x[i, j]
-                for j, client in enumerate(scaled_clients)
-            )
-            >= facility.min_demand
+            sum(demand * model.x[i, j] for j, demand in enumerate(demands))
+            >= int(facility_min_demands[i])
         )
 
     # Exclusive service areas are respected
-    exclusive_service_areas = [
-        (i, facility.exclusive_service_area)
-        for i, facility in enumerate(assignment_problem.facilities)
-        if not facility.exclusive_service_area.is_empty
-    ]
-    if exclusive_service_areas:
+    exclusive_clients = np.flatnonzero(client_exclusive_facilities >= 0)
+    if exclusive_clients.size:
         model.exclusive_service_areas_constraints = pyo.ConstraintList()
-        for j, client in enumerate(assignment_problem.clients):
-            areas_containing_client = [
-                i
-                for i, area in exclusive_service_areas
-                if area.intersects(Point(client.lng, client.lat))
-            ]
-            if len(areas_containing_client) > 1:
-                intersecting_facilities = [
-                    assignment_problem.facilities[i].name
-                    for i in areas_containing_client
-                ]
-                raise ValueError(
-                    "Impossible solve the problem! "
-                    "There is an intersection in the exclusive service areas "
-                    f"of the following facilities: {intersecting_facilities}. "
-                    "The following coordinates belongs to this intersection: "
-                    f"{(client.lat, client.lng)}."
-                )
-            if len(areas_containing_client) == 1:
-                i = areas_containing_client[0]
-                model.exclusive_service_areas_constraints.add(
-                    model.x[i, j] == 1
-                )
+        for j in exclusive_clients:
+            i = client_exclusive_facilities[j]
+            model.exclusive_service_areas_constraints.add(model.x[i, j] == 1)
 
     return model
 
@@ -146,15 +127,24 @@ def solve_milp_assignment_formulation(
 ) -> AssignmentSolution:
     """Solve assignment problem via Mixed Integer Linear Programming"""
 
-    # Build the MILP model
+    # Locate the clients inside exclusive service areas
     try:
-        model = _build_milp_model(assignment_problem)
+        client_exclusive_facilities = locate_clients_in_exclusive_areas(
+            clients=assignment_problem.clients,
+            facilities=assignment_problem.facilities,
+        )
     except ValueError as e:
         return AssignmentSolution(
             solution_status=SolutionStatus.INFEASIBLE,
             message=str(e),
         )
 
+    # Build the MILP model
+    model = _build_milp_model(
+        assignment_problem=assignment_problem,
+        client_exclusive_facilities=client_exclusive_facilities,
+    )
+
     # Solve the problem using the HiGHS solver
     solver = appsi.solvers.Highs()
 
@@ -172,21 +162,32 @@ def solve_milp_assignment_formulation(
         results.solution_loader.load_vars()
 
         # Create assigned facilities
+        client_facilities = np.full(
+            len(assignment_problem.clients), -1, dtype=np.int64
+        )
+        for (i, j), x in model.x.items():
+            if x.value == 1:
+                client_facilities[j] = i
+        assignments = group_clients_by_facility(
+            client_facilities=client_facilities,
+            num_facilities=len(assignment_problem.facilities),
+        )
         assigned_facilities = [
             AssignedFacility(
                 facility=facility,
-                assigned_clients=[
-                    client
-                    for j, client in enumerate(assignment_problem.clients)
-                    if model.x[i, j].value == 1
-                ],
+                assigned_clients=assignment_problem.clients[assignments[i]],
             )
             for i, facility in enumerate(assignment_problem.facilities)
         ]
 
         # Evaluate assigned facilities
         evaluated_assigned_facilities = evaluate_assigned_facilities(
-            assigned_facilities
+            assigned_facilities=assigned_facilities,
+            exclusive_area_masks=[
+                client_exclusive_facilities[assigned_clients] == i
+                for i, assigned_clients in enumerate(assignments)
+            ],
+            service_area_type=assignment_problem.service_area_type,
         )
 
         solution_status = (
@@ -0,0 +1,119 @@
+import sys
+from collections import OrderedDict
+from typing import Dict, NamedTuple
+from uuid import uuid4
+
+import numpy as np
+
+from config import settings
+from src.models import AssignmentRequest, ClientBatch
+from src.services import ClientAggregation
+
+
+class SolutionNotFoundError(KeyError):
+    """The solution was never cached or was already evicted"""
+
+
+class CachedSolution(NamedTuple):
+    """
+    Solved request kept to re-solve it with small changes.
+
+    Attributes
+    ----------
+    assignment_request
+        The solved request.
+    clients
+        Clients of the solved request.
+    aggregation
+        Distinct coordinates of the request clients.
+    location_cost_matrix
+        Unit demand cost matrix of shape (num_facilities, num_locations).
+    surrogate_costs
+        Boolean mask of the lower bounds standing for the screened OSRM
+        costs in the cost matrix.
+    client_facilities
+        Index of the facility assigned to each client id.
+    """
+
+    assignment_request: AssignmentRequest
+    clients: ClientBatch
+    aggregation: ClientAggregation
+    location_cost_matrix: np.ndarray
+    surrogate_costs: np.ndarray
+    client_facilities: Dict[str, int]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the arrays of the solution"""
+
+        client_arrays = [
+            array
+            for batch in (self.clients, self.aggregation.locations)
+            for array in (batch.ids, batch.lats, batch.lngs, batch.demands)
+        ]
+
+        return (
+            self.location_cost_matrix.nbytes
+            + self.surrogate_costs.nbytes
+            + self.aggregation.client_locations.nbytes
+            + sum(array.nbytes for array in client_arrays)
+            + sys.getsizeof(self.client_facilities)
+        )
+
+
+class SolutionCache:
+    """
+    In-memory cache of the most recently used solutions, up to
+    ``max_size`` of them holding at most ``max_bytes`` of arrays.
+
+    The cache lives in the server process, so the re-solve requests only
+    find the solutions of the solve requests served by the same process,
+    and the API should run a single worker process.
+    """
+
+    def __init__(self, max_size: int, max_bytes: int):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self._solutions: OrderedDict[str, CachedSolution] = OrderedDict()
+        self._nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._solutions)
+
+    def add(self, cached_solution: CachedSolution) -> str:
+        """Cache a solution, evicting the least recently used ones, and
+        return its identifier, or an empty one when the solution alone
+        holds more than ``max_bytes``"""
+
+        if cached_solution.nbytes > self.max_bytes:
+            return ""
+
+        solution_id = uuid4().hex
+        self._solutions[solution_id] = cached_solution
+        self._nbytes += cached_solution.nbytes
+        while (
+            len(self._solutions) > self.max_size
+            or self._nbytes > self.max_bytes
+        ):
+            _, evicted_solution = self._solutions.popitem(last=False)
+            self._nbytes -= evicted_solution.nbytes
+
+        return solution_id
+
+    def get(self, solution_id: str) -> CachedSolution:
+        """Cached solution with the identifier, raising
+        SolutionNotFoundError when it was never cached or was already
+        evicted"""
+
+        if solution_id not in self._solutions:
+            raise SolutionNotFoundError(solution_id)
+        cached_solution = self._solutions[solution_id]
+        self._solutions.move_to_end(solution_id)
+
+        return cached_solution
+
+
+solution_cache = SolutionCache(
+    max_size=settings.SOLUTION_CACHE_SIZE,
+    max_bytes=settings.SOLUTION_CACHE_MAX_BYTES,
+)
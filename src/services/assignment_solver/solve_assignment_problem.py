@@ -1,84 +1,561 @@
-from typing import List, Tuple
+from typing import Dict, Optional, Tuple
 
 import numpy as np
 
+from config import settings
 from src.models import (
     AlgorithmType,
     AssignmentProblem,
     AssignmentRequest,
     AssignmentSolution,
-    Client,
+    ClientBatch,
     CostProblem,
-    scale_clients_demands,
+    ResolveRequest,
+    ServiceAreaType,
+    SolutionStatus,
 )
 from src.services import (
-    compute_cost_matrix,
+    CachedSolution,
+    ClientAggregation,
+    aggregate_colocated_clients,
+    assignment_cost,
+    build_cell_lookup,
+    client_dataset_store,
+    compute_screened_cost_matrix,
+    cost_matrix_store,
+    expand_assigned_facilities,
+    merge_colocated_clients,
+    refine_screened_costs,
+    scale_costs,
+    solve_decomposed_flow_formulation,
     solve_flow_assignment_formulation,
+    solve_highs_milp_assignment_formulation,
     solve_milp_assignment_formulation,
+    solve_transportation_formulation,
+    solution_cache,
+    violates_demand_bounds,
 )
 
 ASSIGNMENT_ALGORITHM_MAPPING = {
     AlgorithmType.MCF_FORMULATION: solve_flow_assignment_formulation,
     AlgorithmType.MILP_FORMULATION: solve_milp_assignment_formulation,
+    AlgorithmType.HIGHS_MILP_FORMULATION: (
+        solve_highs_milp_assignment_formulation
+    ),
+    AlgorithmType.TRANSPORTATION_FORMULATION: (
+        solve_transportation_formulation
+    ),
+    AlgorithmType.DECOMPOSED_FLOW_FORMULATION: (
+        solve_decomposed_flow_formulation
+    ),
 }
 
+# Formulations whose optimum is unchanged by merging co-located clients
+FLOW_ALGORITHMS = (
+    AlgorithmType.MCF_FORMULATION,
+    AlgorithmType.TRANSPORTATION_FORMULATION,
+    AlgorithmType.DECOMPOSED_FLOW_FORMULATION,
+)
+
+
+class ResolveChangeError(ValueError):
+    """The changes of a re-solve request do not apply to the previous
+    problem"""
+
 
 def solve_facility_assignment(
     assignment_request: AssignmentRequest,
 ) -> AssignmentSolution:
-    """Solve the facility assignment problem"""
+    """
+    Solve the facility assignment problem.
 
+    Clients with identical coordinates share a single cost matrix column.
+    The flow formulations are also solved with them merged into
+    weighted super-clients, whose assignments are expanded back to the
+    original clients, and solved again without merging when the expanded
+    assignment breaks a facility demand bound. The integer formulations
+    keep one variable per client, since merging would force co-located
+    clients to the same facility. The OSRM costs of far away pairs are
+    screened, their lower bounds standing for them until a solution goes
+    through them. The location cost matrix is read from the cost matrix
+    store when the same facilities, locations and cost type were solved
+    before, and stored otherwise. The clients of the request are held
+    column-wise, in a ``ClientBatch`` the whole pipeline works with. The
+    clients of a request referencing a stored dataset are read from the
+    store, with their aggregation, and a DatasetNotFoundError is raised
+    when the dataset is not stored.
+    """
+
+    if assignment_request.dataset_id is None:
+        clients = ClientBatch.from_clients(assignment_request.clients or [])
+        aggregation = aggregate_colocated_clients(clients)
+    else:
+        client_dataset = client_dataset_store.get(
+            assignment_request.dataset_id
+        )
+        clients = client_dataset.clients
+        aggregation = client_dataset.aggregation
+        assignment_request = assignment_request.model_copy(
+            update={"clients": clients}
+        )
     cost_problem = CostProblem(
-        clients=assignment_request.clients,
+        clients=aggregation.locations,
         facilities=assignment_request.facilities,
         cost_type=assignment_request.objective,
     )
+    stored_costs = cost_matrix_store.get(cost_problem)
+    if stored_costs is None:
+        location_cost_matrix, surrogate_costs = compute_screened_cost_matrix(
+            cost_problem
+        )
+    elif stored_costs[1].any():
+        # Surrogate costs are refined in place, copy the read-only arrays
+        location_cost_matrix, surrogate_costs = map(np.array, stored_costs)
+    else:
+        location_cost_matrix, surrogate_costs = stored_costs
+
+    assignment_solution = _solve_assignment_request(
+        assignment_request=assignment_request,
+        clients=clients,
+        aggregation=aggregation,
+        location_cost_matrix=location_cost_matrix,
+        surrogate_costs=surrogate_costs,
+    )
+
+    # Store the costs computed, or refined, for the next solves
+    if stored_costs is None or not np.array_equal(
+        surrogate_costs, stored_costs[1]
+    ):
+        cost_matrix_store.put(
+            cost_problem=cost_problem,
+            costs=location_cost_matrix,
+            surrogate=surrogate_costs,
+        )
+
+    return assignment_solution
+
+
+def resolve_facility_assignment(
+    resolve_request: ResolveRequest,
+) -> AssignmentSolution:
+    """
+    Re-solve a cached solution with changed clients and facility demands.
+
+    Only the locations missing from the previous problem have their costs
+    computed, and the solver is warm started from the previous
+    assignments. A SolutionNotFoundError is raised when the previous
+    solution is not cached and a ResolveChangeError when the changes refer
+    to unknown or duplicated clients, to unknown facilities or leave no
+    clients.
+    """
+
+    cached_solution = solution_cache.get(resolve_request.solution_id)
+    assignment_request, clients = _apply_changes(
+        assignment_request=cached_solution.assignment_request,
+        clients=cached_solution.clients,
+        resolve_request=resolve_request,
+    )
 
-    cost_matrix = compute_cost_matrix(cost_problem)
+    # Reuse the costs of the locations of the previous problem
+    aggregation = aggregate_colocated_clients(clients)
+    cached_locations = cached_solution.aggregation.locations
+    cached_location_indices = {
+        coordinate: k
+        for k, coordinate in enumerate(
+            zip(cached_locations.lats.tolist(), cached_locations.lngs.tolist())
+        )
+    }
+    location_indices = np.array(
+        [
+            cached_location_indices.get(coordinate, -1)
+            for coordinate in zip(
+                aggregation.locations.lats.tolist(),
+                aggregation.locations.lngs.tolist(),
+            )
+        ],
+        dtype=np.int64,
+    ).reshape(-1)
+    new_locations = np.flatnonzero(location_indices < 0)
 
-    valid_cost_matrix, scaled_valid_clients = _handle_nans(
-        assignment_request, cost_matrix
+    location_cost_matrix = cached_solution.location_cost_matrix[
+        :, location_indices
+    ]
+    surrogate_costs = cached_solution.surrogate_costs[:, location_indices]
+    if new_locations.size:
+        (
+            location_cost_matrix[:, new_locations],
+            surrogate_costs[:, new_locations],
+        ) = compute_screened_cost_matrix(
+            CostProblem(
+                clients=aggregation.locations[new_locations],
+                facilities=assignment_request.facilities,
+                cost_type=assignment_request.objective,
+            )
+        )
+
+    return _solve_assignment_request(
+        assignment_request=assignment_request,
+        clients=clients,
+        aggregation=aggregation,
+        location_cost_matrix=location_cost_matrix,
+        surrogate_costs=surrogate_costs,
+        previous_client_facilities=cached_solution.client_facilities,
     )
 
+
+def _apply_changes(
+    assignment_request: AssignmentRequest,
+    clients: ClientBatch,
+    resolve_request: ResolveRequest,
+) -> Tuple[AssignmentRequest, ClientBatch]:
+    """New request, and its clients, with the changes of the re-solve
+    request applied to a previous request and its clients"""
+
+    client_ids = set(clients.ids.tolist())
+    changed_clients = {
+        client.id: client for client in resolve_request.changed_clients
+    }
+    removed_client_ids = set(resolve_request.removed_client_ids)
+    unknown_client_ids = (
+        set(changed_clients) | removed_client_ids
+    ) - client_ids
+    if unknown_client_ids:
+        raise ResolveChangeError(
+            f"Clients {sorted(unknown_client_ids)} "
+            f"are not in the previous problem"
+        )
+
+    duplicated_client_ids = set(
+        client.id for client in resolve_request.added_clients
+    ) & (client_ids - removed_client_ids)
+    if duplicated_client_ids:
+        raise ResolveChangeError(
+            f"Clients {sorted(duplicated_client_ids)} "
+            f"are already in the previous problem"
+        )
+
+    facility_updates = {
+        update.id: update for update in resolve_request.facility_updates
+    }
+    unknown_facility_ids = set(facility_updates) - set(
+        facility.id for facility in assignment_request.facilities
+    )
+    if unknown_facility_ids:
+        raise ResolveChangeError(
+            f"Facilities {sorted(unknown_facility_ids)} "
+            f"are not in the previous problem"
+        )
+
+    kept_clients = clients[~np.isin(clients.ids, list(removed_client_ids))]
+    kept_indices = {
+        client_id: j for j, client_id in enumerate(kept_clients.ids.tolist())
+    }
+    for client_id, client in changed_clients.items():
+        j = kept_indices.get(client_id)
+        if j is not None:
+            kept_clients.lats[j] = client.lat
+            kept_clients.lngs[j] = client.lng
+            kept_clients.demands[j] = client.demand
+
+    clients = ClientBatch.concatenate(
+        [kept_clients, ClientBatch.from_clients(resolve_request.added_clients)]
+    )
+    if not len(clients):
+        raise ResolveChangeError("No clients left in the problem")
+
+    facilities = []
+    for facility in assignment_request.facilities:
+        update = facility_updates.get(facility.id)
+        if update is not None:
+            facility = facility.model_copy(
+                update=update.model_dump(exclude={"id"}, exclude_none=True)
+            )
+        facilities.append(facility)
+
+    return (
+        assignment_request.model_copy(
+            update={
+                "total_demand": (
+                    resolve_request.total_demand
+                    or assignment_request.total_demand
+                ),
+                "clients": clients,
+                "facilities": facilities,
+            }
+        ),
+        clients,
+    )
+
+
+def _solve_assignment_request(
+    assignment_request: AssignmentRequest,
+    clients: ClientBatch,
+    aggregation: ClientAggregation,
+    location_cost_matrix: np.ndarray,
+    surrogate_costs: np.ndarray,
+    previous_client_facilities: Optional[Dict[str, int]] = None,
+) -> AssignmentSolution:
+    """
+    Solve a request whose unit demand costs are known for each distinct
+    client location, caching the solution for later re-solves.
+
+    Surrogate costs being lower bounds, a solution assigning no client
+    through them is optimal for the exact costs too. Otherwise, the exact
+    costs of the surrogate pairs likely to be assigned are fetched and the
+    request solved again, fetching every surrogate cost after
+    ``OSRM_SCREENING_MAX_ROUNDS`` rounds. The hexagonal grid service
+    areas come with the lookup table of the facility of each grid cell.
+    """
+
+    cost_problem = CostProblem(
+        clients=aggregation.locations,
+        facilities=assignment_request.facilities,
+        cost_type=assignment_request.objective,
+    )
+    num_rounds = 0
+    while True:
+        assignment_solution = _solve_location_costs(
+            assignment_request=assignment_request,
+            clients=clients,
+            aggregation=aggregation,
+            location_cost_matrix=location_cost_matrix,
+            previous_client_facilities=previous_client_facilities,
+        )
+        pairs = _surrogate_pairs_to_refine(
+            clients=clients,
+            aggregation=aggregation,
+            assignment_solution=assignment_solution,
+            location_cost_matrix=location_cost_matrix,
+            surrogate_costs=surrogate_costs,
+        )
+        if not pairs.any():
+            break
+
+        num_rounds += 1
+        if num_rounds > settings.OSRM_SCREENING_MAX_ROUNDS:
+            pairs[:] = True
+        refine_screened_costs(
+            cost_problem=cost_problem,
+            costs=location_cost_matrix,
+            surrogate=surrogate_costs,
+            pairs=pairs,
+        )
+
+    assignment_solution.client_reduction_ratio = aggregation.reduction_ratio
+    if (
+        assignment_request.service_area_type == ServiceAreaType.HEX_GRID
+        and assignment_solution.solution_status != SolutionStatus.INFEASIBLE
+    ):
+        assignment_solution.cell_lookup = build_cell_lookup(
+            assignment_solution.assigned_facilities
+        )
+
+    if assignment_solution.solution_status != SolutionStatus.INFEASIBLE:
+        assignment_solution.solution_id = solution_cache.add(
+            CachedSolution(
+                assignment_request=assignment_request,
+                clients=clients,
+                aggregation=aggregation,
+                location_cost_matrix=location_cost_matrix,
+                surrogate_costs=surrogate_costs,
+                client_facilities={
+                    client_id: i
+                    for i, assigned_facility in enumerate(
+                        assignment_solution.assigned_facilities
+                    )
+                    for client_id in assigned_facility.assigned_clients.ids
+                },
+            )
+        )
+
+    return assignment_solution
+
+
+def _solve_location_costs(
+    assignment_request: AssignmentRequest,
+    clients: ClientBatch,
+    aggregation: ClientAggregation,
+    location_cost_matrix: np.ndarray,
+    previous_client_facilities: Optional[Dict[str, int]],
+) -> AssignmentSolution:
+    """
+    Solve a request with the algorithm it selects, from the unit demand
+    costs of each distinct client location.
+
+    The integer formulations read the costs of the clients weighted by
+    their demands. The flow formulations read the unit costs of the
+    locations, scaled into integers in a single pass.
+    """
+
+    valid_locations = ~np.isnan(location_cost_matrix).any(axis=0)
+    valid_clients, scaled_valid_clients = _handle_nans(
+        clients=clients,
+        total_demand=assignment_request.total_demand,
+        valid_locations=valid_locations,
+        client_locations=aggregation.client_locations,
+    )
+
+    initial_client_facilities = None
+    if previous_client_facilities is not None:
+        initial_client_facilities = np.array(
+            [
+                previous_client_facilities.get(client_id, -1)
+                for client_id in scaled_valid_clients.ids.tolist()
+            ],
+            dtype=np.int64,
+        )
+
     assignment_problem = AssignmentProblem(
         clients=scaled_valid_clients,
-        facilities=cost_problem.facilities,
-        cost_matrix=valid_cost_matrix,
+        facilities=assignment_request.facilities,
         algorithm=assignment_request.algorithm,
+        initial_client_facilities=initial_client_facilities,
+        service_area_type=assignment_request.service_area_type,
+    )
+
+    solve_assignment_problem = ASSIGNMENT_ALGORITHM_MAPPING[
+        assignment_problem.algorithm
+    ]
+    if assignment_problem.algorithm not in FLOW_ALGORITHMS:
+        cost_matrix = location_cost_matrix[
+            :, aggregation.client_locations[valid_clients]
+        ]
+        cost_matrix *= clients.demands[valid_clients]
+        assignment_problem.cost_matrix = cost_matrix
+
+        return solve_assignment_problem(assignment_problem)
+
+    # The costs are weighted by the original demands of the clients, so a
+    # unit of the scaled demand of a super-client costs the ratio of both
+    # more
+    valid_aggregation = aggregate_colocated_clients(scaled_valid_clients)
+    merged_problem = merge_colocated_clients(
+        assignment_problem, valid_aggregation
+    )
+    demand_ratios = (
+        np.bincount(
+            valid_aggregation.client_locations,
+            weights=clients.demands[valid_clients],
+        )
+        / merged_problem.clients.demands
+    )
+    location_unit_costs = scale_costs(
+        (
+            location_cost_matrix
+            if valid_locations.all()
+            else location_cost_matrix[:, valid_locations]
+        ),
+        settings.MCF_SCALE_FACTOR * demand_ratios,
+    )
+    merged_problem.scaled_unit_costs = location_unit_costs
+    assignment_solution = solve_assignment_problem(merged_problem)
+    assignment_solution.assigned_facilities = expand_assigned_facilities(
+        assigned_facilities=assignment_solution.assigned_facilities,
+        clients=scaled_valid_clients,
+        aggregation=valid_aggregation,
     )
 
-    return ASSIGNMENT_ALGORITHM_MAPPING[assignment_problem.algorithm](
-        assignment_problem
+    # A super-client whose flow is split between facilities is given whole
+    # to one of them, which breaks their demand bounds or costs more than
+    # the flow, beyond the error of the scaled integer costs, so solve
+    # without merging
+    if assignment_solution.solution_status != SolutionStatus.INFEASIBLE:
+        expanded_cost = (
+            assignment_cost(
+                assigned_facilities=assignment_solution.assigned_facilities,
+                clients=scaled_valid_clients,
+                aggregation=valid_aggregation,
+                location_costs=location_unit_costs,
+            )
+            / settings.MCF_SCALE_FACTOR
+        )
+        cost_tolerance = (
+            1 + assignment_request.total_demand / settings.MCF_SCALE_FACTOR
+        )
+        if (
+            violates_demand_bounds(assignment_solution.assigned_facilities)
+            or expanded_cost
+            > assignment_solution.objective_value + cost_tolerance
+        ):
+            assignment_problem.scaled_unit_costs = location_unit_costs[
+                :, valid_aggregation.client_locations
+            ]
+            assignment_solution = solve_assignment_problem(assignment_problem)
+
+    return assignment_solution
+
+
+def _surrogate_pairs_to_refine(
+    clients: ClientBatch,
+    aggregation: ClientAggregation,
+    assignment_solution: AssignmentSolution,
+    location_cost_matrix: np.ndarray,
+    surrogate_costs: np.ndarray,
+) -> np.ndarray:
+    """
+    Mask of the surrogate costs to fetch after a solution assigning
+    clients through some of them: those of the clients assigned through
+    surrogate costs and, for each facility they are assigned to, those
+    within ``1 + OSRM_SCREENING_MARGIN`` times the largest surrogate cost
+    assigned to it, likely to be the next ones assigned.
+    """
+
+    pairs = np.zeros(surrogate_costs.shape, dtype=bool)
+    if not surrogate_costs.any():
+        return pairs
+
+    client_locations = dict(
+        zip(clients.ids.tolist(), aggregation.client_locations.tolist())
+    )
+    facilities, locations = (
+        np.array(
+            [
+                (i, client_locations[client_id])
+                for i, assigned_facility in enumerate(
+                    assignment_solution.assigned_facilities
+                )
+                for client_id in assigned_facility.assigned_clients.ids
+            ],
+            dtype=np.int64,
+        )
+        .reshape(-1, 2)
+        .T
+    )
+    surrogate_assigned = surrogate_costs[facilities, locations]
+    facilities = facilities[surrogate_assigned]
+    locations = locations[surrogate_assigned]
+
+    pairs[:, locations] = True
+    thresholds = np.full(surrogate_costs.shape[0], -np.inf)
+    np.maximum.at(
+        thresholds, facilities, location_cost_matrix[facilities, locations]
     )
+    thresholds *= 1 + settings.OSRM_SCREENING_MARGIN
+    pairs |= location_cost_matrix <= thresholds[:, None]
+    pairs &= surrogate_costs
+
+    return pairs
 
 
 def _handle_nans(
-    assignment_request: AssignmentRequest,
-    cost_matrix: np.ndarray,
-) -> Tuple[np.ndarray, List[Client]]:
+    clients: ClientBatch,
+    total_demand: float,
+    valid_locations: np.ndarray,
+    client_locations: np.ndarray,
+) -> Tuple[np.ndarray, ClientBatch]:
     """
     Some pairs of (facility, client) may face an issue when computing their
     distance and receive a NaN. In this case, there is not much we can do but
     to remove them from the analysis.
 
-    This means that we should remove all such columns from the `cost_matrix`,
-    plus delete these clients from the request. Notice the remaining ones
-    should be rescaled to keep the original total demand.
+    This means that we should remove the clients at the locations with a
+    NaN cost, given by ``valid_locations``, from the request. Notice the
+    remaining ones should be rescaled to keep the original total demand.
+    Returns the mask of the remaining clients and the rescaled clients.
     """
 
-    _, invalid_client_indices = np.nonzero(np.isnan(cost_matrix))
-    unique_invalid_client_indices = np.unique(invalid_client_indices)
-    valid_cost_matrix = np.delete(
-        cost_matrix, unique_invalid_client_indices, axis=1
-    )
-    valid_clients = [
-        client
-        for i, client in enumerate(assignment_request.clients)
-        if i not in unique_invalid_client_indices
-    ]
-    scaled_valid_clients = scale_clients_demands(
-        clients=valid_clients,
-        new_total_demand=assignment_request.total_demand,
-    )
+    valid_clients = valid_locations[client_locations]
+    if valid_clients.all():
+        return valid_clients, clients.scale_demands(total_demand)
 
-    return valid_cost_matrix, scaled_valid_clients
+    return valid_clients, clients[valid_clients].scale_demands(total_demand)
@@ -0,0 +1,218 @@
+"""
+The assignment problem with few facilities and many clients is a
+transportation problem whose optimum is determined by one price per
+facility: given the prices, each client goes to the facility of least
+unit cost plus price. This module searches such prices with vectorized
+NumPy rounds, fixes the clients whose choice is clear, and solves the
+remaining clients exactly as a small Min Cost Flow problem, checking the
+reduced costs of every arc to prove the assignment optimal.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from src.models import AssignmentProblem, AssignmentSolution, SolutionStatus
+from src.services import (
+    FlowNetwork,
+    FlowSolution,
+    build_flow_assignment_solution,
+    build_flow_network,
+    locate_clients_in_exclusive_areas,
+    solve_core_mcf_model,
+)
+
+
+def _two_cheapest_facilities(
+    reduced_costs: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Cheapest and second cheapest facility of each client and the margin
+    between them, for costs of shape (num_facilities, num_clients). The
+    costs are overwritten.
+    """
+
+    clients = np.arange(reduced_costs.shape[1])
+    cheapest = reduced_costs.argmin(axis=0)
+    cheapest_costs = reduced_costs[cheapest, clients]
+    reduced_costs[cheapest, clients] = np.inf
+    second = reduced_costs.argmin(axis=0)
+
+    return cheapest, second, reduced_costs[second, clients] - cheapest_costs
+
+
+def search_facility_prices(
+    network: FlowNetwork,
+    max_rounds: int = settings.TRANSPORTATION_MAX_PRICE_ROUNDS,
+    tolerance: float = settings.TRANSPORTATION_PRICE_TOLERANCE,
+) -> np.ndarray:
+    """
+    Search a price per facility such that clients choosing the facility of
+    least unit cost plus price meet the facility demand bounds.
+
+    Each round, every facility above its maximum demand raises its price
+    just enough to shed its excess to the second choice of its clients,
+    and every facility below its minimum demand lowers its price just
+    enough to attract its deficit. The search stops when the demand
+    outside the bounds is at most a ``tolerance`` share of the total
+    demand, or after ``max_rounds`` rounds, leaving the rest to the exact
+    repair. The prices are estimates of the Lagrange multipliers of the
+    demand constraints.
+    """
+
+    num_facilities = network.facility_min_demands.size
+    costs = np.where(network.eligible, network.unit_costs, np.inf)
+    supplies = network.client_supplies.astype(float)
+    lower = network.facility_min_demands.astype(float)
+    upper = lower + network.facility_capacities
+
+    clients = np.arange(supplies.size)
+
+    prices = np.zeros(num_facilities)
+    reduced_costs = np.empty_like(costs)
+    for _ in range(max_rounds):
+        np.add(costs, prices[:, np.newaxis], out=reduced_costs)
+        cheapest, _, margins = _two_cheapest_facilities(reduced_costs)
+        cheapest_costs = costs[cheapest, clients] + prices[cheapest]
+        loads = np.bincount(
+            cheapest, weights=supplies, minlength=num_facilities
+        )
+
+        violation = np.maximum(loads - upper, 0) + np.maximum(lower - loads, 0)
+        if violation.sum() <= tolerance * supplies.sum():
+            break
+
+        over = np.flatnonzero(loads > upper)
+        under = np.flatnonzero(loads < lower)
+
+        # Shed the excess of each facility, starting by the clients with
+        # the smallest margin to their second choice
+        for i in over:
+            own = np.flatnonzero(cheapest == i)
+            own = own[np.argsort(margins[own], kind="stable")]
+            shed = np.cumsum(supplies[own])
+            k = min(np.searchsorted(shed, loads[i] - upper[i]), own.size - 1)
+            if np.isfinite(margins[own[k]]):
+                prices[i] += margins[own[k]] + 1
+
+        # Attract the deficit of each facility, starting by the clients
+        # with the smallest gap to their current choice
+        for i in under:
+            gaps = costs[i] + prices[i] - cheapest_costs
+            others = np.flatnonzero(np.isfinite(gaps) & (cheapest != i))
+            if not others.size:
+                continue
+            others = others[np.argsort(gaps[others], kind="stable")]
+            attracted = np.cumsum(supplies[others])
+            k = min(
+                np.searchsorted(attracted, lower[i] - loads[i]),
+                others.size - 1,
+            )
+            prices[i] -= gaps[others[k]] + 1
+
+    return prices
+
+
+def solve_transportation_model(
+    network: FlowNetwork,
+    prices: np.ndarray,
+    candidate_arcs: Optional[np.ndarray] = None,
+    core_share: float = settings.TRANSPORTATION_CORE_SHARE,
+) -> Optional[FlowSolution]:
+    """
+    Solve the network exactly, starting from facility prices.
+
+    Each client starts at its cheapest facility under the prices. The
+    ``core_share`` of clients with the smallest margin to their second
+    choice is solved as a Min Cost Flow problem over their two cheapest
+    facilities and the ``candidate_arcs``, and the rest of the clients
+    are only repaired when the reduced costs show they improve the
+    solution.
+
+    Returns
+    -------
+    Optional
+        The solution, or None when the problem is infeasible.
+    """
+
+    num_clients = network.client_supplies.size
+    clients = np.arange(num_clients)
+
+    cheapest, second, margins = _two_cheapest_facilities(
+        np.where(network.eligible, network.unit_costs, np.inf)
+        + prices[:, np.newaxis]
+    )
+
+    # Arcs of the clients to their two cheapest facilities
+    arcs_mask = np.zeros_like(network.eligible)
+    arcs_mask[cheapest, clients] = True
+    arcs_mask[second, clients] = True
+    if candidate_arcs is not None:
+        arcs_mask |= candidate_arcs
+
+    return solve_core_mcf_model(
+        network=network,
+        client_facilities=cheapest,
+        priorities=np.nan_to_num(margins, nan=np.inf),
+        candidate_arcs=arcs_mask,
+        core_share=core_share,
+    )
+
+
+def solve_transportation_formulation(
+    assignment_problem: AssignmentProblem,
+) -> AssignmentSolution:
+    """
+    Solve assignment problem as a transportation problem, searching the
+    facility prices before solving exactly the clients whose choice they
+    leave unclear. It reaches the Min Cost Flow optimum, faster when
+    there are few facilities and many clients.
+    """
+
+    # Locate the clients inside exclusive service areas
+    try:
+        client_exclusive_facilities = locate_clients_in_exclusive_areas(
+            clients=assignment_problem.clients,
+            facilities=assignment_problem.facilities,
+        )
+    except ValueError as e:
+        return AssignmentSolution(
+            solution_status=SolutionStatus.INFEASIBLE,
+            message=str(e),
+        )
+
+    network = build_flow_network(
+        assignment_problem=assignment_problem,
+        client_exclusive_facilities=client_exclusive_facilities,
+    )
+
+    # The arcs of the previous assignments, if any, are candidates
+    candidate_arcs = None
+    initial_client_facilities = assignment_problem.initial_client_facilities
+    if initial_client_facilities is not None:
+        previous_clients = np.flatnonzero(
+            (initial_client_facilities >= 0)
+            & (initial_client_facilities < len(assignment_problem.facilities))
+        )
+        candidate_arcs = np.zeros_like(network.eligible)
+        candidate_arcs[
+            initial_client_facilities[previous_clients], previous_clients
+        ] = True
+
+    solution = solve_transportation_model(
+        network=network,
+        prices=search_facility_prices(network),
+        candidate_arcs=candidate_arcs,
+    )
+
+    if solution is not None:
+        return build_flow_assignment_solution(
+            assignment_problem=assignment_problem,
+            client_facilities=solution.client_facilities,
+            cost=solution.cost,
+            client_exclusive_facilities=client_exclusive_facilities,
+            optimal=solution.optimal,
+        )
+
+    return AssignmentSolution(message="No optimal solution found")
@@ -1,38 +1,96 @@
-from copy import deepcopy
-from typing import List, Tuple
+from typing import List, Tuple, Union
 
 import numpy as np
 
-from src.models import AlgorithmType, AssignmentProblem, Client, Facility
+from src.models import AlgorithmType, AssignmentProblem
+
+
+def scale_costs(
+    costs: np.ndarray, scale_factors: Union[float, np.ndarray]
+) -> np.ndarray:
+    """
+    Multiply costs by a scale factor, or by one per column, truncating the
+    products into a new int64 array. The products are written straight
+    into the integer array, so no float array of the costs size is made.
+    """
+
+    return np.multiply(
+        costs,
+        scale_factors,
+        out=np.empty(costs.shape, dtype=np.int64),
+        dtype=float,
+        casting="unsafe",
+    )
 
 
 def scale_assignment_problem_parameters(
     assignment_problem: AssignmentProblem, scale_factor: int
-) -> Tuple[List[Client], List[Facility], np.ndarray]:
-    """Scale problem factors to become integer"""
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scale problem factors to become integer.
 
-    scaled_clients = deepcopy(assignment_problem.clients)
-    for client in scaled_clients:
-        client.demand = round(scale_factor * client.demand)
+    The parameters are read into arrays and scaled with broadcast
+    operations, leaving the clients and facilities of the problem
+    untouched. Demands are rounded to the nearest integer, half to even
+    like the built-in ``round``, and costs are truncated. The flow
+    formulations take the scaled unit costs of the problem as they are,
+    and only divide the cost matrix by the client demands without them.
 
-    scaled_facilities = deepcopy(assignment_problem.facilities)
-    for facility in scaled_facilities:
-        facility.min_demand = round(scale_factor * facility.min_demand)
-        facility.max_demand = round(scale_factor * facility.max_demand)
+    Returns
+    -------
+    Tuple
+        Integer arrays with the clients demands, the facilities minimum
+        and maximum demands and the cost matrix.
+    """
 
-    scaled_cost_matrix = assignment_problem.cost_matrix.copy()
-    scaled_cost_matrix *= scale_factor
+    client_demands = assignment_problem.clients.demands
+    facility_min_demands = np.array(
+        [facility.min_demand for facility in assignment_problem.facilities],
+        dtype=np.int64,
+    )
+    facility_max_demands = np.array(
+        [facility.max_demand for facility in assignment_problem.facilities],
+        dtype=np.int64,
+    )
 
     # If the problem is formulated as a flow problem, the cost matrix is
     # scaled to become unit cost.
-    if assignment_problem.algorithm == AlgorithmType.MCF_FORMULATION:
-        num_facilities = len(assignment_problem.facilities)
-        num_clients = len(assignment_problem.clients)
-        for i in range(num_facilities):
-            for j in range(num_clients):
-                scaled_cost_matrix[i][j] = (
-                    scaled_cost_matrix[i][j]
-                    / assignment_problem.clients[j].demand
-                )
-
-    return scaled_clients, scaled_facilities, scaled_cost_matrix.astype(int)
+    is_flow_problem = assignment_problem.algorithm in (
+        AlgorithmType.MCF_FORMULATION,
+        AlgorithmType.TRANSPORTATION_FORMULATION,
+        AlgorithmType.DECOMPOSED_FLOW_FORMULATION,
+    )
+    cost_matrix = assignment_problem.cost_matrix
+    if is_flow_problem and assignment_problem.scaled_unit_costs is not None:
+        scaled_cost_matrix = assignment_problem.scaled_unit_costs
+    elif cost_matrix is None:
+        raise ValueError("The problem has no cost matrix")
+    elif is_flow_problem:
+        scaled_cost_matrix = scale_costs(
+            cost_matrix, scale_factor / client_demands
+        )
+    else:
+        scaled_cost_matrix = scale_costs(cost_matrix, scale_factor)
+
+    return (
+        np.rint(scale_factor * client_demands).astype(np.int64),
+        scale_factor * facility_min_demands,
+        scale_factor * facility_max_demands,
+        scaled_cost_matrix,
+    )
+
+
+def group_clients_by_facility(
+    client_facilities: np.ndarray, num_facilities: int
+) -> List[np.ndarray]:
+    """
+    Group client indices by the index of their assigned facility, keeping
+    the clients of each facility in increasing order. Clients assigned to
+    a negative index are left out.
+    """
+
+    order = np.argsort(client_facilities, kind="stable")
+    order = order[client_facilities[order] >= 0]
+    counts = np.bincount(client_facilities[order], minlength=num_facilities)
+
+    return np.split(order, np.cumsum(counts)[:-1])
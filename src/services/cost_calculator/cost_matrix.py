@@ -1,34 +1,303 @@
-import cost_matrix
+from typing import Tuple
+
 import numpy as np
 
+from config import settings
 from src.models import CostProblem, CostType
+from src.services import (
+    compute_spherical_costs,
+    fetch_osrm_costs,
+    osrm_cost_cache,
+)
+
+OSRM_COST_TYPES = ("distances", "durations")
 
-OSRM_COST_TYPE_MAPPING = {
-    CostType.OSRM_DISTANCE.value: "distances",
-    CostType.OSRM_DURATION.value: "durations",
-}
+# Bits per coordinate of the Z-order curve sorting the facilities
+Z_ORDER_BITS = 10
 
 
 def compute_cost_matrix(cost_problem: CostProblem) -> np.ndarray:
-    """Compute cost matrix with a given cost type"""
+    """
+    Compute cost matrix with a given cost type, weighted by the client
+    demands. Spherical costs are computed in chunks, weighted as they are
+    written. OSRM distances and durations are read together from the cost
+    cache, only the missing ones being requested from the server, both in
+    the same requests. The OSRM cost is either of them or their blend,
+    weighted by the cost problem distance and duration weights.
+    """
+
+    sources, destinations, demands = _cost_problem_arrays(cost_problem)
+
+    if cost_problem.cost_type == CostType.SPHERICAL_DISTANCE:
+        return compute_spherical_costs(
+            sources=sources, destinations=destinations, weights=demands
+        )
+
+    costs = _combine_osrm_costs(
+        cost_problem,
+        _compute_cached_osrm_costs(
+            cost_problem=cost_problem,
+            sources=sources,
+            destinations=destinations,
+        ),
+    )
+    costs *= demands
+
+    return costs
+
+
+def compute_screened_cost_matrix(
+    cost_problem: CostProblem,
+    margin: float = settings.OSRM_SCREENING_MARGIN,
+    num_nearest: int = settings.OSRM_SCREENING_NUM_NEAREST,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the cost matrix like ``compute_cost_matrix``, skipping the
+    OSRM queries of the pairs too far away to be worth it.
+
+    The spherical distance, less twice ``OSRM_SCREENING_SNAP_METERS`` for
+    the snapping to the road network, is a lower bound of the road
+    distance, and of the road duration at ``OSRM_SCREENING_MAX_SPEED``.
+    The road costs from each client to its ``num_nearest`` spherically
+    nearest facilities are fetched first. Then only the pairs whose lower
+    bound is within ``1 + margin`` times the best road cost of the client
+    are fetched. The others get their lower bound as surrogate cost, so a
+    solution assigning no client through a surrogate pair is optimal for
+    the road costs too. Otherwise, ``refine_screened_costs`` fetches the
+    exact costs of the surrogate pairs that matter.
+
+    The bounds only hold when OSRM snaps the points within the snap
+    distance and no road is faster than the speed, which is not checked,
+    hence the screening is disabled unless ``OSRM_SCREENING`` is set.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        Cost matrix and boolean mask of its surrogate costs.
+    """
+
+    if (
+        not settings.OSRM_SCREENING
+        or cost_problem.cost_type == CostType.SPHERICAL_DISTANCE
+    ):
+        costs = compute_cost_matrix(cost_problem)
+        return costs, np.zeros(costs.shape, dtype=bool)
+
+    sources, destinations, demands = _cost_problem_arrays(cost_problem)
+    lower_bounds = _compute_osrm_lower_bounds(
+        cost_problem, sources, destinations
+    )
+
+    road_costs = osrm_cost_cache.get(
+        sources=sources, destinations=destinations, cost_types=OSRM_COST_TYPES
+    )
+    known = ~np.isnan(road_costs).any(axis=0)
+
+    num_nearest = min(num_nearest, len(sources))
+    nearest = np.argpartition(lower_bounds, num_nearest - 1, axis=0)
+    seeds = np.zeros(lower_bounds.shape, dtype=bool)
+    np.put_along_axis(seeds, nearest[:num_nearest], True, axis=0)
+    _fetch_osrm_pairs(
+        cost_problem, sources, destinations, road_costs, known, seeds
+    )
+
+    costs = _combine_osrm_costs(cost_problem, road_costs)
+    best_costs = np.min(
+        np.where(known & ~np.isnan(costs), costs, np.inf), axis=0
+    )
+    needed = lower_bounds <= (1 + margin) * best_costs
+    _fetch_osrm_pairs(
+        cost_problem, sources, destinations, road_costs, known, needed
+    )
+
+    costs = _combine_osrm_costs(cost_problem, road_costs)
+    surrogate = ~known
+    costs[surrogate] = lower_bounds[surrogate]
+    costs *= demands
+
+    return costs, surrogate
+
+
+def refine_screened_costs(
+    cost_problem: CostProblem,
+    costs: np.ndarray,
+    surrogate: np.ndarray,
+    pairs: np.ndarray,
+):
+    """
+    Replace, in place, the surrogate costs of the ``pairs`` mask of a
+    screened cost matrix with their OSRM costs, updating its surrogate
+    mask.
+    """
+
+    sources, destinations, demands = _cost_problem_arrays(cost_problem)
+    road_costs = np.full((len(OSRM_COST_TYPES), *costs.shape), np.nan)
+    known = ~surrogate
+    _fetch_osrm_pairs(
+        cost_problem, sources, destinations, road_costs, known, pairs
+    )
+
+    refined = known & surrogate
+    exact_costs = _combine_osrm_costs(cost_problem, road_costs)
+    exact_costs *= demands
+    costs[refined] = exact_costs[refined]
+    surrogate &= ~refined
+
+
+def _cost_problem_arrays(
+    cost_problem: CostProblem,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(lat, lng) of the facilities and clients and the client demands"""
 
     sources = np.array(
         [(facility.lat, facility.lng) for facility in cost_problem.facilities]
     )
-    destinations = np.array(
-        [(client.lat, client.lng) for client in cost_problem.clients]
+    destinations = cost_problem.clients.coordinates
+
+    return sources, destinations, cost_problem.clients.demands
+
+
+def _combine_osrm_costs(
+    cost_problem: CostProblem, road_costs: np.ndarray
+) -> np.ndarray:
+    """
+    OSRM cost of the cost problem type from the stacked distances and
+    durations, a view of them unless blended.
+    """
+
+    distances, durations = road_costs
+    if cost_problem.cost_type == CostType.OSRM_DISTANCE:
+        return distances
+    if cost_problem.cost_type == CostType.OSRM_DURATION:
+        return durations
+
+    costs = cost_problem.distance_weight * distances
+    costs += cost_problem.duration_weight * durations
+
+    return costs
+
+
+def _compute_osrm_lower_bounds(
+    cost_problem: CostProblem, sources: np.ndarray, destinations: np.ndarray
+) -> np.ndarray:
+    """Lower bounds of the OSRM costs of the cost problem type"""
+
+    lower_bounds = compute_spherical_costs(
+        sources=sources, destinations=destinations, dtype=np.dtype(np.float64)
     )
-    demands = np.array([client.demand for client in cost_problem.clients])
+    lower_bounds -= 2 * settings.OSRM_SCREENING_SNAP_METERS
+    np.maximum(lower_bounds, 0, out=lower_bounds)
 
-    if cost_problem.cost_type == CostType.SPHERICAL_DISTANCE:
-        return demands * cost_matrix.spherical(
-            sources=sources, destinations=destinations
+    if cost_problem.cost_type == CostType.OSRM_DURATION:
+        lower_bounds /= settings.OSRM_SCREENING_MAX_SPEED
+    elif cost_problem.cost_type == CostType.OSRM_BLENDED_COST:
+        lower_bounds *= (
+            cost_problem.distance_weight
+            + cost_problem.duration_weight / settings.OSRM_SCREENING_MAX_SPEED
         )
 
-    return demands * cost_matrix.osrm(
-        sources=sources,
+    return lower_bounds
+
+
+def _z_order(coordinates: np.ndarray) -> np.ndarray:
+    """Indices sorting the (lat, lng) coordinates along a Z-order curve, so
+    that consecutive ones are close to each other"""
+
+    extent = max(np.ptp(coordinates, axis=0).max(), np.finfo(float).eps)
+    cells = (
+        (coordinates - coordinates.min(axis=0))
+        / extent
+        * (2**Z_ORDER_BITS - 1)
+    ).astype(np.int64)
+
+    codes = np.zeros(coordinates.shape[0], dtype=np.int64)
+    for bit in range(Z_ORDER_BITS):
+        codes |= ((cells[:, 0] >> bit) & 1) << (2 * bit + 1)
+        codes |= ((cells[:, 1] >> bit) & 1) << (2 * bit)
+
+    return np.argsort(codes, kind="stable")
+
+
+def _fetch_osrm_pairs(
+    cost_problem: CostProblem,
+    sources: np.ndarray,
+    destinations: np.ndarray,
+    road_costs: np.ndarray,
+    known: np.ndarray,
+    pairs: np.ndarray,
+):
+    """
+    Fetch the stacked OSRM distances and durations of the unknown pairs of
+    the ``pairs`` mask, along with the other pairs of the same requests,
+    writing them into ``road_costs`` and marking them as known in place,
+    and cache them.
+
+    Nearby facilities are requested together, sorted along a Z-order
+    curve in groups of ``OSRM_SCREENING_GROUP_SIZE``, so that each request
+    only covers the clients close to some facility of its group.
+    """
+
+    missing = pairs & ~known
+    if not missing.any():
+        return
+
+    order = _z_order(sources)
+    fetched_costs = np.empty_like(road_costs)
+    fetched_costs[:, order] = fetch_osrm_costs(
+        sources=sources[order],
         destinations=destinations,
         server_address=cost_problem.osrm_server_address,
         batch_size=cost_problem.osrm_batch_size,
-        cost_type=OSRM_COST_TYPE_MAPPING[cost_problem.cost_type.value],
+        cost_types=OSRM_COST_TYPES,
+        pairs=missing[order],
+        sources_batch_size=settings.OSRM_SCREENING_GROUP_SIZE,
     )
+
+    # Unreachable pairs requested are known, with NaN costs
+    fetched = (~np.isnan(fetched_costs).any(axis=0) | missing) & ~known
+    road_costs[:, fetched] = fetched_costs[:, fetched]
+    known |= fetched
+
+    osrm_cost_cache.put(
+        sources=sources,
+        destinations=destinations,
+        costs=np.where(fetched, fetched_costs, np.nan),
+        cost_types=OSRM_COST_TYPES,
+    )
+
+
+def _compute_cached_osrm_costs(
+    cost_problem: CostProblem, sources: np.ndarray, destinations: np.ndarray
+) -> np.ndarray:
+    """
+    OSRM distances and durations, stacked, from the cost cache, requesting
+    from the server the rows and columns of the matrices with missing pairs
+    and caching them.
+    """
+
+    costs = osrm_cost_cache.get(
+        sources=sources, destinations=destinations, cost_types=OSRM_COST_TYPES
+    )
+
+    missing = np.isnan(costs).any(axis=0)
+    missing_sources = np.flatnonzero(missing.any(axis=1))
+    missing_destinations = np.flatnonzero(missing.any(axis=0))
+    if missing_destinations.size:
+        missing_costs = fetch_osrm_costs(
+            sources=sources[missing_sources],
+            destinations=destinations[missing_destinations],
+            server_address=cost_problem.osrm_server_address,
+            batch_size=cost_problem.osrm_batch_size,
+            cost_types=OSRM_COST_TYPES,
+        )
+        costs[:, missing_sources[:, None], missing_destinations] = (
+            missing_costs
+        )
+        osrm_cost_cache.put(
+            sources=sources[missing_sources],
+            destinations=destinations[missing_destinations],
+            costs=missing_costs,
+            cost_types=OSRM_COST_TYPES,
+        )
+
+    return costs
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from src.models import CostProblem, CostType
+
+COSTS_SUFFIX = "-costs.npy"
+SURROGATE_SUFFIX = "-surrogate.npy"
+
+
+class CostMatrixStore:
+    """
+    Persistent store of the screened cost matrices of cost problems, kept
+    as NumPy ``.npy`` files in a folder shared by every worker.
+
+    Matrices are keyed by a hash of everything the costs depend on: the
+    facility and client coordinates, the client demands scaling them, the
+    cost type and the settings. They are memory-mapped, read-only, so the
+    workers solving the same problem share one copy in the page cache.
+    Beyond ``max_bytes``, the least recently used matrices are evicted,
+    and a ``max_bytes`` of 0 disables the store.
+
+    OSRM cost matrices older than ``ttl_seconds``, like the OSRM costs of
+    the cache they come from, are ignored and computed again. The write
+    time is the modification time of the surrogate file, the one of the
+    costs file being the last use.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.COST_MATRIX_STORE_PATH,
+        max_bytes: int = settings.COST_MATRIX_STORE_MAX_BYTES,
+        ttl_seconds: float = settings.OSRM_CACHE_TTL_SECONDS,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+    def get(
+        self, cost_problem: CostProblem
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Stored cost matrix of the cost problem and boolean mask of its
+        surrogate costs, memory-mapped, or None when it is not stored"""
+
+        if not self.max_bytes:
+            return None
+
+        costs_path, surrogate_path = self._paths(cost_problem)
+        if self._expired(cost_problem, surrogate_path):
+            return None
+
+        try:
+            costs = np.load(costs_path, mmap_mode="r")
+            surrogate = np.load(surrogate_path, mmap_mode="r")
+            os.utime(costs_path)
+        except (OSError, ValueError):
+            # Missing, or evicted meanwhile by another worker
+            return None
+
+        return costs, surrogate
+
+    def put(
+        self,
+        cost_problem: CostProblem,
+        costs: np.ndarray,
+        surrogate: np.ndarray,
+    ):
+        """Store the cost matrix of the cost problem and the mask of its
+        surrogate costs, evicting the least recently used matrices. A
+        matrix refined since it was read keeps its write time, its other
+        costs being as old."""
+
+        size = costs.nbytes + surrogate.nbytes
+        if size > self.max_bytes:
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        costs_path, surrogate_path = self._paths(cost_problem)
+        write_time = None
+        if not self._expired(cost_problem, surrogate_path):
+            try:
+                write_time = os.stat(surrogate_path).st_mtime
+            except OSError:
+                pass
+
+        # Write to temporary files renamed at once, the costs last, so a
+        # matrix whose costs file exists is complete
+        for path, array in ((surrogate_path, surrogate), (costs_path, costs)):
+            file_descriptor, temporary_path = tempfile.mkstemp(
+                dir=self.path, suffix=".tmp"
+            )
+            with os.fdopen(file_descriptor, "wb") as file:
+                np.save(file, array)
+            os.replace(temporary_path, path)
+        if write_time is not None:
+            os.utime(surrogate_path, (write_time, write_time))
+
+        self._evict()
+
+    def _paths(self, cost_problem: CostProblem) -> Tuple[str, str]:
+        key = cost_problem_key(cost_problem)
+
+        return (
+            os.path.join(self.path, key + COSTS_SUFFIX),
+            os.path.join(self.path, key + SURROGATE_SUFFIX),
+        )
+
+    def _expired(self, cost_problem: CostProblem, surrogate_path: str) -> bool:
+        """Whether the stored OSRM cost matrix is older than
+        ``ttl_seconds``, the spherical ones never expiring"""
+
+        if cost_problem.cost_type == CostType.SPHERICAL_DISTANCE:
+            return False
+
+        try:
+            write_time = os.stat(surrogate_path).st_mtime
+        except OSError:
+            return False
+
+        return write_time < time.time() - self.ttl_seconds
+
+    def _evict(self):
+        """Remove the least recently used matrices beyond ``max_bytes``"""
+
+        matrices = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(COSTS_SUFFIX):
+                surrogate_path = entry.path[: -len(COSTS_SUFFIX)]
+                surrogate_path += SURROGATE_SUFFIX
+                try:
+                    size = (
+                        entry.stat().st_size + os.stat(surrogate_path).st_size
+                    )
+                    matrices.append((entry.stat().st_mtime, size, entry.path))
+                except OSError:
+                    continue
+
+        total_size = sum(size for _, size, _ in matrices)
+        for _, size, costs_path in sorted(matrices):
+            if total_size <= self.max_bytes:
+                break
+            surrogate_path = costs_path[: -len(COSTS_SUFFIX)]
+            surrogate_path += SURROGATE_SUFFIX
+            for path in (costs_path, surrogate_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total_size -= size
+
+
+def cost_problem_key(cost_problem: CostProblem) -> str:
+    """Hash of the data the cost matrix of a cost problem depends on"""
+
+    digest = hashlib.sha256(
+        json.dumps(
+            {
+                "cost_type": int(cost_problem.cost_type),
+                "dtype": settings.COST_MATRIX_DTYPE,
+                "screening": settings.OSRM_SCREENING,
+                "osrm_server_address": cost_problem.osrm_server_address,
+                "distance_weight": cost_problem.distance_weight,
+                "duration_weight": cost_problem.duration_weight,
+            },
+            sort_keys=True,
+        ).encode()
+    )
+    digest.update(
+        np.array(
+            [
+                (facility.lat, facility.lng)
+                for facility in cost_problem.facilities
+            ],
+            dtype=float,
+        ).tobytes()
+    )
+    digest.update(np.ascontiguousarray(cost_problem.clients.lats).tobytes())
+    digest.update(np.ascontiguousarray(cost_problem.clients.lngs).tobytes())
+    digest.update(np.ascontiguousarray(cost_problem.clients.demands).tobytes())
+
+    return digest.hexdigest()[:32]
+
+
+cost_matrix_store = CostMatrixStore()
@@ -0,0 +1,161 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import settings
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+OSRM_COST_TYPES = ("distances", "durations")
+
+
+def _format_table_url(
+    sources: np.ndarray,
+    destinations: np.ndarray,
+    server_address: str,
+    cost_types: Sequence[str],
+) -> str:
+    """
+    URL of the OSRM ``/table`` service from the (lat, lng) sources to the
+    destinations. OSRM takes (lng, lat) locations and its annotations are
+    the singular of the returned cost types, "distance" for "distances".
+    """
+
+    locations = ";".join(
+        f"{lng},{lat}" for lat, lng in np.vstack((sources, destinations))
+    )
+    num_sources, num_destinations = sources.shape[0], destinations.shape[0]
+    sources_indices = ";".join(str(k) for k in range(num_sources))
+    destinations_indices = ";".join(
+        str(k) for k in range(num_sources, num_sources + num_destinations)
+    )
+    annotations = ",".join(cost_type[:-1] for cost_type in cost_types)
+
+    return (
+        f"{server_address}/table/v1/driving/{locations}"
+        f"?sources={sources_indices}&destinations={destinations_indices}"
+        f"&annotations={annotations}"
+    )
+
+
+def _build_session(max_workers: int, max_retries: int) -> requests.Session:
+    """
+    HTTP session keeping up to ``max_workers`` connections alive and
+    retrying, with exponential backoff, the batches failing to connect,
+    timing out or answered with a transient error status.
+    """
+
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=0.1,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=max_workers, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def fetch_osrm_costs(
+    sources: np.ndarray,
+    destinations: np.ndarray,
+    server_address: str = settings.OSRM_SERVER_ADDRESS,
+    batch_size: int = settings.OSRM_BATCH_SIZE,
+    cost_types: Sequence[str] = OSRM_COST_TYPES,
+    max_workers: int = settings.OSRM_MAX_CONCURRENT_REQUESTS,
+    timeout_seconds: float = settings.OSRM_REQUEST_TIMEOUT_SECONDS,
+    max_retries: int = settings.OSRM_MAX_RETRIES,
+    pairs: Optional[np.ndarray] = None,
+    sources_batch_size: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Compute the OSRM cost matrices between (lat, lng) sources and
+    destinations of each of the ``cost_types``, "distances" and
+    "durations", both fetched by the same requests.
+
+    The matrix is split in batches of at most ``batch_size`` sources and
+    destinations, requested concurrently by ``max_workers`` threads over a
+    pooled session, each batch writing its block of the matrices in place.
+    Batches slower than ``timeout_seconds`` or failing transiently are
+    retried up to ``max_retries`` times. Unreachable pairs are NaN.
+
+    Given a boolean ``pairs`` mask of shape (num_sources, num_destinations),
+    each batch of ``sources_batch_size`` consecutive sources only requests
+    the destinations with a pair in the mask, as many as fit in
+    ``2 * batch_size`` locations, the other costs being NaN.
+    Sources likely to share destinations should then be consecutive.
+
+    Returns
+    -------
+    np.ndarray
+        OSRM cost matrices of shape (len(cost_types), num_sources,
+        num_destinations).
+    """
+
+    num_sources, num_destinations = sources.shape[0], destinations.shape[0]
+    costs = np.full((len(cost_types), num_sources, num_destinations), np.nan)
+    sources_batch_size = sources_batch_size or batch_size
+    batches: List[Tuple[slice, Union[slice, np.ndarray]]] = []
+    for i in range(0, num_sources, sources_batch_size):
+        rows = slice(i, i + sources_batch_size)
+        if pairs is None:
+            batches.extend(
+                (rows, slice(j, j + batch_size))
+                for j in range(0, num_destinations, batch_size)
+            )
+        else:
+            # Fill the requests up to 2 * batch_size locations
+            columns = np.flatnonzero(pairs[rows].any(axis=0))
+            columns_batch_size = max(
+                2 * batch_size - min(sources_batch_size, num_sources - i),
+                batch_size,
+            )
+            batches.extend(
+                (rows, batch_columns)
+                for batch_columns in np.split(
+                    columns,
+                    range(
+                        columns_batch_size, columns.size, columns_batch_size
+                    ),
+                )
+                if batch_columns.size
+            )
+
+    def fetch_batch(batch: Tuple[slice, Union[slice, np.ndarray]]):
+        rows, columns = batch
+        response = session.get(
+            _format_table_url(
+                sources=sources[rows],
+                destinations=destinations[columns],
+                server_address=server_address,
+                cost_types=cost_types,
+            ),
+            timeout=timeout_seconds,
+        )
+        response.raise_for_status()
+
+        # Unreachable pairs come as None, read as NaN
+        table = response.json()
+        for k, cost_type in enumerate(cost_types):
+            costs[k][rows, columns] = np.array(table[cost_type], dtype=float)
+
+    if not batches:
+        return costs
+
+    num_workers = max(min(max_workers, len(batches)), 1)
+    with _build_session(num_workers, max_retries) as session:
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            # Consume the results to raise the first failed batch, if any
+            for _ in executor.map(fetch_batch, batches):
+                pass
+
+    return costs
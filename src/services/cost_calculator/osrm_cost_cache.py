@@ -0,0 +1,435 @@
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import settings
+
+OSRM_CACHE_COLUMNS = {"distances": "distance", "durations": "duration"}
+
+SOURCE_COLUMNS = "source_lat, source_lng"
+
+
+class SourceCosts:
+    """
+    Cached costs from a source, with one array per attribute, the
+    destinations being sorted by key.
+
+    Attributes
+    ----------
+    destination_keys
+        Sorted keys of the snapped destination coordinates.
+    costs
+        Mapping of the cache columns, "distance" and "duration", to the
+        costs to each destination, NaN when unknown.
+    updated_ats
+        Time each destination was last stored.
+    """
+
+    __slots__ = ("destination_keys", "costs", "updated_ats")
+
+    def __init__(
+        self,
+        destination_keys: np.ndarray,
+        costs: Dict[str, np.ndarray],
+        updated_ats: np.ndarray,
+    ):
+        self.destination_keys = destination_keys
+        self.costs = costs
+        self.updated_ats = updated_ats
+
+    @classmethod
+    def empty(
+        cls, destination_keys: Optional[np.ndarray] = None
+    ) -> "SourceCosts":
+        """Unknown costs to the sorted destination keys, none by default"""
+
+        if destination_keys is None:
+            destination_keys = np.empty(0, dtype=np.int64)
+
+        return cls(
+            destination_keys=destination_keys,
+            costs={
+                column: np.full(destination_keys.size, np.nan)
+                for column in OSRM_CACHE_COLUMNS.values()
+            },
+            updated_ats=np.zeros(destination_keys.size),
+        )
+
+    @classmethod
+    def from_row(cls, row: Tuple[bytes, ...]) -> "SourceCosts":
+        destination_keys, *costs, updated_ats = row
+
+        return cls(
+            destination_keys=np.frombuffer(destination_keys, dtype=np.int64),
+            costs={
+                column: np.frombuffer(column_costs, dtype=float)
+                for column, column_costs in zip(
+                    OSRM_CACHE_COLUMNS.values(), costs
+                )
+            },
+            updated_ats=np.frombuffer(updated_ats, dtype=float),
+        )
+
+    def to_row(self) -> Tuple[bytes, ...]:
+        return (
+            self.destination_keys.tobytes(),
+            *(
+                self.costs[column].tobytes()
+                for column in OSRM_CACHE_COLUMNS.values()
+            ),
+            self.updated_ats.tobytes(),
+        )
+
+    def __len__(self) -> int:
+        return self.destination_keys.size
+
+    def find(self, destination_keys: np.ndarray) -> np.ndarray:
+        """Index of each of the destination keys in the sorted ones, or -1
+        when it is missing"""
+
+        if not len(self):
+            return np.full(destination_keys.size, -1)
+
+        positions = np.minimum(
+            np.searchsorted(self.destination_keys, destination_keys),
+            len(self) - 1,
+        )
+
+        return np.where(
+            self.destination_keys[positions] == destination_keys,
+            positions,
+            -1,
+        )
+
+    def select(self, mask: np.ndarray) -> "SourceCosts":
+        return SourceCosts(
+            destination_keys=self.destination_keys[mask],
+            costs={
+                column: costs[mask] for column, costs in self.costs.items()
+            },
+            updated_ats=self.updated_ats[mask],
+        )
+
+
+class OSRMCostCache:
+    """
+    Persistent cache of the OSRM distances and durations from facilities to
+    clients, stored in SQLite.
+
+    Pairs are keyed by their coordinates rounded to ``precision`` decimal
+    places, so clients a few centimeters apart share their costs. Each
+    source has a single row holding, as NumPy arrays, the sorted keys of
+    its destinations, their costs and the time they were stored, so
+    looking up a source reads one row and its destinations with array
+    searches. Costs older than ``ttl_seconds`` are ignored and evicted,
+    and beyond ``max_entries`` pairs the sources least recently used are
+    evicted with all their pairs. The database is opened on first use.
+
+    Attributes
+    ----------
+    hits, misses
+        Number of pairs found and not found in the cache.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.OSRM_CACHE_PATH,
+        precision: int = settings.OSRM_CACHE_PRECISION,
+        ttl_seconds: float = settings.OSRM_CACHE_TTL_SECONDS,
+        max_entries: int = settings.OSRM_CACHE_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.precision = precision
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of the looked up pairs found in the cache"""
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return (
+                self._connect()
+                .execute("SELECT COALESCE(SUM(num_pairs), 0) FROM osrm_costs")
+                .fetchone()[0]
+            )
+
+    def get(
+        self,
+        sources: np.ndarray,
+        destinations: np.ndarray,
+        cost_types: Sequence[str],
+    ) -> np.ndarray:
+        """
+        Cached costs of each of the ``cost_types``, "distances" and
+        "durations", from the (lat, lng) sources to the destinations, of
+        shape (len(cost_types), num_sources, num_destinations). A pair
+        missing any of the cost types is a miss, with NaN costs.
+        """
+
+        columns = [OSRM_CACHE_COLUMNS[cost_type] for cost_type in cost_types]
+        costs = np.full(
+            (len(cost_types), sources.shape[0], destinations.shape[0]),
+            np.nan,
+        )
+        source_keys = [tuple(key) for key in self._round(sources).tolist()]
+        destination_keys = self._destination_keys(destinations)
+        # Sorted keys are searched much faster in the sorted cached ones
+        order = np.argsort(destination_keys)
+        destination_keys = destination_keys[order]
+        now = time.time()
+
+        with self._lock:
+            connection = self._connect()
+            source_costs = self._read(connection, set(source_keys))
+            connection.executemany(
+                "UPDATE osrm_costs SET used_at = ? "
+                "WHERE source_lat = ? AND source_lng = ?",
+                [(now, *source_key) for source_key in source_costs],
+            )
+            connection.commit()
+
+        for i, source_key in enumerate(source_keys):
+            if source_key not in source_costs:
+                continue
+            row_costs = source_costs[source_key]
+            positions = row_costs.find(destination_keys)
+            found = positions >= 0
+            found[found] = (
+                row_costs.updated_ats[positions[found]]
+                >= now - self.ttl_seconds
+            )
+            for k, column in enumerate(columns):
+                costs[k, i, order[found]] = row_costs.costs[column][
+                    positions[found]
+                ]
+
+        # A pair missing any of the cost types is a miss
+        missing = np.isnan(costs).any(axis=0)
+        costs[:, missing] = np.nan
+        num_hits = int(missing.size - missing.sum())
+        self.hits += num_hits
+        self.misses += missing.size - num_hits
+
+        return costs
+
+    def put(
+        self,
+        sources: np.ndarray,
+        destinations: np.ndarray,
+        costs: np.ndarray,
+        cost_types: Sequence[str],
+    ):
+        """
+        Store the costs of each of the ``cost_types``, of shape
+        (len(cost_types), num_sources, num_destinations), from the (lat,
+        lng) sources to the destinations, skipping pairs with NaN costs,
+        merged into the row of each source, then evict the expired and
+        the least recently used pairs.
+        """
+
+        columns = [OSRM_CACHE_COLUMNS[cost_type] for cost_type in cost_types]
+        source_keys = [tuple(key) for key in self._round(sources).tolist()]
+        destination_keys = self._destination_keys(destinations)
+        order = np.argsort(destination_keys)
+        destination_keys = destination_keys[order]
+        costs = costs[:, :, order]
+        known = ~np.isnan(costs).any(axis=0)
+        now = time.time()
+
+        with self._lock:
+            connection = self._connect()
+            # Lock the database for writing, as other processes share it
+            connection.execute("BEGIN IMMEDIATE")
+            source_costs = self._read(connection, set(source_keys))
+            merged_costs: Dict[Tuple[int, int], SourceCosts] = {}
+            for i, source_key in enumerate(source_keys):
+                if not known[i].any():
+                    continue
+                merged_costs[source_key] = self._merge(
+                    row_costs=merged_costs.get(
+                        source_key, source_costs.get(source_key)
+                    ),
+                    destination_keys=destination_keys[known[i]],
+                    costs={
+                        column: costs[k, i, known[i]]
+                        for k, column in enumerate(columns)
+                    },
+                    now=now,
+                )
+            connection.executemany(
+                f"INSERT OR REPLACE INTO osrm_costs "
+                f"({SOURCE_COLUMNS}, destination_keys, "
+                f"{', '.join(OSRM_CACHE_COLUMNS.values())}, updated_ats, "
+                f"num_pairs, updated_at, used_at) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        *source_key,
+                        *row_costs.to_row(),
+                        len(row_costs),
+                        float(row_costs.updated_ats.max(initial=0.0)),
+                        now,
+                    )
+                    for source_key, row_costs in merged_costs.items()
+                ],
+            )
+            self._evict(connection, now)
+            connection.commit()
+
+    def clear(self):
+        """Remove every pair and reset the hit counters"""
+
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM osrm_costs")
+            connection.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the table on first use"""
+
+        if self._connection is None:
+            self._connection = sqlite3.connect(
+                self.path, check_same_thread=False
+            )
+            # Drop the table of the former layout, with a row per pair
+            columns = [
+                row[1]
+                for row in self._connection.execute(
+                    "PRAGMA table_info(osrm_costs)"
+                )
+            ]
+            if columns and "destination_keys" not in columns:
+                self._connection.execute("DROP TABLE osrm_costs")
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS osrm_costs ("
+                f"source_lat INTEGER NOT NULL, "
+                f"source_lng INTEGER NOT NULL, "
+                f"destination_keys BLOB NOT NULL, "
+                f"distance BLOB NOT NULL, "
+                f"duration BLOB NOT NULL, "
+                f"updated_ats BLOB NOT NULL, "
+                f"num_pairs INTEGER NOT NULL, "
+                f"updated_at REAL NOT NULL, "
+                f"used_at REAL NOT NULL, "
+                f"PRIMARY KEY ({SOURCE_COLUMNS})"
+                f") WITHOUT ROWID"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS osrm_costs_used_at "
+                "ON osrm_costs (used_at)"
+            )
+            self._connection.commit()
+
+        return self._connection
+
+    def _round(self, coordinates: np.ndarray) -> np.ndarray:
+        """Integer keys of the (lat, lng) coordinates"""
+
+        return np.rint(coordinates * 10**self.precision).astype(np.int64)
+
+    def _destination_keys(self, destinations: np.ndarray) -> np.ndarray:
+        """Single integer key of each (lat, lng) destination, packing the
+        rounded coordinates in its high and low 32 bits"""
+
+        keys = self._round(destinations).reshape(-1, 2)
+
+        return (keys[:, 0] << 32) | (keys[:, 1] & 0xFFFFFFFF)
+
+    def _read(
+        self,
+        connection: sqlite3.Connection,
+        source_keys: set,
+    ) -> Dict[Tuple[int, int], SourceCosts]:
+        """Cached costs of the sources found in the cache"""
+
+        source_costs: Dict[Tuple[int, int], SourceCosts] = {}
+        for source_key in source_keys:
+            row = connection.execute(
+                f"SELECT destination_keys, "
+                f"{', '.join(OSRM_CACHE_COLUMNS.values())}, updated_ats "
+                f"FROM osrm_costs WHERE source_lat = ? AND source_lng = ?",
+                source_key,
+            ).fetchone()
+            if row is not None:
+                source_costs[source_key] = SourceCosts.from_row(row)
+
+        return source_costs
+
+    def _merge(
+        self,
+        row_costs: Optional[SourceCosts],
+        destination_keys: np.ndarray,
+        costs: Dict[str, np.ndarray],
+        now: float,
+    ) -> SourceCosts:
+        """Costs of a source with the new ones stored, replacing the costs
+        of their columns, and without the expired ones"""
+
+        if row_costs is None:
+            row_costs = SourceCosts.empty()
+        row_costs = row_costs.select(
+            row_costs.updated_ats >= now - self.ttl_seconds
+        )
+
+        merged_costs = SourceCosts.empty(
+            np.union1d(row_costs.destination_keys, destination_keys)
+        )
+        for keys, key_costs, updated_ats in (
+            (
+                row_costs.destination_keys,
+                row_costs.costs,
+                row_costs.updated_ats,
+            ),
+            (destination_keys, costs, now),
+        ):
+            positions = merged_costs.find(keys)
+            for column, column_costs in key_costs.items():
+                merged_costs.costs[column][positions] = column_costs
+            merged_costs.updated_ats[positions] = updated_ats
+
+        return merged_costs
+
+    def _evict(self, connection: sqlite3.Connection, now: float):
+        """Delete the expired pairs and the least recently used sources
+        beyond the maximum number of pairs"""
+
+        connection.execute(
+            "DELETE FROM osrm_costs WHERE updated_at < ?",
+            (now - self.ttl_seconds,),
+        )
+        num_entries = connection.execute(
+            "SELECT COALESCE(SUM(num_pairs), 0) FROM osrm_costs"
+        ).fetchone()[0]
+        if num_entries <= self.max_entries:
+            return
+
+        evicted_sources = []
+        for source_lat, source_lng, num_pairs in connection.execute(
+            f"SELECT {SOURCE_COLUMNS}, num_pairs FROM osrm_costs "
+            f"ORDER BY used_at"
+        ).fetchall():
+            if num_entries <= self.max_entries:
+                break
+            evicted_sources.append((source_lat, source_lng))
+            num_entries -= num_pairs
+        connection.executemany(
+            "DELETE FROM osrm_costs WHERE source_lat = ? AND source_lng = ?",
+            evicted_sources,
+        )
+
+
+osrm_cost_cache = OSRMCostCache()
@@ -0,0 +1,75 @@
+from typing import Optional
+
+import numpy as np
+from cost_matrix.spherical_matrix import EARTH_RADIUS_METERS
+
+from config import settings
+
+
+def compute_spherical_costs(
+    sources: np.ndarray,
+    destinations: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+    scale_factor: float = 1.0,
+    dtype: np.dtype = np.dtype(settings.COST_MATRIX_DTYPE),
+    chunk_size: int = settings.SPHERICAL_CHUNK_SIZE,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Compute the spherical distance matrix, in meters, between sources and
+    destinations given as (lat, lng) arrays, ``chunk_size`` destinations
+    at a time.
+
+    Each chunk is multiplied by the destination ``weights``, when given,
+    and by ``scale_factor`` before being written into ``out``, of shape
+    (num_sources, num_destinations), so no temporary array of the full
+    matrix size is ever allocated. Costs written into an integer ``out``
+    are truncated. The computations run in ``dtype``, float32 halving the
+    memory traffic at the price of sub-meter precision. In float64 the
+    distances are those of ``cost_matrix.spherical``.
+
+    Returns
+    -------
+    np.ndarray
+        The ``out`` array, allocated with ``dtype`` when not given.
+    """
+
+    num_sources, num_destinations = sources.shape[0], destinations.shape[0]
+    if out is None:
+        out = np.empty((num_sources, num_destinations), dtype=dtype)
+
+    sources_rad = np.radians(sources).astype(dtype, copy=False)
+    destinations_rad = np.radians(destinations).astype(dtype, copy=False)
+    lambda1 = sources_rad[:, [1]]
+    cos_phi1 = np.cos(sources_rad[:, [0]])
+    sin_phi1 = np.sin(sources_rad[:, [0]])
+    factors = np.full(num_destinations, scale_factor, dtype=dtype)
+    if weights is not None:
+        factors *= weights
+
+    for start in range(0, num_destinations, chunk_size):
+        chunk = slice(start, min(start + chunk_size, num_destinations))
+        lambda2 = destinations_rad[chunk, 1]
+        cos_phi2 = np.cos(destinations_rad[chunk, 0])
+        sin_phi2 = np.sin(destinations_rad[chunk, 0])
+
+        delta_lambda = lambda1 - lambda2
+        cos_delta_lambda = np.cos(delta_lambda)
+        np.sin(delta_lambda, out=delta_lambda)
+        sin_delta_lambda = delta_lambda
+
+        # Same operations as the Vincenty formula of cost_matrix.spherical
+        numerator = np.square(cos_phi2 * sin_delta_lambda)
+        numerator += np.square(
+            cos_phi1 * sin_phi2 - sin_phi1 * cos_phi2 * cos_delta_lambda
+        )
+        np.sqrt(numerator, out=numerator)
+        cos_delta_lambda *= cos_phi1 * cos_phi2
+        cos_delta_lambda += sin_phi1 * sin_phi2
+        delta_sigma = np.arctan2(numerator, cos_delta_lambda, out=numerator)
+
+        delta_sigma *= EARTH_RADIUS_METERS
+        delta_sigma *= factors[chunk]
+        out[:, chunk] = delta_sigma
+
+    return out
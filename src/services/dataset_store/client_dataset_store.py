@@ -0,0 +1,177 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+from config import settings
+from src.models import ClientBatch, ClientDatasetInfo
+from src.services import ClientAggregation, aggregate_colocated_clients
+
+DATASET_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+# Arrays of a dataset, stored as one .npy file each
+DATASET_ARRAYS = (
+    "ids",
+    "lats",
+    "lngs",
+    "demands",
+    "client_locations",
+    "location_clients",
+)
+
+
+class DatasetNotFoundError(KeyError):
+    """The client dataset was never stored or was removed"""
+
+
+class ClientDataset(NamedTuple):
+    """
+    Client set stored once and referenced by the assignment requests.
+
+    Attributes
+    ----------
+    dataset_id
+        Identifier of the dataset, derived from its clients.
+    clients
+        Clients of the dataset, with their coordinates and demands
+        memory-mapped from the dataset files.
+    aggregation
+        Clients grouped by identical coordinates, computed on upload.
+    """
+
+    dataset_id: str
+    clients: ClientBatch
+    aggregation: ClientAggregation
+
+    @property
+    def info(self) -> ClientDatasetInfo:
+        return ClientDatasetInfo(
+            dataset_id=self.dataset_id,
+            num_clients=len(self.clients),
+            num_locations=len(self.aggregation.locations),
+            total_demand=float(self.clients.demands.sum()),
+        )
+
+
+class ClientDatasetStore:
+    """
+    Client datasets stored on disk, in a folder per dataset holding one
+    NumPy ``.npy`` file per array.
+
+    The clients are validated once, on upload, and stored with their
+    grouping by identical coordinates, which the solver would otherwise
+    compute on every request. Numeric arrays are memory-mapped when a
+    dataset is opened, so the datasets share the page cache instead of
+    being copied into each process, and the most recently used datasets
+    are kept open, up to ``max_open``.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.CLIENT_DATASET_PATH,
+        max_open: int = settings.CLIENT_DATASET_CACHE_SIZE,
+    ):
+        self.path = path
+        self.max_open = max_open
+        self._datasets: OrderedDict[str, ClientDataset] = OrderedDict()
+
+    def add(self, clients: ClientBatch) -> ClientDataset:
+        """Store the clients, unless a dataset with the same clients is
+        already stored, and return their dataset"""
+
+        ids = clients.ids.astype(str)
+        digest = hashlib.sha256("\0".join(ids.tolist()).encode())
+        for column in (clients.lats, clients.lngs, clients.demands):
+            digest.update(np.ascontiguousarray(column).tobytes())
+        dataset_id = digest.hexdigest()[:32]
+
+        dataset_path = os.path.join(self.path, dataset_id)
+        if not os.path.isdir(dataset_path):
+            aggregation = aggregate_colocated_clients(clients)
+            _, location_clients = np.unique(
+                aggregation.client_locations, return_index=True
+            )
+            arrays = {
+                "ids": ids,
+                "lats": clients.lats,
+                "lngs": clients.lngs,
+                "demands": clients.demands,
+                "client_locations": aggregation.client_locations,
+                "location_clients": location_clients,
+            }
+
+            # Write to a temporary folder renamed at once, so that a
+            # dataset is never read half written
+            os.makedirs(self.path, exist_ok=True)
+            temporary_path = tempfile.mkdtemp(dir=self.path)
+            for name, array in arrays.items():
+                np.save(os.path.join(temporary_path, f"{name}.npy"), array)
+            try:
+                os.rename(temporary_path, dataset_path)
+            except OSError:
+                # Stored meanwhile by a concurrent upload
+                shutil.rmtree(temporary_path)
+
+        return self.get(dataset_id)
+
+    def get(self, dataset_id: str) -> ClientDataset:
+        """Dataset with the identifier, raising DatasetNotFoundError when it
+        was never stored or was removed"""
+
+        if dataset_id in self._datasets:
+            self._datasets.move_to_end(dataset_id)
+            return self._datasets[dataset_id]
+
+        dataset_path = os.path.join(self.path, dataset_id)
+        if not (
+            DATASET_ID_PATTERN.fullmatch(dataset_id)
+            and os.path.isdir(dataset_path)
+        ):
+            raise DatasetNotFoundError(dataset_id)
+
+        arrays = {
+            name: np.load(
+                os.path.join(dataset_path, f"{name}.npy"), mmap_mode="r"
+            )
+            for name in DATASET_ARRAYS
+        }
+        clients = ClientBatch(
+            ids=arrays["ids"],
+            lats=arrays["lats"],
+            lngs=arrays["lngs"],
+            demands=arrays["demands"],
+        )
+        location_clients = arrays["location_clients"]
+        client_dataset = ClientDataset(
+            dataset_id=dataset_id,
+            clients=clients,
+            aggregation=ClientAggregation(
+                locations=clients[location_clients].with_demands(
+                    np.ones(location_clients.size)
+                ),
+                client_locations=np.asarray(arrays["client_locations"]),
+            ),
+        )
+
+        self._datasets[dataset_id] = client_dataset
+        while len(self._datasets) > self.max_open:
+            self._datasets.popitem(last=False)
+
+        return client_dataset
+
+    def remove(self, dataset_id: str):
+        """Remove the dataset with the identifier, raising
+        DatasetNotFoundError when it was never stored or was already
+        removed"""
+
+        self.get(dataset_id)
+        del self._datasets[dataset_id]
+        shutil.rmtree(os.path.join(self.path, dataset_id))
+
+
+client_dataset_store = ClientDatasetStore()
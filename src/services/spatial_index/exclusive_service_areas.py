@@ -0,0 +1,115 @@
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import shapely
+
+from src.models import Client, ClientBatch, Facility
+
+MAX_REPORTED_COORDINATES = 10
+
+
+def locate_clients_in_exclusive_areas(
+    clients: Iterable[Client], facilities: List[Facility]
+) -> np.ndarray:
+    """
+    Locate the clients inside the facilities exclusive service areas.
+
+    The polygons of all exclusive service areas are indexed in a single
+    STRtree, which is queried once with all client locations, so each
+    client is only tested against the polygons whose bounding box holds it.
+
+    Returns
+    -------
+    np.ndarray
+        Array with one entry per client holding the index of the facility
+        whose exclusive service area contains the client, or -1 when the
+        client is outside every exclusive service area.
+
+    Raises
+    ------
+    ValueError
+        If some clients are inside the exclusive service areas of more than
+        one facility. All conflicting clients are reported at once.
+    """
+
+    client_batch = ClientBatch.from_clients(clients)
+    client_facilities = np.full(len(client_batch), -1, dtype=np.int64)
+
+    polygons = []
+    polygon_facilities = []
+    for i, facility in enumerate(facilities):
+        for polygon in facility.exclusive_service_area.geoms:
+            polygons.append(polygon)
+            polygon_facilities.append(i)
+
+    if not polygons or not len(client_batch):
+        return client_facilities
+
+    lats = client_batch.lats
+    lngs = client_batch.lngs
+    tree = shapely.STRtree(polygons)
+    client_indices, polygon_indices = tree.query(
+        shapely.points(lngs, lats), predicate="intersects"
+    )
+
+    # A client may be inside several polygons of the same facility
+    pairs = np.unique(
+        np.column_stack(
+            (client_indices, np.array(polygon_facilities)[polygon_indices])
+        ),
+        axis=0,
+    )
+    located_clients, counts = np.unique(pairs[:, 0], return_counts=True)
+    conflicting_clients = located_clients[counts > 1]
+    if conflicting_clients.size:
+        raise ValueError(
+            _conflicts_message(
+                pairs=pairs[np.isin(pairs[:, 0], conflicting_clients)],
+                lats=lats,
+                lngs=lngs,
+                facilities=facilities,
+            )
+        )
+
+    client_facilities[pairs[:, 0]] = pairs[:, 1]
+
+    return client_facilities
+
+
+def _conflicts_message(
+    pairs: np.ndarray,
+    lats: np.ndarray,
+    lngs: np.ndarray,
+    facilities: List[Facility],
+) -> str:
+    """Describe every intersection of exclusive service areas holding
+    clients, listing a few coordinates of each one"""
+
+    # Pairs are sorted by client, so each client is a contiguous block
+    conflicting_clients, starts = np.unique(pairs[:, 0], return_index=True)
+    conflicts: Dict[Tuple[int, ...], List[int]] = {}
+    for j, client_facilities in zip(
+        conflicting_clients, np.split(pairs[:, 1], starts[1:])
+    ):
+        conflicts.setdefault(tuple(client_facilities), []).append(j)
+
+    descriptions = []
+    for facility_indices, client_indices in conflicts.items():
+        intersecting_facilities = [
+            facilities[i].name for i in facility_indices
+        ]
+        coordinates = [
+            (float(lats[j]), float(lngs[j]))
+            for j in client_indices[:MAX_REPORTED_COORDINATES]
+        ]
+        remaining = len(client_indices) - len(coordinates)
+        descriptions.append(
+            "There is an intersection in the exclusive service areas "
+            f"of the following facilities: {intersecting_facilities}. "
+            "The following coordinates belongs to this intersection: "
+            + ", ".join(f"{coordinate}" for coordinate in coordinates)
+            + (f" and {remaining} more" if remaining else "")
+            + "."
+        )
+
+    return "Impossible solve the problem! " + " ".join(descriptions)
@@ -1,4 +1,11 @@
+import importlib
+import io
+import json
+
+import humps
+import numpy as np
 import pytest
+import shapely
 from fastapi import status
 from fastapi.testclient import TestClient
 
@@ -7,6 +14,8 @@ from main import app
 client = TestClient(app)
 
 URL = "v1/solve-assignment"
+RESOLVE_URL = "v1/resolve-assignment"
+ASSIGNMENT_RESPONSE_FILE = "tests/models/data/response.json"
 
 
 @pytest.mark.parametrize(
@@ -45,6 +54,179 @@ def test_solve_assignment(assignment_request_data):
     response = client.post(url=URL, json=assignment_request_data)
 
     assert response.status_code == status.HTTP_200_OK
+    assigned_facility = response.json()["assignedFacilities"][0]
+    assert assigned_facility["serviceArea"]["type"] == "MultiPolygon"
+    assert all(
+        isinstance(client_id, str)
+        for client_id in assigned_facility["assignedClients"]
+    )
+
+
+def _split_service_areas(solution_text):
+    """
+    Solution parsed with floats as strings, for 1085 and 1085.0 to differ,
+    without the service areas of the assigned facilities and their
+    expected TSP route distances, and those parsed as geometries and
+    floats.
+    """
+
+    solution = json.loads(solution_text, parse_float=str)
+    solution.pop("solutionId", None)
+    for assigned_facility in solution["assignedFacilities"]:
+        del assigned_facility["serviceArea"]
+        del assigned_facility["expectedOptimalTspRouteDistance"]
+
+    service_areas = [
+        (
+            shapely.geometry.shape(assigned_facility["serviceArea"]),
+            assigned_facility["expectedOptimalTspRouteDistance"],
+        )
+        for assigned_facility in json.loads(solution_text)[
+            "assignedFacilities"
+        ]
+    ]
+
+    return solution, service_areas
+
+
+def test_solve_assignment_golden_response(assignment_request_data):
+    """The response matches the recorded one, number types included, so
+    that whole demands stay integers. The service areas, which depend on
+    the floating point operations of the geometry library, are compared
+    with a tolerance"""
+
+    response = client.post(url=URL, json=assignment_request_data)
+
+    solution, service_areas = _split_service_areas(response.text)
+    with open(ASSIGNMENT_RESPONSE_FILE) as file:
+        expected_solution, expected_service_areas = _split_service_areas(
+            file.read()
+        )
+
+    assert solution == expected_solution
+    assert len(service_areas) == len(expected_service_areas)
+    for (service_area, route_distance), (
+        expected_service_area,
+        expected_route_distance,
+    ) in zip(service_areas, expected_service_areas):
+        assert shapely.equals_exact(
+            service_area, expected_service_area, tolerance=1e-9
+        )
+        assert route_distance == pytest.approx(expected_route_distance, 1e-6)
+
+
+def test_solve_assignment_snake_case_request(assignment_request_data):
+
+    response = client.post(
+        url=URL, json=humps.decamelize(assignment_request_data)
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "objectiveValue" in response.json()
+
+
+def _client_columns(clients):
+    return {
+        name: [client[name] for client in clients]
+        for name in ("id", "lat", "lng", "demand")
+    }
+
+
+@pytest.mark.parametrize("clients_format", ["columns", "csv"])
+def test_solve_assignment_columnar_clients(
+    assignment_request_data, clients_format
+):
+    columns = _client_columns(assignment_request_data["clients"])
+    columnar_clients = (
+        columns
+        if clients_format == "columns"
+        else "id,lat,lng,demand\n"
+        + "\n".join(",".join(map(str, row)) for row in zip(*columns.values()))
+    )
+
+    solution = client.post(url=URL, json=assignment_request_data).json()
+    response = client.post(
+        url=URL, json={**assignment_request_data, "clients": columnar_clients}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["objectiveValue"] == solution["objectiveValue"]
+
+
+@pytest.mark.parametrize("clients_format", ["rows", "columns"])
+def test_solve_assignment_nan_coordinates(
+    assignment_request_data, clients_format
+):
+    """A NaN coordinate is rejected as a bad request in both formats,
+    instead of the client being dropped"""
+
+    clients = assignment_request_data["clients"]
+    clients[0]["lat"] = float("nan")
+    request_data = {
+        **assignment_request_data,
+        "clients": (
+            clients if clients_format == "rows" else _client_columns(clients)
+        ),
+    }
+
+    # NaN is not valid JSON, hence not sent by the json argument
+    response = client.post(
+        url=URL,
+        content=json.dumps(request_data),
+        headers={"content-type": "application/json"},
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"]["fields"][0]["input"] == "nan"
+
+
+def test_solve_assignment_npz_bundle(assignment_request_data):
+    columns = _client_columns(assignment_request_data["clients"])
+    request_fields = {
+        key: value
+        for key, value in assignment_request_data.items()
+        if key != "clients"
+    }
+    file = io.BytesIO()
+    np.savez(
+        file,
+        request=np.array(json.dumps(request_fields)),
+        **{name: np.array(column) for name, column in columns.items()},
+    )
+
+    response = client.post(
+        url=URL,
+        content=file.getvalue(),
+        headers={
+            "content-type": "application/x-npz",
+            "accept": "application/x-npz",
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-npz"
+    with np.load(io.BytesIO(response.content)) as bundle:
+        solution = json.loads(bundle["solution"].item())
+        assert sorted(bundle["client_id"].tolist()) == sorted(columns["id"])
+        assert bundle["client_facility"].max() < bundle["facility_id"].size
+    assert solution["solutionStatus"] == 3
+    assert "assignedClients" not in solution["assignedFacilities"][0]
+
+
+@pytest.mark.parametrize(
+    "content, content_type, status_code",
+    [
+        (b"not a bundle", "application/x-npz", status.HTTP_400_BAD_REQUEST),
+        (b"id,lat,lng", "text/csv", status.HTTP_415_UNSUPPORTED_MEDIA_TYPE),
+    ],
+)
+def test_solve_assignment_invalid_payload(content, content_type, status_code):
+
+    response = client.post(
+        url=URL, content=content, headers={"content-type": content_type}
+    )
+
+    assert response.status_code == status_code
 
 
 def test_solve_assignment_infeasible(assignment_request_data):
@@ -68,3 +250,86 @@ def test_solve_assignment_infeasible(assignment_request_data):
 
     assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
     assert "No optimal solution found" in response.text
+
+
+def test_solve_assignment_solver_key_error(
+    monkeypatch, assignment_request_data
+):
+    """A KeyError raised by the solver is not reported as a missing
+    client dataset"""
+
+    def solve_facility_assignment(assignment_request):
+        raise KeyError("bug")
+
+    monkeypatch.setattr(
+        importlib.import_module("src.api.v1.assignment_router"),
+        "solve_facility_assignment",
+        solve_facility_assignment,
+    )
+
+    with pytest.raises(KeyError):
+        client.post(url=URL, json=assignment_request_data)
+
+
+def test_resolve_assignment(assignment_request_data):
+
+    solution = client.post(url=URL, json=assignment_request_data).json()
+    resolve_request_data = {
+        "solutionId": solution["solutionId"],
+        "removedClientIds": [assignment_request_data["clients"][0]["id"]],
+    }
+
+    response = client.post(url=RESOLVE_URL, json=resolve_request_data)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["solutionId"] != solution["solutionId"]
+
+
+@pytest.mark.parametrize(
+    "resolve_request_data, status_code",
+    [
+        ({"removedClientIds": []}, status.HTTP_400_BAD_REQUEST),
+        ({"solutionId": "unknown"}, status.HTTP_404_NOT_FOUND),
+    ],
+)
+def test_resolve_assignment_errors(resolve_request_data, status_code):
+
+    response = client.post(url=RESOLVE_URL, json=resolve_request_data)
+
+    assert response.status_code == status_code
+
+
+def test_resolve_assignment_solver_errors(
+    monkeypatch, assignment_request_data
+):
+    """Errors raised by the solver are not reported as client errors"""
+
+    solution = client.post(url=URL, json=assignment_request_data).json()
+
+    def resolve_facility_assignment(resolve_request):
+        raise ValueError("bug")
+
+    monkeypatch.setattr(
+        importlib.import_module("src.api.v1.assignment_router"),
+        "resolve_facility_assignment",
+        resolve_facility_assignment,
+    )
+
+    with pytest.raises(ValueError):
+        client.post(
+            url=RESOLVE_URL, json={"solutionId": solution["solutionId"]}
+        )
+
+
+def test_resolve_assignment_unknown_client(assignment_request_data):
+
+    solution = client.post(url=URL, json=assignment_request_data).json()
+    resolve_request_data = {
+        "solutionId": solution["solutionId"],
+        "removedClientIds": ["unknown"],
+    }
+
+    response = client.post(url=RESOLVE_URL, json=resolve_request_data)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "unknown" in response.text
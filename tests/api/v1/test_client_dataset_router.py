@@ -0,0 +1,126 @@
+import io
+
+import numpy as np
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from main import app
+
+client = TestClient(app)
+
+URL = "v1/client-datasets"
+SOLVE_URL = "v1/solve-assignment"
+RESOLVE_URL = "v1/resolve-assignment"
+
+
+def _dataset_request(assignment_request_data):
+    return {
+        key: value
+        for key, value in assignment_request_data.items()
+        if key != "clients"
+    }
+
+
+def test_upload_client_dataset(assignment_request_data):
+    clients = assignment_request_data["clients"]
+
+    response = client.post(url=URL, json={"clients": clients})
+
+    assert response.status_code == status.HTTP_201_CREATED
+    dataset = response.json()
+    assert dataset["numClients"] == len(clients)
+    assert client.get(f"{URL}/{dataset['datasetId']}").json() == dataset
+
+
+def test_upload_client_dataset_npz_bundle(assignment_request_data):
+    clients = assignment_request_data["clients"]
+    file = io.BytesIO()
+    np.savez(
+        file,
+        **{
+            name: np.array([client[name] for client in clients])
+            for name in ("id", "lat", "lng", "demand")
+        },
+    )
+
+    response = client.post(
+        url=URL,
+        content=file.getvalue(),
+        headers={"content-type": "application/x-npz"},
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert (
+        response.json()["datasetId"]
+        == client.post(url=URL, json={"clients": clients}).json()["datasetId"]
+    )
+
+
+def test_solve_assignment_client_dataset(assignment_request_data):
+    dataset_id = client.post(
+        url=URL, json={"clients": assignment_request_data["clients"]}
+    ).json()["datasetId"]
+    solution = client.post(url=SOLVE_URL, json=assignment_request_data).json()
+
+    response = client.post(
+        url=SOLVE_URL,
+        json={
+            **_dataset_request(assignment_request_data),
+            "datasetId": dataset_id,
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["objectiveValue"] == solution["objectiveValue"]
+    assert (
+        response.json()["clientReductionRatio"]
+        == solution["clientReductionRatio"]
+    )
+
+    resolve_response = client.post(
+        url=RESOLVE_URL,
+        json={
+            "solutionId": response.json()["solutionId"],
+            "removedClientIds": [assignment_request_data["clients"][0]["id"]],
+        },
+    )
+
+    assert resolve_response.status_code == status.HTTP_200_OK
+
+
+def test_delete_client_dataset(assignment_request_data):
+    dataset_id = client.post(
+        url=URL, json={"clients": assignment_request_data["clients"]}
+    ).json()["datasetId"]
+
+    response = client.delete(f"{URL}/{dataset_id}")
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert (
+        client.post(
+            url=SOLVE_URL,
+            json={
+                **_dataset_request(assignment_request_data),
+                "datasetId": dataset_id,
+            },
+        ).status_code
+        == status.HTTP_404_NOT_FOUND
+    )
+
+
+@pytest.mark.parametrize(
+    "method, url, status_code",
+    [
+        ("post", URL, status.HTTP_400_BAD_REQUEST),
+        ("get", f"{URL}/unknown", status.HTTP_404_NOT_FOUND),
+        ("delete", f"{URL}/unknown", status.HTTP_404_NOT_FOUND),
+    ],
+)
+def test_client_dataset_errors(method, url, status_code):
+
+    response = client.request(
+        method, url, json={"clients": []} if method == "post" else None
+    )
+
+    assert response.status_code == status_code
@@ -1,6 +1,8 @@
+import importlib
 import json
 
 import humps
+import numpy as np
 import pytest
 
 from src.models import (
@@ -11,7 +13,13 @@ from src.models import (
     CostProblem,
     Facility,
 )
-from src.services import compute_cost_matrix
+from src.services import (
+    ClientDatasetStore,
+    CostMatrixStore,
+    OSRMCostCache,
+    compute_cost_matrix,
+)
+from tests.fake_osrm_server import FakeOSRMServer
 
 ASSIGNMENT_REQUEST_FILE = "tests/models/data/request.json"
 CLIENTS_FILE = "tests/models/data/clients.json"
@@ -145,3 +153,93 @@ def assignment_problem(request, facilities, clients):
         cost_matrix=cost_matrix,
         algorithm=request.param,
     )
+
+
+@pytest.fixture
+def capacitated_assignment_problem():
+    """Clients spread over a square with facilities whose capacities
+    force many clients away from their nearest facility"""
+
+    rng = np.random.default_rng(2024)
+    clients = [
+        Client(id=str(j), lat=lat, lng=lng, demand=demand)
+        for j, (lat, lng, demand) in enumerate(
+            zip(
+                rng.uniform(0, 1, 400),
+                rng.uniform(0, 1, 400),
+                rng.integers(1, 5, 400),
+            )
+        )
+    ]
+    total_demand = sum(client.demand for client in clients)
+    facilities = [
+        Facility(
+            id=str(i),
+            name=f"FC{i}",
+            lat=lat,
+            lng=lng,
+            min_demand=total_demand // 20 if i == 0 else 0,
+            max_demand=total_demand // 8 + 1,
+        )
+        for i, (lat, lng) in enumerate(
+            zip(rng.uniform(0, 1, 10), rng.uniform(0, 1, 10))
+        )
+    ]
+    cost_problem = CostProblem(clients=clients, facilities=facilities)
+
+    return AssignmentProblem(
+        clients=clients,
+        facilities=facilities,
+        cost_matrix=compute_cost_matrix(cost_problem),
+        algorithm=AlgorithmType.MCF_FORMULATION,
+    )
+
+
+@pytest.fixture(autouse=True)
+def osrm_cost_cache(monkeypatch):
+    """Isolate each test with an in-memory OSRM cost cache"""
+
+    cache = OSRMCostCache(path=":memory:")
+    monkeypatch.setattr(
+        "src.services.cost_calculator.cost_matrix.osrm_cost_cache", cache
+    )
+
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def cost_matrix_store(monkeypatch, tmp_path):
+    """Isolate each test with a cost matrix store in a temporary folder"""
+
+    store = CostMatrixStore(path=str(tmp_path / "cost_matrices"))
+    monkeypatch.setattr(
+        "src.services.assignment_solver.solve_assignment_problem."
+        "cost_matrix_store",
+        store,
+    )
+
+    return store
+
+
+@pytest.fixture(autouse=True)
+def client_dataset_store(monkeypatch, tmp_path):
+    """Isolate each test with a client dataset store in a temporary
+    folder"""
+
+    store = ClientDatasetStore(path=str(tmp_path / "client_datasets"))
+    # The routers are imported by their module names in src.api.v1
+    for module in (
+        "src.services.assignment_solver.solve_assignment_problem",
+        "src.api.v1.client_dataset_router",
+    ):
+        monkeypatch.setattr(
+            importlib.import_module(module), "client_dataset_store", store
+        )
+
+    return store
+
+
+@pytest.fixture
+def fake_osrm_server():
+    with FakeOSRMServer() as server:
+        yield server
@@ -0,0 +1,120 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlsplit
+
+import cost_matrix
+import numpy as np
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    # Accept many concurrent connections without dropping any
+    request_queue_size = 128
+
+
+class FakeOSRMServer:
+    """
+    Local stand-in for the OSRM ``/table`` service, answering with the
+    spherical distances and with durations at 10 meters per second.
+
+    Each request is answered after ``latency_seconds`` and the first
+    ``num_failures`` requests fail with a 503 status.
+
+    Attributes
+    ----------
+    address
+        Server address to send the requests to.
+    requested_paths
+        Path and query of every request received.
+    max_concurrent_requests
+        Largest number of requests served at the same time.
+    num_requested_pairs
+        Number of source and destination pairs of the successful requests.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0, num_failures: int = 0):
+        self.latency_seconds = latency_seconds
+        self.num_failures = num_failures
+        self.requested_paths: List[str] = []
+        self.max_concurrent_requests = 0
+        self.num_requested_pairs = 0
+        self._num_concurrent_requests = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requested_paths.append(self.path)
+                    failed = len(server.requested_paths) <= server.num_failures
+                    server._num_concurrent_requests += 1
+                    server.max_concurrent_requests = max(
+                        server.max_concurrent_requests,
+                        server._num_concurrent_requests,
+                    )
+
+                time.sleep(server.latency_seconds)
+                with server._lock:
+                    server._num_concurrent_requests -= 1
+
+                if failed:
+                    self.send_error(503)
+                    return
+
+                body = json.dumps(server.table(self.path)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._http_server = _HTTPServer(("127.0.0.1", 0), Handler)
+        self.address = f"http://127.0.0.1:{self._http_server.server_port}"
+        self._thread = threading.Thread(
+            target=self._http_server.serve_forever, daemon=True
+        )
+
+    def table(self, path: str) -> dict:
+        url = urlsplit(path)
+        locations = np.array(
+            [
+                [float(value) for value in location.split(",")][::-1]
+                for location in url.path.split("/")[-1].split(";")
+            ]
+        )
+        query = parse_qs(url.query)
+        all_indices = ";".join(str(k) for k in range(len(locations)))
+        sources = [
+            int(k) for k in query.get("sources", [all_indices])[0].split(";")
+        ]
+        destinations = [
+            int(k)
+            for k in query.get("destinations", [all_indices])[0].split(";")
+        ]
+
+        distances = cost_matrix.spherical(
+            locations[sources], locations[destinations]
+        )
+        with self._lock:
+            self.num_requested_pairs += distances.size
+        table = {"code": "Ok"}
+        annotations = query["annotations"][0].split(",")
+        if "distance" in annotations:
+            table["distances"] = distances.tolist()
+        if "duration" in annotations:
+            table["durations"] = (distances / 10).tolist()
+
+        return table
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._http_server.shutdown()
+        self._http_server.server_close()
@@ -1,6 +1,10 @@
+import json
+
 import humps
+import pytest
+from pydantic import ValidationError
 
-from src.models import AssignmentRequest
+from src.models import AssignmentRequest, ClientBatch, ServiceAreaType
 
 
 def test_assignment_request_model(assignment_request_data):
@@ -8,3 +12,73 @@ def test_assignment_request_model(assignment_request_data):
     assignment_request = AssignmentRequest(**request_data)
 
     assert isinstance(assignment_request, AssignmentRequest)
+
+
+def test_assignment_request_from_camel_case_json(assignment_request_data):
+    assignment_request = AssignmentRequest.model_validate_json(
+        json.dumps(assignment_request_data)
+    )
+
+    assert isinstance(assignment_request.clients, ClientBatch)
+    assert assignment_request == AssignmentRequest(
+        **humps.decamelize(assignment_request_data)
+    )
+
+
+def test_assignment_request_service_area_type(assignment_request_data):
+    assignment_request = AssignmentRequest.model_validate_json(
+        json.dumps(assignment_request_data)
+    )
+    assert assignment_request.service_area_type == ServiceAreaType.ALPHA_SHAPE
+
+    assignment_request_data["serviceAreaType"] = 2
+    assignment_request = AssignmentRequest.model_validate_json(
+        json.dumps(assignment_request_data)
+    )
+    assert assignment_request.service_area_type == ServiceAreaType.VORONOI
+
+    assignment_request_data["serviceAreaType"] = 4
+    with pytest.raises(ValidationError):
+        AssignmentRequest.model_validate_json(
+            json.dumps(assignment_request_data)
+        )
+
+
+def test_assignment_request_invalid_client(assignment_request_data):
+    assignment_request_data["clients"][3]["demand"] = -1
+
+    with pytest.raises(ValidationError) as error:
+        AssignmentRequest.model_validate_json(
+            json.dumps(assignment_request_data)
+        )
+
+    assert error.value.errors()[0]["loc"] == ("clients", 3, "demand")
+
+
+def test_assignment_request_dataset_id(assignment_request_data):
+    del assignment_request_data["clients"]
+    assignment_request_data["datasetId"] = "0" * 32
+
+    assignment_request = AssignmentRequest.model_validate_json(
+        json.dumps(assignment_request_data)
+    )
+
+    assert assignment_request.clients is None
+    assert assignment_request.dataset_id == "0" * 32
+
+
+@pytest.mark.parametrize("dataset_id", [None, "0" * 32])
+def test_assignment_request_clients_source(
+    assignment_request_data, dataset_id
+):
+    """Exactly one of the clients and the dataset id is given"""
+
+    if dataset_id is None:
+        del assignment_request_data["clients"]
+    else:
+        assignment_request_data["datasetId"] = dataset_id
+
+    with pytest.raises(ValidationError):
+        AssignmentRequest.model_validate_json(
+            json.dumps(assignment_request_data)
+        )
@@ -1,6 +1,10 @@
 from math import isclose
 
-from src.models import Client, scale_clients_demands
+import numpy as np
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from src.models import Client, ClientBatch, scale_clients_demands
 
 
 def test_client_model(clients_data):
@@ -19,3 +23,102 @@ def test_scale_clients_demands(clients_data):
     new_total_demand = sum(client.demand for client in scaled_clients)
 
     assert isclose(new_total_demand, expected_new_total_demand)
+
+
+def test_client_batch(clients):
+    client_batch = ClientBatch.from_clients(clients)
+
+    assert len(client_batch) == len(clients)
+    assert client_batch == clients
+    assert client_batch[3] == clients[3]
+    assert client_batch.to_clients() == clients
+    assert ClientBatch.from_clients(client_batch) is client_batch
+    np.testing.assert_array_equal(
+        client_batch.coordinates,
+        [(client.lat, client.lng) for client in clients],
+    )
+
+
+def test_client_batch_selection(clients):
+    client_batch = ClientBatch.from_clients(clients)
+    mask = np.arange(len(clients)) % 2 == 0
+
+    assert client_batch[mask] == clients[::2]
+    assert client_batch[np.array([2, 0])] == [clients[2], clients[0]]
+    assert client_batch[1:3] == clients[1:3]
+
+
+def test_client_batch_from_dictionaries(clients_data):
+    client_batch = ClientBatch.from_clients(clients_data)
+
+    assert client_batch == [Client(**data) for data in clients_data]
+
+
+def test_scale_client_batch_demands(clients):
+    client_batch = ClientBatch.from_clients(clients)
+    scaled_batch = client_batch.scale_demands(3 * len(clients))
+
+    assert np.shares_memory(scaled_batch.lats, client_batch.lats)
+    assert scaled_batch == scale_clients_demands(clients, 3 * len(clients))
+
+
+def test_client_batch_from_columns_and_csv(clients):
+    client_batch = ClientBatch.from_clients(clients)
+    columns = {
+        "id": client_batch.ids,
+        "lat": client_batch.lats,
+        "lng": client_batch.lngs,
+        "demand": client_batch.demands,
+    }
+    csv_text = "lng,id,demand,lat\n" + "\n".join(
+        f"{client.lng!r},{client.id},{client.demand!r},{client.lat!r}"
+        for client in clients
+    )
+
+    assert ClientBatch.from_columns(columns) == client_batch
+    assert ClientBatch.from_csv(csv_text) == client_batch
+
+
+@pytest.mark.parametrize(
+    "columns",
+    [
+        {"id": ["1"], "lat": [0.0]},
+        {"id": ["1", "2"], "lat": [0.0], "lng": [0.0]},
+        {"id": ["1"], "lat": [np.nan], "lng": [0.0]},
+        {"id": ["1"], "lat": [0.0], "lng": [0.0], "demand": [0.0]},
+    ],
+)
+def test_client_batch_invalid_columns(columns):
+    with pytest.raises(ValueError):
+        ClientBatch.from_columns(columns)
+
+
+@pytest.mark.parametrize("coordinate", [np.nan, np.inf])
+@pytest.mark.parametrize(
+    "clients_format", ["clients", "records", "columns", "csv"]
+)
+def test_client_batch_non_finite_coordinates(coordinate, clients_format):
+    """Non-finite coordinates are rejected in every client format"""
+
+    records = [
+        {"id": "0", "lat": 0.0, "lng": 0.0},
+        {"id": "1", "lat": coordinate, "lng": 0.0},
+    ]
+    value = {
+        "records": records,
+        "columns": {
+            name: [record[name] for record in records]
+            for name in ("id", "lat", "lng")
+        },
+        "csv": "id,lat,lng\n"
+        + "\n".join(
+            f"{record['id']},{record['lat']},{record['lng']}"
+            for record in records
+        ),
+    }.get(clients_format)
+
+    with pytest.raises(ValidationError):
+        if clients_format == "clients":
+            ClientBatch.from_clients(records)
+        else:
+            TypeAdapter(ClientBatch).validate_python(value)
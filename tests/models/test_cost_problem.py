@@ -11,6 +11,7 @@ from src.models import CostProblem, CostType, ObjectiveType
         CostType.SPHERICAL_DISTANCE,
         CostType.OSRM_DISTANCE,
         CostType.OSRM_DURATION,
+        CostType.OSRM_BLENDED_COST,
     ],
 )
 def test_cost_problem_model(clients, facilities, cost_type):
@@ -24,6 +25,8 @@ def test_cost_problem_model(clients, facilities, cost_type):
     assert cost_problem.cost_type == cost_type
     assert cost_problem.osrm_batch_size == settings.OSRM_BATCH_SIZE
     assert cost_problem.osrm_server_address == settings.OSRM_SERVER_ADDRESS
+    assert cost_problem.distance_weight == settings.OSRM_BLEND_DISTANCE_WEIGHT
+    assert cost_problem.duration_weight == settings.OSRM_BLEND_DURATION_WEIGHT
 
 
 @pytest.mark.parametrize(
@@ -41,6 +44,10 @@ def test_cost_problem_model(clients, facilities, cost_type):
             ObjectiveType.MIN_TRAVEL_DURATION,
             CostType.OSRM_DURATION,
         ),
+        (
+            ObjectiveType.MIN_BLENDED_TRAVEL_COST,
+            CostType.OSRM_BLENDED_COST,
+        ),
     ],
 )
 def test_cost_problem_type_validation(
@@ -0,0 +1,38 @@
+import pytest
+from pydantic import ValidationError
+
+from src.models import FacilityDemandUpdate, ResolveRequest
+
+
+def test_resolve_request_model(clients):
+
+    resolve_request = ResolveRequest(
+        solution_id="1",
+        added_clients=clients[:2],
+        removed_client_ids=[clients[2].id],
+        facility_updates=[{"id": "FC1", "max_demand": 10}],
+    )
+
+    assert resolve_request.total_demand is None
+    assert resolve_request.changed_clients == []
+    assert resolve_request.facility_updates == [
+        FacilityDemandUpdate(id="FC1", max_demand=10)
+    ]
+
+
+@pytest.mark.parametrize(
+    "invalid_data",
+    [
+        {},
+        {"solution_id": "1", "total_demand": 0},
+        {"solution_id": "1", "facility_updates": [{"min_demand": 1}]},
+        {
+            "solution_id": "1",
+            "facility_updates": [{"id": "FC1", "min_demand": -1}],
+        },
+    ],
+)
+def test_invalid_resolve_request_model(invalid_data):
+
+    with pytest.raises(ValidationError):
+        ResolveRequest(**invalid_data)
@@ -1,8 +1,12 @@
+import cost_matrix
 import numpy as np
 import pytest
 
 from src.models import Client
-from src.services import solve_clients_dispersion_problem
+from src.services import (
+    select_dispersed_points,
+    solve_clients_dispersion_problem,
+)
 
 
 @pytest.fixture
@@ -53,3 +57,61 @@ def test_solve_clients_dispersion_problem(
     locations_array.sort(axis=0)
 
     assert np.array_equal(locations_array, expected_locations_array)
+
+
+def test_select_dispersed_points(repeated_clients):
+    coordinates = np.array(
+        [(client.lat, client.lng) for client in repeated_clients]
+    )
+
+    indices = select_dispersed_points(coordinates, subset_size=4)
+
+    assert np.unique(coordinates[indices], axis=0).shape == (4, 2)
+
+
+def _full_matrix_dispersion(coordinates, subset_size):
+    """Greedy selection over the full distance matrix"""
+
+    distance_matrix = cost_matrix.spherical(coordinates, coordinates)
+    selected_indices = list(
+        np.unravel_index(distance_matrix.argmax(), distance_matrix.shape)
+    )
+    while len(selected_indices) < subset_size:
+        selected_indices.append(
+            distance_matrix[selected_indices].min(axis=0).argmax()
+        )
+
+    return np.array(selected_indices)
+
+
+@pytest.mark.parametrize("decimals", [6, 2])
+@pytest.mark.parametrize("subset_size", [2, 20, 150])
+def test_select_dispersed_points_matches_full_matrix(decimals, subset_size):
+    """The selection is the one of the full distance matrix, ties between
+    co-located points included"""
+
+    rng = np.random.default_rng(2024)
+    coordinates = np.round(
+        np.column_stack(
+            (rng.uniform(-23.0, -22.7, 500), rng.uniform(-43.7, -43.1, 500))
+        ),
+        decimals,
+    )
+
+    np.testing.assert_array_equal(
+        select_dispersed_points(coordinates, subset_size=subset_size),
+        _full_matrix_dispersion(coordinates, subset_size),
+    )
+
+
+def test_select_dispersed_points_on_grid():
+    rng = np.random.default_rng(2024)
+    coordinates = rng.uniform(0, 1, (5_000, 2))
+
+    indices = select_dispersed_points(
+        coordinates, subset_size=50, max_exact_points=400
+    )
+    cells = np.floor(coordinates[indices] * 20)
+
+    assert np.unique(indices).size == 50
+    assert np.unique(cells, axis=0).shape[0] == 50
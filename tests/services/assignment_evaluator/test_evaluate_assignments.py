@@ -1,7 +1,18 @@
 from math import isclose
 
-from src.models import AssignedFacility
-from src.services import evaluate_assigned_facilities
+import numpy as np
+import pytest
+import shapely
+from shapely import MultiPolygon, box
+
+from src.models import AssignedFacility, ServiceAreaType
+from src.services import (
+    evaluate_assigned_facilities,
+    remove_exclusive_area_overlaps,
+)
+from src.services.assignment_evaluator.evaluate_assignments import (
+    _service_area_executors,
+)
 
 
 def test_evaluate_assigned_facilities(
@@ -35,3 +46,138 @@ def test_evaluate_assigned_facilities(
     )
     assert evaluated_facilities[0].service_area.is_empty
     assert isclose(evaluated_facilities[1].service_area.area, 1.0 - 0.125)
+
+
+def test_evaluate_assigned_facilities_in_parallel(
+    capacitated_assignment_problem,
+):
+    """Service areas computed in a process pool, started once and reused
+    by the next evaluations, match the serial ones"""
+
+    clients = capacitated_assignment_problem.clients
+    facilities = capacitated_assignment_problem.facilities
+    client_facilities = np.arange(len(clients)) % len(facilities)
+    assigned_facilities = [
+        AssignedFacility(
+            facility=facility,
+            assigned_clients=clients[client_facilities == i],
+        )
+        for i, facility in enumerate(facilities)
+    ]
+
+    serial_facilities = evaluate_assigned_facilities(
+        assigned_facilities, max_workers=1
+    )
+    executors = []
+    for _ in range(2):
+        parallel_facilities = evaluate_assigned_facilities(
+            assigned_facilities, max_workers=2, parallel_min_clients=0
+        )
+        executors.append(_service_area_executors[2])
+
+    assert executors[0] is executors[1]
+    assert [facility.service_area.wkb for facility in parallel_facilities] == [
+        facility.service_area.wkb for facility in serial_facilities
+    ]
+    assert not any(
+        facility.service_area.is_empty for facility in parallel_facilities
+    )
+
+
+def test_evaluate_assigned_facilities_voronoi(capacitated_assignment_problem):
+    """Voronoi service areas leave no gaps between the facilities, unlike
+    the alpha shapes"""
+
+    clients = capacitated_assignment_problem.clients
+    facilities = capacitated_assignment_problem.facilities
+    client_facilities = np.arange(len(clients)) % len(facilities)
+    assigned_facilities = [
+        AssignedFacility(
+            facility=facility,
+            assigned_clients=clients[client_facilities == i],
+        )
+        for i, facility in enumerate(facilities)
+    ]
+
+    alpha_shape_areas = [
+        facility.service_area
+        for facility in evaluate_assigned_facilities(
+            assigned_facilities, max_workers=1
+        )
+    ]
+    voronoi_facilities = evaluate_assigned_facilities(
+        assigned_facilities, service_area_type=ServiceAreaType.VORONOI
+    )
+    voronoi_areas = [facility.service_area for facility in voronoi_facilities]
+    region = shapely.convex_hull(
+        shapely.multipoints(np.column_stack((clients.lngs, clients.lats)))
+    )
+
+    assert all(isinstance(area, MultiPolygon) for area in voronoi_areas)
+    assert shapely.union_all(voronoi_areas).contains(region)
+    assert shapely.union_all(alpha_shape_areas).area < region.area
+    assert sum(area.area for area in voronoi_areas) == pytest.approx(
+        shapely.union_all(voronoi_areas).area
+    )
+    assert [facility.expected_demand for facility in voronoi_facilities] == [
+        round(sum(facility.assigned_clients.demands))
+        for facility in assigned_facilities
+    ]
+
+
+def test_evaluate_assigned_facilities_hex_grid(
+    capacitated_assignment_problem,
+):
+    """Hexagonal grid service areas are disjoint unions of grid cells
+    covering the clients"""
+
+    clients = capacitated_assignment_problem.clients
+    facilities = capacitated_assignment_problem.facilities
+    client_facilities = (clients.lngs > 0.5).astype(int)
+    assigned_facilities = [
+        AssignedFacility(
+            facility=facility,
+            assigned_clients=clients[client_facilities == i],
+        )
+        for i, facility in enumerate(facilities[:2])
+    ]
+
+    evaluated_facilities = evaluate_assigned_facilities(
+        assigned_facilities, service_area_type=ServiceAreaType.HEX_GRID
+    )
+    first_area, second_area = (
+        facility.service_area for facility in evaluated_facilities
+    )
+
+    assert isinstance(first_area, MultiPolygon)
+    assert first_area.intersection(second_area).area == pytest.approx(0)
+    assert shapely.intersects_xy(
+        shapely.union(first_area, second_area), clients.lngs, clients.lats
+    ).all()
+
+
+def test_remove_exclusive_area_overlaps():
+    """Service areas lose the exclusive areas of the other facilities,
+    and keep their own"""
+
+    service_areas = [
+        MultiPolygon([box(0, 0, 2, 2)]),
+        MultiPolygon([box(1, 1, 3, 3)]),
+        MultiPolygon([box(10, 10, 11, 11)]),
+        MultiPolygon(),
+    ]
+    exclusive_areas = [
+        MultiPolygon([box(0, 0, 0.5, 0.5)]),
+        MultiPolygon([box(1.5, 1.5, 2.5, 2.5), box(0, 1.5, 0.5, 2)]),
+        MultiPolygon(),
+        MultiPolygon([box(10, 10, 10.5, 10.5)]),
+    ]
+
+    new_service_areas = remove_exclusive_area_overlaps(
+        service_areas, exclusive_areas
+    )
+
+    assert [area.area for area in new_service_areas] == pytest.approx(
+        [4 - 0.25 - 0.25, 4.0, 1 - 0.25, 0.0]
+    )
+    assert new_service_areas[1].contains(exclusive_areas[1].geoms[0])
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+import shapely
+
+from src.models import AssignedFacility, ClientBatch, Facility
+from src.services import (
+    build_cell_lookup,
+    hex_cell_polygons,
+    hex_cells,
+    lookup_cell_facilities,
+    majority_cells,
+)
+
+
+@pytest.fixture
+def assigned_facilities():
+    """Two facilities splitting random clients at longitude 0.5, and one
+    without clients"""
+
+    rng = np.random.default_rng(2024)
+    clients = ClientBatch(
+        ids=[str(j) for j in range(500)],
+        lats=rng.uniform(0, 1, 500),
+        lngs=rng.uniform(0, 1, 500),
+    )
+
+    return [
+        AssignedFacility(
+            facility=Facility(id=str(i), name=f"FC{i}", lat=0.5, lng=0.5),
+            assigned_clients=clients[mask],
+        )
+        for i, mask in enumerate(
+            [clients.lngs < 0.5, clients.lngs >= 0.5, np.zeros(500, bool)]
+        )
+    ]
+
+
+def test_hex_cells_contain_their_points():
+    rng = np.random.default_rng(2024)
+    lats = rng.uniform(-60, 60, 10_000)
+    lngs = rng.uniform(-180, 180, 10_000)
+
+    qs, rs = hex_cells(lats, lngs, cell_size=0.3)
+    polygons = hex_cell_polygons(qs, rs, cell_size=0.3)
+
+    assert shapely.intersects_xy(polygons, lngs, lats).all()
+    assert shapely.area(polygons) == pytest.approx(1.5 * np.sqrt(3) * 0.09)
+
+
+def test_hex_cell_polygons_share_vertices():
+    """Neighbouring cells merge as a coverage into a single polygon"""
+
+    qs, rs = np.meshgrid(np.arange(-3, 4), np.arange(-3, 4))
+    polygons = hex_cell_polygons(qs.ravel(), rs.ravel(), cell_size=0.01)
+
+    union = shapely.coverage_union_all(polygons)
+
+    assert union.geom_type == "Polygon"
+    assert union.area == pytest.approx(shapely.area(polygons).sum())
+
+
+def test_majority_cells():
+    """A cell is labelled with the facility assigned most of its demand"""
+
+    assigned_facilities = [
+        AssignedFacility(
+            facility=Facility(id=str(i), name=f"FC{i}", lat=0.0, lng=0.0),
+            assigned_clients=ClientBatch(
+                ids=[f"{i}-{j}" for j in range(len(demands))],
+                lats=np.zeros(len(demands)),
+                lngs=np.zeros(len(demands)),
+                demands=demands,
+            ),
+        )
+        for i, demands in enumerate([[1.0, 1.0], [3.0], [1.0, 1.0, 1.0]])
+    ]
+
+    qs, rs, facilities = majority_cells(assigned_facilities, cell_size=1.0)
+
+    assert qs.tolist() == [0] and rs.tolist() == [0]
+    assert facilities.tolist() == [1]
+
+
+def test_lookup_cell_facilities(assigned_facilities):
+    cell_lookup = build_cell_lookup(
+        assigned_facilities, cell_size=0.01, num_levels=3
+    )
+
+    for assigned_facility in assigned_facilities[:2]:
+        clients = assigned_facility.assigned_clients
+        facility_ids = lookup_cell_facilities(
+            cell_lookup, clients.lats, clients.lngs
+        )
+        # Only the cells crossing the split may be labelled otherwise
+        assert (
+            np.mean(np.array(facility_ids) == assigned_facility.facility.id)
+            > 0.95
+        )
+
+    # Points away from any client fall back to the coarser levels
+    assert lookup_cell_facilities(
+        cell_lookup, np.array([0.5, 5.0]), np.array([-0.03, 5.0])
+    ) == ["0", None]
+    assert "2" not in cell_lookup.cell_facilities.values()
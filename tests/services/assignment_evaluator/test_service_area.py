@@ -1,7 +1,10 @@
 from math import isclose
 
-from src.models import AssignedFacility
-from src.services import compute_service_area
+import numpy as np
+import shapely
+
+from src.models import AssignedFacility, ClientBatch, Facility
+from src.services import compute_service_area, compute_voronoi_service_areas
 
 
 def test_compute_service_area(
@@ -29,3 +32,66 @@ def test_compute_service_area(
         - facility_within_square_center.exclusive_service_area.area,
         1.0,
     )
+
+
+def test_compute_voronoi_service_areas():
+    """The territories of the facilities partition the buffered convex
+    hull of the clients, each one covering its own clients"""
+
+    rng = np.random.default_rng(2024)
+    clients = ClientBatch(
+        ids=[str(j) for j in range(200)],
+        lats=rng.uniform(0, 1, 200),
+        lngs=rng.uniform(0, 1, 200),
+    )
+    client_facilities = (clients.lngs > 0.5) + 2 * (clients.lats > 0.5)
+    assigned_facilities = [
+        AssignedFacility(
+            facility=Facility(id=str(i), name=f"FC{i}", lat=0.5, lng=0.5),
+            assigned_clients=clients[client_facilities == i],
+        )
+        for i in range(5)
+    ]
+
+    service_areas = compute_voronoi_service_areas(
+        assigned_facilities, boundary_buffer=0.01
+    )
+    region = shapely.convex_hull(
+        shapely.multipoints(np.column_stack((clients.lngs, clients.lats)))
+    ).buffer(0.01)
+
+    assert service_areas[4].is_empty
+    assert isclose(shapely.union_all(service_areas).area, region.area)
+    assert isclose(sum(area.area for area in service_areas), region.area)
+    for service_area, assigned_facility in zip(
+        service_areas, assigned_facilities
+    ):
+        assigned_clients = assigned_facility.assigned_clients
+        assert shapely.intersects_xy(
+            service_area, assigned_clients.lngs, assigned_clients.lats
+        ).all()
+
+
+def test_compute_voronoi_service_areas_single_client(
+    facility_within_square_center,
+):
+    """A single client is given the whole region, along with the
+    exclusive service area of its facility"""
+
+    assigned_facility = AssignedFacility(
+        facility=facility_within_square_center,
+        assigned_clients=ClientBatch(ids=["1"], lats=[2.0], lngs=[2.0]),
+    )
+
+    (service_area,) = compute_voronoi_service_areas(
+        [assigned_facility], boundary_buffer=0.1
+    )
+
+    assert service_area.contains(
+        facility_within_square_center.exclusive_service_area
+    )
+    assert isclose(
+        service_area.area,
+        facility_within_square_center.exclusive_service_area.area
+        + shapely.Point(2.0, 2.0).buffer(0.1).area,
+    )
@@ -0,0 +1,191 @@
+import numpy as np
+import pytest
+
+from src.models import (
+    AlgorithmType,
+    AssignmentProblem,
+    AssignmentRequest,
+    Client,
+    CostProblem,
+    Facility,
+    SolutionStatus,
+    scale_clients_demands,
+)
+from src.services import (
+    aggregate_colocated_clients,
+    compute_cost_matrix,
+    solve_facility_assignment,
+    solve_flow_assignment_formulation,
+)
+
+
+@pytest.fixture
+def colocated_clients(clients):
+    """Clients followed by copies, with other ids and demands, of the
+    first half of them"""
+
+    copies = [
+        Client(
+            id=f"copy-{client.id}",
+            lat=client.lat,
+            lng=client.lng,
+            demand=client.demand + 1,
+        )
+        for client in clients[:150]
+    ]
+
+    return clients[:300] + copies
+
+
+def test_aggregate_colocated_clients(clients_within_square):
+    clients = clients_within_square + [
+        Client(id="9", lat=1.0, lng=1.0),
+        Client(id="10", lat=0.0, lng=0.0),
+    ]
+
+    aggregation = aggregate_colocated_clients(clients)
+
+    assert [location.id for location in aggregation.locations] == [
+        str(i) for i in range(1, 9)
+    ]
+    assert all(location.demand == 1.0 for location in aggregation.locations)
+    assert aggregation.client_locations.tolist() == list(range(8)) + [2, 0]
+    assert aggregation.reduction_ratio == pytest.approx(0.2)
+
+
+def test_aggregate_clients_without_colocated_ones(clients):
+    aggregation = aggregate_colocated_clients(clients[:100])
+
+    assert aggregation.reduction_ratio == 0.0
+    assert aggregation.client_locations.tolist() == list(range(100))
+
+
+def test_solve_facility_assignment_with_colocated_clients(
+    colocated_clients, facilities
+):
+    """Solving with merged super-clients reaches the objective value of
+    the original Min Cost Flow problem and assigns every client once"""
+
+    request = AssignmentRequest(
+        total_demand=10_000,
+        clients=colocated_clients,
+        facilities=facilities,
+        algorithm=AlgorithmType.MCF_FORMULATION,
+    )
+    scaled_clients = scale_clients_demands(
+        colocated_clients, new_total_demand=10_000
+    )
+    original_problem = AssignmentProblem(
+        clients=scaled_clients,
+        facilities=facilities,
+        cost_matrix=compute_cost_matrix(
+            CostProblem(clients=colocated_clients, facilities=facilities)
+        ),
+    )
+
+    original_solution = solve_flow_assignment_formulation(original_problem)
+    solution = solve_facility_assignment(request)
+
+    assert solution.solution_status == SolutionStatus.OPTIMAL
+    assert solution.objective_value == original_solution.objective_value
+    assert solution.client_reduction_ratio == pytest.approx(150 / 450)
+
+    assigned_ids = [
+        client.id
+        for assigned_facility in solution.assigned_facilities
+        for client in assigned_facility.assigned_clients
+    ]
+    assert sorted(assigned_ids) == sorted(c.id for c in colocated_clients)
+    assert all(
+        assigned_facility.expected_demand
+        == round(sum(c.demand for c in assigned_facility.assigned_clients))
+        for assigned_facility in solution.assigned_facilities
+    )
+
+
+@pytest.mark.parametrize(
+    "algorithm_type",
+    [AlgorithmType.MILP_FORMULATION, AlgorithmType.HIGHS_MILP_FORMULATION],
+)
+def test_solve_facility_assignment_keeps_integer_clients(
+    colocated_clients, facilities, algorithm_type
+):
+    """The integer formulations only share the cost matrix columns"""
+
+    request = AssignmentRequest(
+        total_demand=10_000,
+        clients=colocated_clients[::3],
+        facilities=facilities,
+        algorithm=algorithm_type,
+    )
+
+    solution = solve_facility_assignment(request)
+
+    assert solution.solution_status == SolutionStatus.OPTIMAL
+    assert sum(
+        len(assigned_facility.assigned_clients)
+        for assigned_facility in solution.assigned_facilities
+    ) == len(request.clients)
+    assert np.isclose(
+        solution.client_reduction_ratio,
+        aggregate_colocated_clients(request.clients).reduction_ratio,
+    )
+
+
+@pytest.mark.parametrize(
+    "algorithm_type",
+    [
+        AlgorithmType.MCF_FORMULATION,
+        AlgorithmType.TRANSPORTATION_FORMULATION,
+        AlgorithmType.DECOMPOSED_FLOW_FORMULATION,
+    ],
+)
+@pytest.mark.parametrize(
+    "facilities, num_assigned_clients",
+    [
+        (
+            [
+                Facility(id="1", name="FC1", lat=0.1, lng=0.1, max_demand=5),
+                Facility(id="2", name="FC2", lat=0.2, lng=0.2, max_demand=5),
+            ],
+            [5, 5],
+        ),
+        # The flow is split without any bound of the far facility binding
+        (
+            [
+                Facility(id="1", name="FC1", lat=0.01, lng=0.01, max_demand=3),
+                Facility(id="2", name="FC2", lat=0.5, lng=0.5),
+            ],
+            [3, 7],
+        ),
+    ],
+)
+def test_solve_facility_assignment_splits_colocated_demand(
+    algorithm_type, facilities, num_assigned_clients
+):
+    """Co-located demand beyond the capacity of a facility is split
+    between facilities instead of given whole to one of them, reaching
+    the objective value of the MILP formulation"""
+
+    request = AssignmentRequest(
+        total_demand=10,
+        clients=[Client(id=str(j), lat=0.0, lng=0.0) for j in range(10)],
+        facilities=facilities,
+        algorithm=algorithm_type,
+    )
+
+    assignment_solution = solve_facility_assignment(request)
+    milp_solution = solve_facility_assignment(
+        request.model_copy(
+            update={"algorithm": AlgorithmType.MILP_FORMULATION}
+        )
+    )
+
+    assert assignment_solution.solution_status == SolutionStatus.OPTIMAL
+    assert assignment_solution.objective_value == pytest.approx(
+        milp_solution.objective_value
+    )
+    assert [
+        len(assigned_facility.assigned_clients)
+        for assigned_facility in assignment_solution.assigned_facilities
+    ] == num_assigned_clients
@@ -0,0 +1,174 @@
+import numpy as np
+import pytest
+
+from src.models import AlgorithmType, Facility, SolutionStatus
+from src.services import (
+    cluster_facilities,
+    solve_decomposed_flow_formulation,
+    solve_decomposed_flow_model,
+    solve_flow_assignment_formulation,
+)
+from src.services.assignment_solver.decomposed_flow_formulation import (
+    _region_executors,
+)
+from src.services.assignment_solver.flow_assignment_formulation import (
+    build_flow_network,
+    solve_mcf_model,
+)
+
+
+def test_cluster_facilities_splits_distant_groups():
+    coordinates = [(0.0, 0.0), (0.1, 0.0), (0.0, 0.1), (5.0, 5.0), (5.1, 5.0)]
+    facilities = [
+        Facility(id=str(i), name=f"FC{i}", lat=lat, lng=lng)
+        for i, (lat, lng) in enumerate(coordinates)
+    ]
+
+    regions = cluster_facilities(facilities, num_regions=2)
+
+    assert regions.tolist() in ([0, 0, 0, 1, 1], [1, 1, 1, 0, 0])
+    assert cluster_facilities(facilities, num_regions=10).max() < 5
+
+
+@pytest.mark.parametrize(
+    "num_regions, max_workers", [(1, 1), (3, 1), (5, 1), (3, 2)]
+)
+def test_solve_decomposed_flow_model_matches_mcf(
+    capacitated_assignment_problem, num_regions, max_workers
+):
+    """The coupling solve reaches the Min Cost Flow optimum whatever the
+    regions, also when they are solved in a process pool"""
+
+    network = build_flow_network(
+        assignment_problem=capacitated_assignment_problem,
+        client_exclusive_facilities=np.full(400, -1),
+    )
+    mcf_result = solve_mcf_model(
+        network=network, candidate_arcs=network.eligible
+    )
+
+    solution = solve_decomposed_flow_model(
+        network=network,
+        facility_regions=cluster_facilities(
+            facilities=capacitated_assignment_problem.facilities,
+            num_regions=num_regions,
+        ),
+        max_workers=max_workers,
+        max_coupling_rounds=0,
+        parallel_min_clients=0,
+    )
+
+    assert solution is not None
+    assert solution.optimal
+    assert solution.cost == mcf_result.model.optimal_cost()
+    assert network.eligible[solution.client_facilities, np.arange(400)].all()
+
+
+def test_solve_decomposed_flow_model_reuses_process_pool(
+    capacitated_assignment_problem,
+):
+    """The process pool is started once, and small networks are solved in
+    this process"""
+
+    network = build_flow_network(
+        assignment_problem=capacitated_assignment_problem,
+        client_exclusive_facilities=np.full(400, -1),
+    )
+    facility_regions = cluster_facilities(
+        facilities=capacitated_assignment_problem.facilities, num_regions=3
+    )
+    _region_executors.pop(2, None)
+
+    solve_decomposed_flow_model(
+        network=network,
+        facility_regions=facility_regions,
+        max_workers=2,
+        parallel_min_clients=401,
+    )
+    assert 2 not in _region_executors
+
+    solutions = []
+    executors = []
+    for _ in range(2):
+        solutions.append(
+            solve_decomposed_flow_model(
+                network=network,
+                facility_regions=facility_regions,
+                max_workers=2,
+                parallel_min_clients=400,
+            )
+        )
+        executors.append(_region_executors[2])
+
+    assert executors[0] is executors[1]
+    assert solutions[0] is not None and solutions[1] is not None
+    assert solutions[0].cost == solutions[1].cost
+
+
+def test_solve_decomposed_flow_model_with_limited_coupling(
+    capacitated_assignment_problem,
+):
+    network = build_flow_network(
+        assignment_problem=capacitated_assignment_problem,
+        client_exclusive_facilities=np.full(400, -1),
+    )
+    facility_regions = cluster_facilities(
+        facilities=capacitated_assignment_problem.facilities, num_regions=3
+    )
+
+    exact_solution = solve_decomposed_flow_model(
+        network=network,
+        facility_regions=facility_regions,
+        max_workers=1,
+        max_coupling_rounds=0,
+    )
+    limited_solution = solve_decomposed_flow_model(
+        network=network,
+        facility_regions=facility_regions,
+        max_workers=1,
+        max_coupling_rounds=1,
+    )
+
+    assert exact_solution is not None and limited_solution is not None
+    assert limited_solution.cost >= exact_solution.cost
+    if limited_solution.optimal:
+        assert limited_solution.cost == exact_solution.cost
+
+
+def test_solve_decomposed_flow_model_infeasible(
+    capacitated_assignment_problem,
+):
+    network = build_flow_network(
+        assignment_problem=capacitated_assignment_problem,
+        client_exclusive_facilities=np.full(400, -1),
+    )
+    network.facility_capacities[:] = 1
+
+    solution = solve_decomposed_flow_model(
+        network=network,
+        facility_regions=np.arange(10) % 3,
+        max_workers=1,
+    )
+
+    assert solution is None
+
+
+def test_solve_decomposed_flow_formulation_matches_mcf(
+    capacitated_assignment_problem,
+):
+    mcf_solution = solve_flow_assignment_formulation(
+        capacitated_assignment_problem
+    )
+    capacitated_assignment_problem.algorithm = (
+        AlgorithmType.DECOMPOSED_FLOW_FORMULATION
+    )
+    capacitated_assignment_problem.num_regions = 3
+    decomposed_solution = solve_decomposed_flow_formulation(
+        capacitated_assignment_problem
+    )
+
+    assert decomposed_solution.solution_status in (
+        SolutionStatus.OPTIMAL,
+        SolutionStatus.FEASIBLE,
+    )
+    assert decomposed_solution.objective_value >= mcf_solution.objective_value
@@ -0,0 +1,224 @@
+import numpy as np
+import pytest
+from ortools.graph.python import min_cost_flow
+from shapely import Point
+
+from config import settings
+from src.models import (
+    AlgorithmType,
+    AssignmentProblem,
+    CostProblem,
+    SolutionStatus,
+    scale_clients_demands,
+)
+from src.services import (
+    compute_cost_matrix,
+    locate_clients_in_exclusive_areas,
+    solve_flow_assignment_formulation,
+)
+from src.services.assignment_solver.flow_assignment_formulation import (
+    _build_mcf_model,
+    build_flow_network,
+    compute_reduced_costs,
+    extract_client_facilities,
+    select_candidate_arcs,
+    select_warm_start_arcs,
+    solve_mcf_model,
+)
+
+
+def _build_reference_mcf_model(
+    assignment_problem: AssignmentProblem,
+) -> min_cost_flow.SimpleMinCostFlow:
+    """Build the Min Cost Flow model adding one arc at a time"""
+
+    model = min_cost_flow.SimpleMinCostFlow()
+    scale_factor = settings.MCF_SCALE_FACTOR
+    clients = assignment_problem.clients
+    facilities = assignment_problem.facilities
+    cost_matrix = assignment_problem.cost_matrix
+    assert cost_matrix is not None
+
+    supplies = [round(scale_factor * client.demand) for client in clients]
+    total_clients_supplies = sum(supplies)
+    num_clients = len(clients)
+    num_facilities = len(facilities)
+    terminal_node = num_clients + num_facilities
+    total_facilities_demand = 0
+    for facility in facilities:
+        total_facilities_demand += scale_factor * facility.min_demand
+        supplies.append(-scale_factor * facility.min_demand)
+    supplies.append(-(total_clients_supplies - total_facilities_demand))
+    for i, value in enumerate(supplies):
+        model.set_node_supply(i, value)
+
+    for j, client in enumerate(clients):
+        areas_containing_client = [
+            i
+            for i, facility in enumerate(facilities)
+            if facility.exclusive_service_area.intersects(
+                Point(client.lng, client.lat)
+            )
+        ]
+        for i in areas_containing_client or range(num_facilities):
+            model.add_arc_with_capacity_and_unit_cost(
+                tail=j,
+                head=num_clients + i,
+                capacity=supplies[j],
+                unit_cost=int(
+                    scale_factor * cost_matrix[i][j] / client.demand
+                ),
+            )
+
+    for i, facility in enumerate(facilities):
+        capacity = scale_factor * facility.max_demand or total_clients_supplies
+        model.add_arc_with_capacity_and_unit_cost(
+            tail=num_clients + i,
+            head=terminal_node,
+            capacity=capacity - scale_factor * facility.min_demand,
+            unit_cost=0,
+        )
+
+    return model
+
+
+@pytest.fixture
+def flow_assignment_problem(clients, facilities):
+    scaled_clients = scale_clients_demands(clients, new_total_demand=10_000)
+    cost_problem = CostProblem(clients=scaled_clients, facilities=facilities)
+
+    return AssignmentProblem(
+        clients=scaled_clients,
+        facilities=facilities,
+        cost_matrix=compute_cost_matrix(cost_problem),
+        algorithm=AlgorithmType.MCF_FORMULATION,
+    )
+
+
+def test_build_mcf_model_matches_reference(flow_assignment_problem):
+    """The vectorized builder must produce the same network as adding
+    arcs one at a time, hence the same optimal cost and flows"""
+
+    network = build_flow_network(
+        assignment_problem=flow_assignment_problem,
+        client_exclusive_facilities=locate_clients_in_exclusive_areas(
+            clients=flow_assignment_problem.clients,
+            facilities=flow_assignment_problem.facilities,
+        ),
+    )
+    model, _, _ = _build_mcf_model(network=network, arcs_mask=network.eligible)
+    reference_model = _build_reference_mcf_model(flow_assignment_problem)
+
+    assert model.num_nodes() == reference_model.num_nodes()
+    assert model.num_arcs() == reference_model.num_arcs()
+    assert model.solve() == reference_model.solve() == model.OPTIMAL
+    assert model.optimal_cost() == reference_model.optimal_cost()
+
+    arcs = np.arange(model.num_arcs(), dtype=np.int32)
+    assert np.array_equal(model.flows(arcs), reference_model.flows(arcs))
+
+
+@pytest.mark.parametrize(
+    "facility_demands, expected_facility",
+    [((1, 2), 1), ((2, 1), 0), ((1, 1), 0)],
+)
+def test_extract_client_facilities_with_split_flow(
+    facility_demands, expected_facility
+):
+    """A client whose supply is split goes to the facility receiving the
+    largest flow, ties going to the lowest facility index"""
+
+    model = min_cost_flow.SimpleMinCostFlow()
+    arc_clients = np.array([0, 0])
+    arc_facilities = np.array([0, 1])
+    model.add_arcs_with_capacity_and_unit_cost(
+        np.array([0, 0], dtype=np.int32),
+        np.array([1, 2], dtype=np.int32),
+        np.array([2, 2]),
+        np.array([1, 1]),
+    )
+    model.set_nodes_supplies(
+        np.array([0, 1, 2], dtype=np.int32),
+        np.array([sum(facility_demands), *(-d for d in facility_demands)]),
+    )
+
+    assert model.solve() == model.OPTIMAL
+
+    client_facilities = extract_client_facilities(
+        model=model,
+        arc_clients=arc_clients,
+        arc_facilities=arc_facilities,
+        num_clients=1,
+    )
+
+    assert client_facilities.tolist() == [expected_facility]
+
+
+@pytest.mark.parametrize("num_candidate_facilities", [1, 2, 3])
+def test_solve_mcf_model_with_candidate_arcs(
+    capacitated_assignment_problem, num_candidate_facilities
+):
+    """Pricing in the pruned arcs reaches the optimal cost of the full
+    network with fewer arcs, and the final reduced costs certify it"""
+
+    network = build_flow_network(
+        assignment_problem=capacitated_assignment_problem,
+        client_exclusive_facilities=np.full(400, -1),
+    )
+    dense_result = solve_mcf_model(
+        network=network, candidate_arcs=network.eligible
+    )
+    sparse_result = solve_mcf_model(
+        network=network,
+        candidate_arcs=select_candidate_arcs(
+            network=network,
+            num_candidate_facilities=num_candidate_facilities,
+        ),
+    )
+
+    assert sparse_result.status == sparse_result.model.OPTIMAL
+    assert (
+        sparse_result.model.optimal_cost() == dense_result.model.optimal_cost()
+    )
+    assert sparse_result.arc_clients.size < dense_result.arc_clients.size
+
+    arcs_mask = np.zeros_like(network.eligible)
+    arcs_mask[sparse_result.arc_facilities, sparse_result.arc_clients] = True
+    reduced_costs = compute_reduced_costs(
+        network=network, arcs_mask=arcs_mask, result=sparse_result
+    )
+    assert (reduced_costs[network.eligible] >= 0).all()
+
+
+def test_solve_flow_assignment_with_candidate_facilities(
+    flow_assignment_problem,
+):
+    dense_solution = solve_flow_assignment_formulation(flow_assignment_problem)
+    flow_assignment_problem.num_candidate_facilities = 1
+    sparse_solution = solve_flow_assignment_formulation(
+        flow_assignment_problem
+    )
+
+    assert sparse_solution.solution_status == SolutionStatus.OPTIMAL
+    assert sparse_solution.objective_value == dense_solution.objective_value
+
+
+def test_select_warm_start_arcs(capacitated_assignment_problem):
+    network = build_flow_network(
+        assignment_problem=capacitated_assignment_problem,
+        client_exclusive_facilities=np.full(400, -1),
+    )
+    initial_client_facilities = np.full(400, -1)
+    initial_client_facilities[:200] = np.arange(200) % 10
+
+    candidate_arcs = select_warm_start_arcs(
+        network=network,
+        initial_client_facilities=initial_client_facilities,
+        num_candidate_facilities=0,
+    )
+
+    nearest_facilities = network.unit_costs.argmin(axis=0)
+    assert candidate_arcs[nearest_facilities, np.arange(400)].all()
+    assert candidate_arcs[np.arange(200) % 10, np.arange(200)].all()
+    assert candidate_arcs[:, 200:].sum(axis=0).max() == 1
+    assert candidate_arcs[:, :200].sum(axis=0).max() == 2
@@ -0,0 +1,62 @@
+import pytest
+
+from src.models import (
+    AlgorithmType,
+    AssignmentProblem,
+    CostProblem,
+    SolutionStatus,
+    scale_clients_demands,
+)
+from src.services import (
+    compute_cost_matrix,
+    solve_highs_milp_assignment_formulation,
+    solve_milp_assignment_formulation,
+)
+
+
+@pytest.fixture
+def milp_assignment_problems(clients, facilities):
+    """The same problem for the Pyomo and the native HiGHS engines"""
+
+    scaled_clients = scale_clients_demands(
+        clients[:100], new_total_demand=10_000
+    )
+    cost_matrix = compute_cost_matrix(
+        CostProblem(clients=scaled_clients, facilities=facilities)
+    )
+
+    return [
+        AssignmentProblem(
+            clients=scaled_clients,
+            facilities=facilities,
+            cost_matrix=cost_matrix,
+            algorithm=algorithm,
+        )
+        for algorithm in (
+            AlgorithmType.MILP_FORMULATION,
+            AlgorithmType.HIGHS_MILP_FORMULATION,
+        )
+    ]
+
+
+def test_highs_milp_matches_pyomo_milp(milp_assignment_problems):
+    pyomo_problem, highs_problem = milp_assignment_problems
+
+    pyomo_solution = solve_milp_assignment_formulation(pyomo_problem)
+    highs_solution = solve_highs_milp_assignment_formulation(highs_problem)
+
+    assert highs_solution.solution_status == SolutionStatus.OPTIMAL
+    assert highs_solution.message == pyomo_solution.message
+    assert highs_solution.objective_value == pyomo_solution.objective_value
+
+
+def test_highs_milp_infeasible_message(milp_assignment_problems):
+    _, highs_problem = milp_assignment_problems
+    highs_problem.facilities[0].max_demand = 1
+    highs_problem.facilities[1].max_demand = 1
+    highs_problem.facilities[2].max_demand = 1
+
+    solution = solve_highs_milp_assignment_formulation(highs_problem)
+
+    assert solution.solution_status == SolutionStatus.INFEASIBLE
+    assert solution.message == "Demonstrated that problem is infeasible"
@@ -0,0 +1,161 @@
+import numpy as np
+import pytest
+
+from src.models import (
+    AlgorithmType,
+    AssignmentRequest,
+    Client,
+    ClientBatch,
+    FacilityDemandUpdate,
+    ResolveRequest,
+    SolutionStatus,
+)
+from src.services import (
+    CachedSolution,
+    ResolveChangeError,
+    SolutionCache,
+    SolutionNotFoundError,
+    aggregate_colocated_clients,
+    resolve_facility_assignment,
+    solve_facility_assignment,
+)
+
+
+@pytest.fixture(
+    params=[
+        AlgorithmType.MCF_FORMULATION,
+        AlgorithmType.MILP_FORMULATION,
+        AlgorithmType.HIGHS_MILP_FORMULATION,
+    ]
+)
+def assignment_request(request, clients, facilities):
+    return AssignmentRequest(
+        total_demand=10_000,
+        clients=clients[:200],
+        facilities=facilities,
+        algorithm=request.param,
+    )
+
+
+def test_resolve_facility_assignment(assignment_request, clients):
+    """Re-solving the changes reaches the objective value of solving the
+    changed problem from scratch"""
+
+    solution = solve_facility_assignment(assignment_request)
+    changed_client = clients[10].model_copy(update={"demand": 3.0})
+    resolve_request = ResolveRequest(
+        solution_id=solution.solution_id,
+        added_clients=clients[200:220],
+        changed_clients=[changed_client],
+        removed_client_ids=[client.id for client in clients[:5]],
+        facility_updates=[
+            FacilityDemandUpdate(
+                id=assignment_request.facilities[1].id, min_demand=4_000
+            )
+        ],
+    )
+
+    resolved_solution = resolve_facility_assignment(resolve_request)
+
+    facilities = list(assignment_request.facilities)
+    facilities[1] = facilities[1].model_copy(update={"min_demand": 4_000})
+    changed_request = assignment_request.model_copy(
+        update={
+            "clients": clients[5:10]
+            + [changed_client]
+            + clients[11:200]
+            + clients[200:220],
+            "facilities": facilities,
+        }
+    )
+    changed_solution = solve_facility_assignment(changed_request)
+
+    assert resolved_solution.solution_status == SolutionStatus.OPTIMAL
+    assert resolved_solution.solution_id not in ("", solution.solution_id)
+    assert (
+        resolved_solution.objective_value == changed_solution.objective_value
+    )
+    assert sorted(
+        client.id
+        for assigned_facility in resolved_solution.assigned_facilities
+        for client in assigned_facility.assigned_clients
+    ) == sorted(client.id for client in changed_request.clients)
+
+
+def test_resolve_unknown_solution():
+    with pytest.raises(SolutionNotFoundError):
+        resolve_facility_assignment(ResolveRequest(solution_id="unknown"))
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"removed_client_ids": ["unknown"]},
+        {"changed_clients": [Client(id="unknown", lat=0.0, lng=0.0)]},
+        {"facility_updates": [FacilityDemandUpdate(id="unknown")]},
+    ],
+)
+def test_resolve_unknown_clients_and_facilities(assignment_request, changes):
+    solution = solve_facility_assignment(assignment_request)
+
+    with pytest.raises(ResolveChangeError):
+        resolve_facility_assignment(
+            ResolveRequest(solution_id=solution.solution_id, **changes)
+        )
+
+
+def cached_solution(
+    assignment_request: AssignmentRequest, num_locations: int
+) -> CachedSolution:
+    clients = ClientBatch(
+        ids=[str(j) for j in range(num_locations)],
+        lats=np.arange(num_locations, dtype=float),
+        lngs=np.zeros(num_locations),
+    )
+
+    return CachedSolution(
+        assignment_request=assignment_request,
+        clients=clients,
+        aggregation=aggregate_colocated_clients(clients),
+        location_cost_matrix=np.zeros((2, num_locations)),
+        surrogate_costs=np.zeros((2, num_locations), dtype=bool),
+        client_facilities={},
+    )
+
+
+def test_solution_cache_evicts_least_recently_used(assignment_request):
+    solution = cached_solution(assignment_request, 10)
+    cache = SolutionCache(max_size=2, max_bytes=10 * solution.nbytes)
+    first_id, second_id = cache.add(solution), cache.add(solution)
+
+    cache.get(first_id)
+    third_id = cache.add(solution)
+
+    assert len(cache) == 2
+    with pytest.raises(SolutionNotFoundError):
+        cache.get(second_id)
+    assert cache.get(first_id) is solution
+    assert cache.get(third_id) is solution
+
+
+def test_solution_cache_max_bytes(assignment_request):
+    """Solutions are evicted to keep the cache within its bytes, and
+    those larger than the whole cache are not kept"""
+
+    small_solution = cached_solution(assignment_request, 10)
+    large_solution = cached_solution(assignment_request, 1_000)
+    cache = SolutionCache(
+        max_size=10, max_bytes=large_solution.nbytes + small_solution.nbytes
+    )
+    first_id = cache.add(small_solution)
+    second_id = cache.add(small_solution)
+
+    large_id = cache.add(large_solution)
+
+    assert len(cache) == 2
+    with pytest.raises(SolutionNotFoundError):
+        cache.get(first_id)
+    assert cache.get(second_id) is small_solution
+    assert cache.get(large_id) is large_solution
+    assert cache.add(cached_solution(assignment_request, 2_000)) == ""
+    assert len(cache) == 2
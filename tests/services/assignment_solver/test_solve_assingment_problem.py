@@ -1,4 +1,5 @@
 import pytest
+from shapely import intersects_xy
 
 from src.models import (
     AlgorithmType,
@@ -7,18 +8,30 @@ from src.models import (
     Client,
     CostProblem,
     Facility,
+    ServiceAreaType,
     SolutionStatus,
 )
 from src.services import (
     compute_cost_matrix,
+    lookup_cell_facilities,
+    solve_decomposed_flow_formulation,
     solve_facility_assignment,
     solve_flow_assignment_formulation,
+    solve_highs_milp_assignment_formulation,
     solve_milp_assignment_formulation,
+    solve_transportation_formulation,
 )
 
 SOLVER_MAPPING = {
     AlgorithmType.MCF_FORMULATION: solve_flow_assignment_formulation,
     AlgorithmType.MILP_FORMULATION: solve_milp_assignment_formulation,
+    AlgorithmType.HIGHS_MILP_FORMULATION: (
+        solve_highs_milp_assignment_formulation
+    ),
+    AlgorithmType.TRANSPORTATION_FORMULATION: solve_transportation_formulation,
+    AlgorithmType.DECOMPOSED_FLOW_FORMULATION: (
+        solve_decomposed_flow_formulation
+    ),
 }
 
 
@@ -139,9 +152,7 @@ def facilities_with_intersecting_exclusive_area():
     return [Facility(**data) for data in facilities_data]
 
 
-@pytest.fixture(
-    params=[AlgorithmType.MCF_FORMULATION, AlgorithmType.MILP_FORMULATION]
-)
+@pytest.fixture(params=list(SOLVER_MAPPING))
 def assignment_problem(request, clients, facilities):
     cost_problem = CostProblem(clients=clients, facilities=facilities)
     cost_matrix = compute_cost_matrix(cost_problem)
@@ -153,9 +164,7 @@ def assignment_problem(request, clients, facilities):
     )
 
 
-@pytest.fixture(
-    params=[AlgorithmType.MCF_FORMULATION, AlgorithmType.MILP_FORMULATION]
-)
+@pytest.fixture(params=list(SOLVER_MAPPING))
 def assignment_problem_with_exclusive_areas(
     request, clients, facilities_with_exclusive_area
 ):
@@ -171,9 +180,7 @@ def assignment_problem_with_exclusive_areas(
     )
 
 
-@pytest.fixture(
-    params=[AlgorithmType.MCF_FORMULATION, AlgorithmType.MILP_FORMULATION]
-)
+@pytest.fixture(params=list(SOLVER_MAPPING))
 def assignment_problem_with_intersecting_exclusive_areas(
     request, clients, facilities_with_intersecting_exclusive_area
 ):
@@ -277,10 +284,7 @@ def test_assigment_problem_respects_max_demand(assignment_problem):
     )
 
 
-@pytest.mark.parametrize(
-    "algorithm_type",
-    [AlgorithmType.MCF_FORMULATION, AlgorithmType.MILP_FORMULATION],
-)
+@pytest.mark.parametrize("algorithm_type", list(SOLVER_MAPPING))
 def test_solve_facility_assignment(clients, facilities, algorithm_type):
 
     request = AssignmentRequest(
@@ -293,3 +297,91 @@ def test_solve_facility_assignment(clients, facilities, algorithm_type):
     assignment_solution = solve_facility_assignment(request)
 
     assert assignment_solution.solution_status == SolutionStatus.OPTIMAL
+
+
+@pytest.mark.parametrize("algorithm_type", list(SOLVER_MAPPING))
+def test_solve_facility_assignment_voronoi(
+    clients, facilities, algorithm_type
+):
+    """Each solver builds territories covering its clients"""
+
+    request = AssignmentRequest(
+        total_demand=sum(client.demand for client in clients),
+        clients=clients,
+        facilities=facilities,
+        algorithm=algorithm_type,
+        service_area_type=ServiceAreaType.VORONOI,
+    )
+
+    assignment_solution = solve_facility_assignment(request)
+
+    assert assignment_solution.solution_status == SolutionStatus.OPTIMAL
+    first_area, second_area = (
+        assigned_facility.service_area
+        for assigned_facility in assignment_solution.assigned_facilities
+    )
+    assert first_area.intersection(second_area).area == pytest.approx(0)
+    for assigned_facility in assignment_solution.assigned_facilities:
+        assigned_clients = assigned_facility.assigned_clients
+        assert intersects_xy(
+            assigned_facility.service_area,
+            assigned_clients.lngs,
+            assigned_clients.lats,
+        ).all()
+
+
+def test_solve_facility_assignment_cell_lookup(clients, facilities):
+    """Hexagonal grid service areas come with the lookup table of the
+    facility of each cell"""
+
+    request = AssignmentRequest(
+        total_demand=sum(client.demand for client in clients),
+        clients=clients,
+        facilities=facilities,
+        service_area_type=ServiceAreaType.HEX_GRID,
+    )
+
+    assignment_solution = solve_facility_assignment(request)
+
+    assert assignment_solution.cell_lookup is not None
+    for assigned_facility in assignment_solution.assigned_facilities:
+        assigned_clients = assigned_facility.assigned_clients
+        assert lookup_cell_facilities(
+            assignment_solution.cell_lookup,
+            assigned_clients.lats,
+            assigned_clients.lngs,
+        ) == [assigned_facility.facility.id] * len(assigned_clients)
+
+    request.service_area_type = ServiceAreaType.ALPHA_SHAPE
+    assert solve_facility_assignment(request).cell_lookup is None
+
+
+def test_solve_facility_assignment_stored_costs(
+    monkeypatch, cost_matrix_store, clients, facilities
+):
+    """Solving the same problem again reads its costs from the store"""
+
+    request = AssignmentRequest(
+        total_demand=sum(client.demand for client in clients),
+        clients=clients,
+        facilities=facilities,
+    )
+    solution = solve_facility_assignment(request)
+
+    def compute_screened_cost_matrix(cost_problem):
+        raise AssertionError("The cost matrix should be stored")
+
+    monkeypatch.setattr(
+        "src.services.assignment_solver.solve_assignment_problem."
+        "compute_screened_cost_matrix",
+        compute_screened_cost_matrix,
+    )
+    stored_solution = solve_facility_assignment(request)
+
+    assert stored_solution.objective_value == solution.objective_value
+    assert (
+        solve_facility_assignment(
+            request.model_copy(update={"total_demand": 16})
+        ).solution_status
+        == SolutionStatus.OPTIMAL
+    )
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from src.models import AlgorithmType, SolutionStatus
+from src.services import (
+    search_facility_prices,
+    solve_flow_assignment_formulation,
+    solve_transportation_formulation,
+    solve_transportation_model,
+)
+from src.services.assignment_solver.flow_assignment_formulation import (
+    build_flow_network,
+    solve_mcf_model,
+)
+
+
+@pytest.fixture
+def capacitated_network(capacitated_assignment_problem):
+    return build_flow_network(
+        assignment_problem=capacitated_assignment_problem,
+        client_exclusive_facilities=np.full(400, -1),
+    )
+
+
+def test_search_facility_prices_meets_demand_bounds(capacitated_network):
+    network = capacitated_network
+    prices = search_facility_prices(network, max_rounds=50, tolerance=0)
+
+    costs = np.where(network.eligible, network.unit_costs, np.inf)
+    cheapest = (costs + prices[:, np.newaxis]).argmin(axis=0)
+    loads = np.bincount(
+        cheapest,
+        weights=network.client_supplies,
+        minlength=prices.size,
+    )
+    lower = network.facility_min_demands
+    upper = lower + network.facility_capacities
+
+    violation = np.maximum(loads - upper, 0) + np.maximum(lower - loads, 0)
+    assert violation.sum() <= 0.05 * network.client_supplies.sum()
+
+
+@pytest.mark.parametrize("core_share", [0.0, 0.05, 1.0])
+def test_solve_transportation_model_matches_mcf(
+    capacitated_network, core_share
+):
+    """Whatever the share of clients left to the solver, the repair
+    reaches the Min Cost Flow optimum"""
+
+    network = capacitated_network
+    mcf_result = solve_mcf_model(
+        network=network, candidate_arcs=network.eligible
+    )
+
+    solution = solve_transportation_model(
+        network=network,
+        prices=search_facility_prices(network),
+        core_share=core_share,
+    )
+
+    assert solution is not None
+    assert solution.optimal
+    assert solution.cost == mcf_result.model.optimal_cost()
+    assert network.eligible[solution.client_facilities, np.arange(400)].all()
+
+
+def test_solve_transportation_model_infeasible(capacitated_network):
+    network = capacitated_network
+    network.facility_capacities[:] = 1
+
+    solution = solve_transportation_model(
+        network=network,
+        prices=np.zeros(10),
+    )
+
+    assert solution is None
+
+
+def test_solve_transportation_formulation_matches_mcf(
+    capacitated_assignment_problem,
+):
+    mcf_solution = solve_flow_assignment_formulation(
+        capacitated_assignment_problem
+    )
+    capacitated_assignment_problem.algorithm = (
+        AlgorithmType.TRANSPORTATION_FORMULATION
+    )
+    transportation_solution = solve_transportation_formulation(
+        capacitated_assignment_problem
+    )
+
+    assert transportation_solution.solution_status == SolutionStatus.OPTIMAL
+    assert (
+        transportation_solution.objective_value == mcf_solution.objective_value
+    )
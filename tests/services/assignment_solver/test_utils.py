@@ -1,6 +1,12 @@
+import numpy as np
+import pytest
+
 from config import settings
 from src.models import AlgorithmType
-from src.services import scale_assignment_problem_parameters
+from src.services import (
+    group_clients_by_facility,
+    scale_assignment_problem_parameters,
+)
 
 
 def test_scale_assignment_problem_parameters(assignment_problem):
@@ -10,19 +16,95 @@ def test_scale_assignment_problem_parameters(assignment_problem):
         AlgorithmType.MILP_FORMULATION: settings.MILP_SCALE_FACTOR,
         AlgorithmType.MCF_FORMULATION: settings.MCF_SCALE_FACTOR,
     }
+    scale_factor = factor_mapping[assignment_problem.algorithm]
+    clients = assignment_problem.clients
+    facilities = assignment_problem.facilities
 
     # Scale problem parameters to become integer
-    scaled_clients, scaled_facilities, scaled_cost_matrix = (
-        scale_assignment_problem_parameters(
-            assignment_problem=assignment_problem,
-            scale_factor=factor_mapping[assignment_problem.algorithm],
+    (
+        client_demands,
+        facility_min_demands,
+        facility_max_demands,
+        scaled_cost_matrix,
+    ) = scale_assignment_problem_parameters(
+        assignment_problem=assignment_problem,
+        scale_factor=scale_factor,
+    )
+
+    assert client_demands.dtype == int
+    assert facility_min_demands.dtype == int
+    assert facility_max_demands.dtype == int
+    assert scaled_cost_matrix.dtype == int
+    assert client_demands.tolist() == [
+        round(scale_factor * client.demand) for client in clients
+    ]
+    assert facility_min_demands.tolist() == [
+        scale_factor * facility.min_demand for facility in facilities
+    ]
+    assert facility_max_demands.tolist() == [
+        scale_factor * facility.max_demand for facility in facilities
+    ]
+
+    expected_cost_matrix = scale_factor * assignment_problem.cost_matrix
+    if assignment_problem.algorithm == AlgorithmType.MCF_FORMULATION:
+        expected_cost_matrix = np.array(
+            [
+                [cost / client.demand for cost, client in zip(row, clients)]
+                for row in expected_cost_matrix
+            ]
         )
+
+    assert np.array_equal(scaled_cost_matrix, expected_cost_matrix.astype(int))
+
+
+def test_scale_assignment_problem_parameters_keeps_models(assignment_problem):
+    """Clients and facilities of the problem are not modified"""
+
+    clients = [client.model_copy() for client in assignment_problem.clients]
+    facilities = [
+        facility.model_copy() for facility in assignment_problem.facilities
+    ]
+
+    scale_assignment_problem_parameters(
+        assignment_problem=assignment_problem, scale_factor=1000
+    )
+
+    assert assignment_problem.clients == clients
+    assert assignment_problem.facilities == facilities
+
+
+def test_scale_assignment_problem_parameters_unit_costs(assignment_problem):
+    """Flow formulations take the scaled unit costs as they are, and a
+    problem without the costs its formulation reads is rejected"""
+
+    scaled_unit_costs = np.arange(
+        assignment_problem.cost_matrix.size, dtype=np.int64
+    ).reshape(assignment_problem.cost_matrix.shape)
+    problem = assignment_problem.model_copy(
+        update={"cost_matrix": None, "scaled_unit_costs": scaled_unit_costs}
     )
 
-    assert all(isinstance(client.demand, int) for client in scaled_clients)
-    assert all(
-        isinstance(facility.min_demand, int)
-        and isinstance(facility.max_demand, int)
-        for facility in scaled_facilities
+    if assignment_problem.algorithm == AlgorithmType.MCF_FORMULATION:
+        *_, scaled_cost_matrix = scale_assignment_problem_parameters(
+            assignment_problem=problem,
+            scale_factor=settings.MCF_SCALE_FACTOR,
+        )
+        assert scaled_cost_matrix is scaled_unit_costs
+    else:
+        with pytest.raises(ValueError):
+            scale_assignment_problem_parameters(
+                assignment_problem=problem,
+                scale_factor=settings.MILP_SCALE_FACTOR,
+            )
+
+
+def test_group_clients_by_facility():
+    """Clients are grouped in increasing order and unassigned are dropped"""
+
+    client_facilities = np.array([2, 0, 2, -1, 0, 2])
+
+    groups = group_clients_by_facility(
+        client_facilities=client_facilities, num_facilities=4
     )
-    assert scaled_cost_matrix.dtype == int
+
+    assert [group.tolist() for group in groups] == [[1, 4], [], [0, 2, 5], []]
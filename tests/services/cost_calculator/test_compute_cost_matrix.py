@@ -64,10 +64,10 @@ def mocked_osrm_cost_matrix(cost_problem):
     rng = np.random.default_rng(seed)
 
     # Generate random matrix using the generator
-    random_matrix = rng.random((num_sources, num_destinations))
+    random_matrix = rng.random((2, num_sources, num_destinations))
 
     with patch(
-        "src.services.cost_calculator.cost_matrix.cost_matrix.osrm"
+        "src.services.cost_calculator.cost_matrix.fetch_osrm_costs"
     ) as mocked_osrm_cost_matrix_call:
         mocked_osrm_cost_matrix_call.return_value = random_matrix
         yield mocked_osrm_cost_matrix_call
@@ -96,7 +96,11 @@ def test_spherical_distance_matrix_with_large_demands(
 
 @pytest.mark.parametrize(
     "cost_type",
-    [CostType.OSRM_DISTANCE, CostType.OSRM_DURATION],
+    [
+        CostType.OSRM_DISTANCE,
+        CostType.OSRM_DURATION,
+        CostType.OSRM_BLENDED_COST,
+    ],
 )
 def test_osrm_cost_computation(
     mocked_osrm_cost_matrix, cost_problem, cost_type
@@ -0,0 +1,124 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.models import ClientBatch, CostProblem, CostType, Facility
+from src.services import CostMatrixStore, cost_problem_key
+
+
+@pytest.fixture
+def cost_problem():
+    return CostProblem(
+        clients=ClientBatch(
+            ids=["0", "1", "2"], lats=[0.0, 0.1, 0.2], lngs=[0.0, 0.1, 0.2]
+        ),
+        facilities=[
+            Facility(id="0", name="FC0", lat=0.0, lng=0.0),
+            Facility(id="1", name="FC1", lat=1.0, lng=1.0),
+        ],
+    )
+
+
+@pytest.fixture
+def costs():
+    return np.arange(6, dtype=float).reshape(2, 3)
+
+
+def test_cost_matrix_store_round_trip(tmp_path, cost_problem, costs):
+    store = CostMatrixStore(path=str(tmp_path), max_bytes=2**20)
+    surrogate = costs > 3
+
+    assert store.get(cost_problem) is None
+
+    store.put(cost_problem, costs=costs, surrogate=surrogate)
+    stored_costs, stored_surrogate = store.get(cost_problem)
+
+    np.testing.assert_array_equal(stored_costs, costs)
+    np.testing.assert_array_equal(stored_surrogate, surrogate)
+    assert not stored_costs.flags.writeable
+
+
+@pytest.mark.parametrize(
+    "update",
+    [
+        {"cost_type": CostType.OSRM_DURATION},
+        {"duration_weight": 1.0},
+        {"facilities": []},
+    ],
+)
+def test_cost_problem_key(cost_problem, update):
+    assert cost_problem_key(cost_problem) != cost_problem_key(
+        cost_problem.model_copy(update=update)
+    )
+
+
+def test_cost_problem_key_clients(cost_problem):
+    clients = cost_problem.clients
+
+    assert cost_problem_key(cost_problem) != cost_problem_key(
+        cost_problem.model_copy(update={"clients": clients.scale_demands(6)})
+    )
+    assert cost_problem_key(cost_problem) == cost_problem_key(
+        cost_problem.model_copy(update={"clients": clients[:]})
+    )
+
+
+def test_cost_matrix_store_eviction(tmp_path, cost_problem, costs):
+    """Beyond its size, the least recently used matrices are evicted"""
+
+    surrogate = np.zeros(costs.shape, dtype=bool)
+    matrix_size = costs.nbytes + surrogate.nbytes + 2 * 128
+    store = CostMatrixStore(path=str(tmp_path), max_bytes=2 * matrix_size)
+    other_cost_problems = [
+        cost_problem.model_copy(update={"cost_type": cost_type})
+        for cost_type in (CostType.OSRM_DISTANCE, CostType.OSRM_DURATION)
+    ]
+
+    for problem in (cost_problem, *other_cost_problems):
+        store.put(problem, costs=costs, surrogate=surrogate)
+        time.sleep(0.01)
+
+    assert store.get(cost_problem) is None
+    assert store.get(other_cost_problems[0]) is not None
+    assert store.get(other_cost_problems[1]) is not None
+
+
+def test_cost_matrix_store_disabled(tmp_path, cost_problem, costs):
+    store = CostMatrixStore(path=str(tmp_path), max_bytes=0)
+
+    store.put(cost_problem, costs=costs, surrogate=costs > 3)
+
+    assert store.get(cost_problem) is None
+
+
+def test_cost_matrix_store_ttl(tmp_path, cost_problem, costs):
+    """OSRM cost matrices expire after the TTL from their write time, kept
+    when they are refined, spherical ones never"""
+
+    store = CostMatrixStore(
+        path=str(tmp_path), max_bytes=2**20, ttl_seconds=60
+    )
+    osrm_cost_problem = cost_problem.model_copy(
+        update={"cost_type": CostType.OSRM_DISTANCE}
+    )
+    surrogate = costs > 3
+    write_time = time.time() - 50
+
+    for problem in (cost_problem, osrm_cost_problem):
+        store.put(problem, costs=costs, surrogate=surrogate)
+        surrogate_path = store._paths(problem)[1]
+        os.utime(surrogate_path, (write_time, write_time))
+    store.put(osrm_cost_problem, costs=costs, surrogate=costs > 4)
+
+    assert store.get(osrm_cost_problem) is not None
+    assert os.stat(surrogate_path).st_mtime == write_time
+
+    write_time -= 20
+    for problem in (cost_problem, osrm_cost_problem):
+        surrogate_path = store._paths(problem)[1]
+        os.utime(surrogate_path, (write_time, write_time))
+
+    assert store.get(osrm_cost_problem) is None
+    assert store.get(cost_problem) is not None
@@ -0,0 +1,107 @@
+import cost_matrix
+import numpy as np
+import pytest
+import requests
+
+from src.services import fetch_osrm_costs
+from tests.fake_osrm_server import FakeOSRMServer
+
+
+@pytest.fixture
+def coordinates():
+    rng = np.random.default_rng(2024)
+    sources = np.column_stack(
+        (rng.uniform(-23.05, -22.70, 5), rng.uniform(-43.70, -43.10, 5))
+    )
+    destinations = np.column_stack(
+        (rng.uniform(-23.05, -22.70, 23), rng.uniform(-43.70, -43.10, 23))
+    )
+
+    return sources, destinations
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_fetch_osrm_costs_reassembles_batches(
+    fake_osrm_server, coordinates, max_workers
+):
+    sources, destinations = coordinates
+
+    distances, durations = fetch_osrm_costs(
+        sources=sources,
+        destinations=destinations,
+        server_address=fake_osrm_server.address,
+        batch_size=4,
+        max_workers=max_workers,
+    )
+
+    expected = cost_matrix.spherical(sources, destinations)
+    assert len(fake_osrm_server.requested_paths) == 2 * 6
+    np.testing.assert_allclose(distances, expected)
+    np.testing.assert_allclose(durations, expected / 10)
+
+
+@pytest.mark.parametrize("cost_type", ["distances", "durations"])
+def test_fetch_single_osrm_cost_type(fake_osrm_server, coordinates, cost_type):
+    sources, destinations = coordinates
+
+    costs = fetch_osrm_costs(
+        sources=sources,
+        destinations=destinations,
+        server_address=fake_osrm_server.address,
+        cost_types=[cost_type],
+    )
+
+    assert costs.shape == (1, 5, 23)
+    assert f"annotations={cost_type[:-1]}" in (
+        fake_osrm_server.requested_paths[0]
+    )
+
+
+def test_fetch_osrm_costs_concurrently(coordinates):
+    sources, destinations = coordinates
+
+    with FakeOSRMServer(latency_seconds=0.05) as server:
+        fetch_osrm_costs(
+            sources=sources,
+            destinations=destinations,
+            server_address=server.address,
+            batch_size=4,
+            max_workers=4,
+        )
+
+    assert server.max_concurrent_requests > 1
+    assert server.max_concurrent_requests <= 4
+
+
+def test_fetch_osrm_costs_retries_failed_batches(coordinates):
+    sources, destinations = coordinates
+
+    with FakeOSRMServer(num_failures=2) as server:
+        costs = fetch_osrm_costs(
+            sources=sources,
+            destinations=destinations,
+            server_address=server.address,
+            batch_size=10,
+            max_workers=1,
+        )
+
+    assert len(server.requested_paths) == 3 + 2
+    np.testing.assert_allclose(
+        costs[0], cost_matrix.spherical(sources, destinations)
+    )
+
+
+def test_fetch_osrm_costs_raises_after_max_retries(coordinates):
+    sources, destinations = coordinates
+
+    with FakeOSRMServer(num_failures=10) as server:
+        with pytest.raises(requests.RequestException):
+            fetch_osrm_costs(
+                sources=sources,
+                destinations=destinations,
+                server_address=server.address,
+                max_workers=1,
+                max_retries=2,
+            )
+
+    assert len(server.requested_paths) == 3
@@ -0,0 +1,191 @@
+import time
+
+import cost_matrix
+import numpy as np
+import pytest
+
+from src.models import Client, ClientBatch, CostProblem, CostType, Facility
+from src.services import OSRMCostCache, compute_cost_matrix
+
+
+@pytest.fixture
+def sources():
+    return np.array([[-22.90, -43.20], [-22.95, -43.30]])
+
+
+@pytest.fixture
+def destinations():
+    return np.array([[-22.91, -43.21], [-22.92, -43.22], [-22.93, -43.23]])
+
+
+def test_cache_round_trip(sources, destinations):
+    cache = OSRMCostCache(path=":memory:")
+    costs = np.arange(6, dtype=float).reshape(1, 2, 3)
+    costs[0, 1, 2] = np.nan
+
+    assert np.isnan(cache.get(sources, destinations, ["distances"])).all()
+
+    cache.put(sources, destinations, costs, ["distances"])
+    cached_costs = cache.get(sources, destinations, ["distances"])
+
+    np.testing.assert_array_equal(cached_costs, costs)
+    assert np.isnan(cache.get(sources, destinations, ["durations"])).all()
+    assert len(cache) == 5
+    assert cache.hits == 5
+    assert cache.hit_rate == pytest.approx(5 / 18)
+
+
+def test_cache_stores_distances_and_durations_together(sources, destinations):
+    cache = OSRMCostCache(path=":memory:")
+    costs = np.stack((np.ones((2, 3)), np.full((2, 3), 2.0)))
+    costs[1, 0, 0] = np.nan
+
+    cache.put(sources, destinations, costs, ["distances", "durations"])
+
+    assert len(cache) == 5
+    cached_costs = cache.get(sources, destinations, ["durations", "distances"])
+    assert np.isnan(cached_costs[:, 0, 0]).all()
+    np.testing.assert_array_equal(cached_costs[:, 1], costs[::-1, 1])
+    np.testing.assert_array_equal(
+        cache.get(sources, destinations, ["durations"])[0], cached_costs[0]
+    )
+
+
+def test_cache_snaps_coordinates(sources, destinations):
+    cache = OSRMCostCache(path=":memory:", precision=3)
+    cache.put(sources, destinations, np.ones((1, 2, 3)), ["durations"])
+
+    nearby_destinations = destinations + 0.0001
+    cached_costs = cache.get(sources, nearby_destinations, ["durations"])
+
+    assert (cached_costs == 1).all()
+
+
+def test_cache_merges_destinations_of_a_source(sources, destinations):
+    """Costs stored later for a source are merged with its earlier ones,
+    replacing only the given cost types"""
+
+    cache = OSRMCostCache(path=":memory:")
+    cache.put(sources, destinations[:2], np.ones((1, 2, 2)), ["distances"])
+    cache.put(
+        sources[:1], destinations[1:], np.full((1, 1, 2), 2.0), ["durations"]
+    )
+    cache.put(sources[:1], destinations[2:], np.ones((1, 1, 1)), ["distances"])
+
+    cached_costs = cache.get(sources, destinations, ["distances", "durations"])
+
+    assert len(cache) == 5
+    np.testing.assert_array_equal(cached_costs[:, 0, 1:], [[1, 1], [2, 2]])
+    assert np.isnan(cached_costs[:, 0, 0]).all()
+    assert np.isnan(cached_costs[:, 1]).all()
+    np.testing.assert_array_equal(
+        cache.get(sources, destinations, ["distances"])[0, 1],
+        [1.0, 1.0, np.nan],
+    )
+
+
+def test_cache_persists_on_disk(tmp_path, sources, destinations):
+    path = str(tmp_path / "osrm_cost_cache.sqlite3")
+    OSRMCostCache(path=path).put(
+        sources, destinations, np.ones((1, 2, 3)), ["distances"]
+    )
+
+    cached_costs = OSRMCostCache(path=path).get(
+        sources, destinations, ["distances"]
+    )
+
+    assert (cached_costs == 1).all()
+
+
+def test_cache_evicts_expired_and_least_recently_used(sources, destinations):
+    """Beyond the maximum number of pairs, the least recently used sources
+    are evicted with all their pairs"""
+
+    cache = OSRMCostCache(path=":memory:", max_entries=4)
+    cache.put(sources[:1], destinations, np.ones((1, 1, 3)), ["distances"])
+    time.sleep(0.01)
+    cache.put(sources[1:], destinations, np.ones((1, 1, 3)), ["distances"])
+
+    assert len(cache) == 3
+    assert np.isnan(cache.get(sources[:1], destinations, ["distances"])).all()
+    assert (cache.get(sources[1:], destinations, ["distances"]) == 1).all()
+
+    cache.ttl_seconds = 0.005
+    time.sleep(0.01)
+    assert np.isnan(cache.get(sources, destinations, ["distances"])).all()
+
+    cache.put(sources[:1], destinations[:1], np.ones((1, 1, 1)), ["distances"])
+    assert len(cache) == 1
+
+
+@pytest.fixture
+def osrm_cost_problem(fake_osrm_server):
+    clients = [
+        Client(id=str(j), lat=-22.9 - 0.01 * j, lng=-43.2 - 0.01 * j)
+        for j in range(5)
+    ]
+    facilities = [
+        Facility(id=str(i), name=f"FC{i}", lat=-22.9 + 0.05 * i, lng=-43.2)
+        for i in range(3)
+    ]
+
+    return CostProblem(
+        clients=clients,
+        facilities=facilities,
+        cost_type=CostType.OSRM_DISTANCE,
+        osrm_server_address=fake_osrm_server.address,
+        osrm_batch_size=2,
+    )
+
+
+def test_compute_cost_matrix_requests_only_missing_pairs(
+    fake_osrm_server, osrm_cost_cache, osrm_cost_problem
+):
+    first_costs = compute_cost_matrix(osrm_cost_problem)
+    num_first_requests = len(fake_osrm_server.requested_paths)
+
+    second_costs = compute_cost_matrix(osrm_cost_problem)
+    assert len(fake_osrm_server.requested_paths) == num_first_requests
+    np.testing.assert_allclose(second_costs, first_costs)
+
+    osrm_cost_problem.clients = ClientBatch.from_clients(
+        [*osrm_cost_problem.clients, Client(id="new", lat=-23.0, lng=-43.5)]
+    )
+    costs = compute_cost_matrix(osrm_cost_problem)
+
+    new_requests = fake_osrm_server.requested_paths[num_first_requests:]
+    assert len(new_requests) == 2
+    assert all("-43.5,-23.0" in path for path in new_requests)
+    np.testing.assert_allclose(
+        costs,
+        cost_matrix.spherical(
+            np.array([(f.lat, f.lng) for f in osrm_cost_problem.facilities]),
+            np.array([(c.lat, c.lng) for c in osrm_cost_problem.clients]),
+        ),
+    )
+    assert osrm_cost_cache.hit_rate == pytest.approx(30 / 48)
+
+
+def test_compute_cost_matrix_blends_a_single_fetch(
+    fake_osrm_server, osrm_cost_problem
+):
+    distance_costs = compute_cost_matrix(osrm_cost_problem)
+    num_requests = len(fake_osrm_server.requested_paths)
+
+    osrm_cost_problem.cost_type = CostType.OSRM_DURATION
+    duration_costs = compute_cost_matrix(osrm_cost_problem)
+
+    osrm_cost_problem.cost_type = CostType.OSRM_BLENDED_COST
+    osrm_cost_problem.distance_weight = 2.0
+    osrm_cost_problem.duration_weight = 5.0
+    blended_costs = compute_cost_matrix(osrm_cost_problem)
+
+    assert len(fake_osrm_server.requested_paths) == num_requests
+    assert all(
+        "annotations=distance,duration" in path
+        for path in fake_osrm_server.requested_paths
+    )
+    np.testing.assert_allclose(duration_costs, distance_costs / 10)
+    np.testing.assert_allclose(
+        blended_costs, 2.0 * distance_costs + 5.0 * duration_costs
+    )
@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+
+from config import settings
+from src.models import (
+    AssignmentRequest,
+    Client,
+    CostProblem,
+    CostType,
+    Facility,
+    ObjectiveType,
+    SolutionStatus,
+)
+from src.services import (
+    compute_cost_matrix,
+    compute_screened_cost_matrix,
+    fetch_osrm_costs,
+    refine_screened_costs,
+    solve_facility_assignment,
+)
+
+CITIES = [(-22.90, -43.20), (-23.55, -46.63)]
+
+
+@pytest.fixture
+def dispersed_clients():
+    """Clients around two cities 360 km apart"""
+
+    rng = np.random.default_rng(2024)
+    return [
+        Client(
+            id=f"{k}-{j}",
+            lat=lat + rng.uniform(-0.1, 0.1),
+            lng=lng + rng.uniform(-0.1, 0.1),
+        )
+        for k, (lat, lng) in enumerate(CITIES)
+        for j in range(30)
+    ]
+
+
+@pytest.fixture
+def dispersed_facilities():
+    """Facilities in each city, those of the first city not being able to
+    serve all of its clients"""
+
+    return [
+        Facility(
+            id=f"{k}-{i}",
+            name=f"FC{k}-{i}",
+            lat=lat + 0.05 * (i - 1),
+            lng=lng,
+            max_demand=8 if k == 0 else 30,
+        )
+        for k, (lat, lng) in enumerate(CITIES)
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def fake_osrm_costs(monkeypatch, fake_osrm_server):
+    """Screen the OSRM requests of the cost stage and send them to the fake
+    server, the facilities of each city being requested together"""
+
+    monkeypatch.setattr(settings, "OSRM_SCREENING", True)
+    monkeypatch.setattr(settings, "OSRM_SCREENING_GROUP_SIZE", 3)
+
+    def fetch_fake_osrm_costs(**kwargs):
+        kwargs["server_address"] = fake_osrm_server.address
+        return fetch_osrm_costs(**kwargs)
+
+    monkeypatch.setattr(
+        "src.services.cost_calculator.cost_matrix.fetch_osrm_costs",
+        fetch_fake_osrm_costs,
+    )
+
+    return fake_osrm_server
+
+
+@pytest.mark.parametrize(
+    "cost_type",
+    [
+        CostType.OSRM_DISTANCE,
+        CostType.OSRM_DURATION,
+        CostType.OSRM_BLENDED_COST,
+    ],
+)
+def test_screened_costs_bound_exact_costs(
+    fake_osrm_costs, dispersed_clients, dispersed_facilities, cost_type
+):
+    cost_problem = CostProblem(
+        clients=dispersed_clients,
+        facilities=dispersed_facilities,
+        cost_type=cost_type,
+    )
+
+    costs, surrogate = compute_screened_cost_matrix(cost_problem)
+    exact_costs = compute_cost_matrix(cost_problem)
+
+    # Pairs across cities are screened, within cities fetched
+    assert surrogate[:3, 30:].all() and surrogate[3:, :30].all()
+    assert not surrogate[:3, :30].any() and not surrogate[3:, 30:].any()
+    np.testing.assert_allclose(costs[~surrogate], exact_costs[~surrogate])
+    assert (costs[surrogate] <= exact_costs[surrogate]).all()
+
+
+def test_refine_screened_costs(
+    fake_osrm_costs, dispersed_clients, dispersed_facilities
+):
+    cost_problem = CostProblem(
+        clients=dispersed_clients,
+        facilities=dispersed_facilities,
+        cost_type=CostType.OSRM_DISTANCE,
+    )
+    costs, surrogate = compute_screened_cost_matrix(cost_problem)
+
+    pairs = np.zeros(surrogate.shape, dtype=bool)
+    pairs[:, 0] = True
+    refine_screened_costs(cost_problem, costs, surrogate, pairs)
+    assert not surrogate[:, 0].any()
+    assert surrogate[:3, 30:].all()
+
+    refine_screened_costs(cost_problem, costs, surrogate, surrogate.copy())
+    assert not surrogate.any()
+    np.testing.assert_allclose(costs, compute_cost_matrix(cost_problem))
+
+
+def test_screened_solution_is_optimal(
+    monkeypatch, fake_osrm_costs, dispersed_clients, dispersed_facilities
+):
+    request = AssignmentRequest(
+        total_demand=len(dispersed_clients),
+        clients=dispersed_clients,
+        facilities=dispersed_facilities,
+        objective=ObjectiveType.MIN_TRAVEL_DISTANCE,
+    )
+
+    screened_solution = solve_facility_assignment(request)
+
+    monkeypatch.setattr(settings, "OSRM_SCREENING", False)
+    solution = solve_facility_assignment(request)
+
+    # Six clients of the first city are served from the second one
+    num_assigned_clients = [
+        len(assigned_facility.assigned_clients)
+        for assigned_facility in screened_solution.assigned_facilities
+    ]
+    assert sum(num_assigned_clients[3:]) == 36
+    assert screened_solution.solution_status == SolutionStatus.OPTIMAL
+    assert screened_solution.objective_value == solution.objective_value
+    assert num_assigned_clients == [
+        len(assigned_facility.assigned_clients)
+        for assigned_facility in solution.assigned_facilities
+    ]
@@ -0,0 +1,69 @@
+import cost_matrix
+import numpy as np
+import pytest
+
+from src.services import compute_spherical_costs
+
+
+@pytest.fixture
+def coordinates():
+    rng = np.random.default_rng(2024)
+    sources = np.column_stack(
+        (rng.uniform(-23.05, -22.70, 7), rng.uniform(-43.70, -43.10, 7))
+    )
+    destinations = np.column_stack(
+        (rng.uniform(-23.05, -22.70, 50), rng.uniform(-43.70, -43.10, 50))
+    )
+
+    return sources, destinations
+
+
+@pytest.mark.parametrize("chunk_size", [1, 16, 50, 1000])
+def test_spherical_costs_match_cost_matrix(coordinates, chunk_size):
+    sources, destinations = coordinates
+    weights = np.arange(1, 51)
+
+    costs = compute_spherical_costs(
+        sources=sources,
+        destinations=destinations,
+        weights=weights,
+        chunk_size=chunk_size,
+    )
+
+    expected = weights * cost_matrix.spherical(sources, destinations)
+    assert costs.dtype == np.float64
+    assert np.array_equal(costs, expected)
+
+
+def test_spherical_costs_in_float32(coordinates):
+    sources, destinations = coordinates
+
+    costs = compute_spherical_costs(
+        sources=sources, destinations=destinations, dtype=np.float32
+    )
+
+    assert costs.dtype == np.float32
+    np.testing.assert_allclose(
+        costs, cost_matrix.spherical(sources, destinations), atol=5
+    )
+
+
+def test_spherical_costs_into_scaled_integer_buffer(coordinates):
+    """Unit costs scaled into an integer buffer are truncated like the
+    flow formulation scaling"""
+
+    sources, destinations = coordinates
+    out = np.zeros((7, 50), dtype=np.int64)
+
+    compute_spherical_costs(
+        sources=sources,
+        destinations=destinations,
+        scale_factor=10_000,
+        chunk_size=16,
+        out=out,
+    )
+
+    expected = (10_000 * cost_matrix.spherical(sources, destinations)).astype(
+        np.int64
+    )
+    assert np.abs(out - expected).max() <= 1
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from src.models import ClientBatch
+from src.services import ClientDatasetStore, aggregate_colocated_clients
+
+
+@pytest.fixture
+def client_batch(clients):
+    # Repeat some clients at the coordinates of others
+    client_batch = ClientBatch.from_clients(clients[:50])
+    client_batch.lats[40:] = client_batch.lats[:10]
+    client_batch.lngs[40:] = client_batch.lngs[:10]
+
+    return client_batch
+
+
+def test_client_dataset_store_add(client_dataset_store, client_batch):
+    client_dataset = client_dataset_store.add(client_batch)
+    aggregation = aggregate_colocated_clients(client_batch)
+
+    assert client_dataset.clients == client_batch
+    assert client_dataset.aggregation.locations == aggregation.locations
+    np.testing.assert_array_equal(
+        client_dataset.aggregation.client_locations,
+        aggregation.client_locations,
+    )
+    assert client_dataset.info.num_clients == 50
+    assert client_dataset.info.num_locations == 40
+
+
+def test_client_dataset_store_same_clients(client_dataset_store, client_batch):
+    dataset_id = client_dataset_store.add(client_batch).dataset_id
+
+    assert client_dataset_store.add(client_batch[:]).dataset_id == dataset_id
+    assert (
+        client_dataset_store.add(client_batch.scale_demands(10)).dataset_id
+        != dataset_id
+    )
+
+
+def test_client_dataset_store_reopen(client_dataset_store, client_batch):
+    """Datasets are read back from disk, memory-mapped and read-only"""
+
+    dataset_id = client_dataset_store.add(client_batch).dataset_id
+    store = ClientDatasetStore(path=client_dataset_store.path, max_open=1)
+
+    client_dataset = store.get(dataset_id)
+
+    assert client_dataset.clients == client_batch
+    assert not client_dataset.clients.lats.flags.owndata
+    assert not client_dataset.clients.lats.flags.writeable
+
+
+def test_client_dataset_store_remove(client_dataset_store, client_batch):
+    dataset_id = client_dataset_store.add(client_batch).dataset_id
+
+    client_dataset_store.remove(dataset_id)
+
+    with pytest.raises(KeyError):
+        client_dataset_store.get(dataset_id)
+    with pytest.raises(KeyError):
+        client_dataset_store.remove(dataset_id)
+
+
+@pytest.mark.parametrize("dataset_id", ["unknown", "..", "0" * 32])
+def test_client_dataset_store_unknown_dataset(
+    client_dataset_store, dataset_id
+):
+    with pytest.raises(KeyError):
+        client_dataset_store.get(dataset_id)
@@ -0,0 +1,57 @@
+import pytest
+
+from src.models import Client, Facility
+from src.services import locate_clients_in_exclusive_areas
+
+
+def test_locate_clients_in_exclusive_areas(
+    facility_within_square_center, clients_within_square
+):
+    """Clients 5 to 8 lie on the boundary of the exclusive area of the
+    facility and clients 1 to 4 lie outside it"""
+
+    other_facility = Facility(id="2", name="No Area", lat=0.0, lng=0.0)
+
+    client_facilities = locate_clients_in_exclusive_areas(
+        clients=clients_within_square,
+        facilities=[other_facility, facility_within_square_center],
+    )
+
+    assert client_facilities.tolist() == [-1, -1, -1, -1, 1, 1, 1, 1]
+
+
+def test_locate_clients_without_exclusive_areas(clients_within_square):
+    facility = Facility(id="1", name="No Area", lat=0.0, lng=0.0)
+
+    client_facilities = locate_clients_in_exclusive_areas(
+        clients=clients_within_square, facilities=[facility]
+    )
+
+    assert (client_facilities == -1).all()
+
+
+def test_locate_clients_in_intersecting_exclusive_areas(
+    facility_within_square_center,
+    other_facility_within_square_center,
+    clients_within_square,
+):
+    """All clients in the intersection of the exclusive areas are reported
+    at once"""
+
+    clients = clients_within_square + [Client(id="9", lat=0.5, lng=0.5)]
+
+    with pytest.raises(ValueError) as error:
+        locate_clients_in_exclusive_areas(
+            clients=clients,
+            facilities=[
+                facility_within_square_center,
+                other_facility_within_square_center,
+            ],
+        )
+
+    message = str(error.value)
+    assert message.startswith("Impossible solve the problem!")
+    assert "['Facility', 'Other Facility']" in message
+    assert all(
+        f"({client.lat}, {client.lng})" in message for client in clients[4:]
+    )